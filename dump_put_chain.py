@@ -1,23 +1,44 @@
 # dump_put_chain.py
+# Usage: PYTHONPATH=src python dump_put_chain.py TSLA AAPL --next 3
 
+import argparse
+import sys
 import pandas as pd
-from data_fetcher import get_put_option_chain
+from bulk_fetcher import fetch_put_chains
 from data_fetcher import get_stock_info
+from snapshot_store import SnapshotStore
 
-expiration = "2025-04-17"
-puts_df = get_put_option_chain(expiration=expiration)
-stock_info = get_stock_info()
-current_price = stock_info["current_price"]
+parser = argparse.ArgumentParser(description="Dump full PUT chains for one or more tickers")
+parser.add_argument("tickers", nargs="*", default=["TSLA"])
+parser.add_argument("--next", type=int, default=None, help="Only the next N expirations")
+parser.add_argument("--start", default=None, help="Earliest expiration (YYYY-MM-DD)")
+parser.add_argument("--end", default=None, help="Latest expiration (YYYY-MM-DD)")
+parser.add_argument("--workers", type=int, default=8)
+args = parser.parse_args()
+
+if args.next is not None:
+    selector = args.next
+elif args.start or args.end:
+    selector = (args.start, args.end)
+else:
+    selector = "all"
+
+puts_df = fetch_put_chains(args.tickers, selector=selector, max_workers=args.workers)
+if puts_df.empty:
+    sys.exit("❌ No PUT chains could be fetched; nothing saved.")
+prices = {symbol: get_stock_info(symbol)["current_price"] for symbol in args.tickers}
 
 puts_df["mid_price"] = (puts_df["bid"] + puts_df["ask"]) / 2
-puts_df["current_price"] = current_price
-puts_df["intrinsic_value"] = puts_df["strike"] - current_price
+puts_df["current_price"] = puts_df["ticker"].map(prices)
+puts_df["intrinsic_value"] = puts_df["strike"] - puts_df["current_price"]
 puts_df["time_value"] = puts_df["mid_price"] - puts_df["intrinsic_value"]
 puts_df = puts_df[[
-    "contractSymbol", "strike", "lastPrice", "bid", "ask", "mid_price",
-    "volume", "openInterest", "impliedVolatility", "intrinsic_value", "time_value"
+    "ticker", "expiration", "contractSymbol", "strike", "lastPrice", "bid", "ask", "mid_price",
+    "volume", "openInterest", "impliedVolatility", "current_price", "intrinsic_value", "time_value"
 ]]
 
-# Save to file
-puts_df.to_csv("full_put_chain_2025-04-17.txt", index=False)
-print("✅ Full put option chain saved to 'full_put_chain_2025-04-17.txt'")
+# Append one snapshot per (ticker, expiration) to the columnar store
+store = SnapshotStore()
+for (symbol, expiration), chain in puts_df.groupby(["ticker", "expiration"]):
+    store.write(chain.drop(columns=["ticker", "expiration"]), symbol, expiration)
+print(f"✅ Full put option chains saved to '{store.root}' ({len(puts_df)} contracts)")
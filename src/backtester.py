@@ -0,0 +1,164 @@
+# src/backtester.py
+# Replays stored chain snapshots day by day through filter_puts/suggest_put with a roll policy.
+
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from itertools import groupby
+
+import numpy as np
+import pandas as pd
+
+from option_analyzer import filter_puts, suggest_put
+from snapshot_store import SnapshotStore
+
+SHARES_PER_CONTRACT = 100
+CHAIN_COLUMNS = ["contractSymbol", "strike", "lastPrice", "bid", "ask", "mid_price", "volume",
+                 "impliedVolatility", "current_price"]
+
+DEFAULT_POLICY = {
+    "entry_dte": 30,        # buy in the expiration closest to this many days out
+    "roll_dte": 7,          # sell and re-buy once the held PUT is this close to expiry
+    "hedge_budget": 1000,   # spent on each purchase, sized like simulate_decision
+    "min_volume": 0,
+    "moneyness_range": (0.9, 1.0),
+    "rank": 0               # index into suggest_put's output
+}
+
+
+def _days_between(start, end):
+    return (date.fromisoformat(end) - date.fromisoformat(start)).days
+
+
+def _iter_days(store, ticker, start_date, end_date):
+    """Yields (date, {expiration: chain}) one trading day at a time; the last part of a day wins."""
+    snapshots = store.iter_snapshots("chains", ticker=ticker, start_date=start_date, end_date=end_date,
+                                     columns=CHAIN_COLUMNS)
+    for day, parts in groupby(snapshots, key=lambda s: s[2]):
+        chains = {}
+        for _, expiration, _, _, df in parts:
+            chains[expiration] = df
+        yield day, chains
+
+
+def _mark(chain, symbol, strike, spot):
+    """Mid from the day's chain, else intrinsic value on the day's spot."""
+    if chain is not None:
+        row = chain[chain["contractSymbol"] == symbol]
+        if len(row):
+            return float(row["mid_price"].iloc[0])
+    return max(strike - spot, 0.0)
+
+
+def run_backtest(ticker, num_shares, policy=None, store_root=None, start_date=None, end_date=None,
+                 prices=None) -> tuple[pd.DataFrame, dict]:
+    """
+    Walks stored snapshots and returns (daily marks, summary).
+    Underlying prices come from the snapshots' current_price column, or from `prices`
+    (a Series indexed by YYYY-MM-DD) when given.
+    """
+    policy = dict(DEFAULT_POLICY, **(policy or {}))
+    store = SnapshotStore(store_root) if store_root else SnapshotStore()
+
+    position = None
+    cash = 0.0
+    premiums_paid = 0.0
+    proceeds = 0.0
+    rows = []
+
+    for day, chains in _iter_days(store, ticker, start_date, end_date):
+        if prices is not None and day in prices.index:
+            spot = float(prices[day])
+        else:
+            spots = [c["current_price"].iloc[0] for c in chains.values() if "current_price" in c and len(c)]
+            if not spots:
+                continue
+            spot = float(spots[0])
+
+        # Close out inside the roll window, or settle on the first snapshot at or after expiry so
+        # an expired PUT turns into cash once instead of tracking later spot moves
+        if position is not None:
+            dte = _days_between(day, position["expiration"])
+            if dte <= max(policy["roll_dte"], 0):
+                chain = chains.get(position["expiration"]) if dte > 0 else None
+                price = _mark(chain, position["symbol"], position["strike"], spot)
+                value = price * SHARES_PER_CONTRACT * position["contracts"]
+                cash += value
+                proceeds += value
+                position = None
+
+        # Open a new hedge in the expiration nearest entry_dte that is outside the roll window
+        if position is None:
+            candidates = {exp: _days_between(day, exp) for exp in chains}
+            candidates = {exp: dte for exp, dte in candidates.items() if dte > max(policy["roll_dte"], 0)}
+            if candidates:
+                expiration = min(candidates, key=lambda exp: abs(candidates[exp] - policy["entry_dte"]))
+                filtered = filter_puts(chains[expiration], current_price=spot, min_volume=policy["min_volume"],
+                                       moneyness_range=policy["moneyness_range"])
+                suggestions = suggest_put(filtered, top_n=policy["rank"] + 1)
+                if len(suggestions) > policy["rank"]:
+                    pick = suggestions.iloc[policy["rank"]]
+                    contracts = int(policy["hedge_budget"] // (pick["mid_price"] * SHARES_PER_CONTRACT))
+                    if contracts > 0:
+                        cost = contracts * pick["mid_price"] * SHARES_PER_CONTRACT
+                        cash -= cost
+                        premiums_paid += cost
+                        position = {"symbol": pick["contractSymbol"], "strike": float(pick["strike"]),
+                                    "expiration": expiration, "contracts": contracts}
+
+        hedge_value = 0.0
+        if position is not None:
+            price = _mark(chains.get(position["expiration"]), position["symbol"], position["strike"], spot)
+            hedge_value = price * SHARES_PER_CONTRACT * position["contracts"]
+
+        rows.append({
+            "date": day,
+            "spot": spot,
+            "unhedged_value": spot * num_shares,
+            "hedged_value": spot * num_shares + cash + hedge_value,
+            "hedge_value": hedge_value,
+            "held": position["symbol"] if position else None
+        })
+
+    daily = pd.DataFrame(rows)
+    return daily, summarize(daily, premiums_paid, proceeds)
+
+
+def _max_drawdown(values):
+    if len(values) == 0:
+        return 0.0
+    peaks = np.maximum.accumulate(values)
+    return float(np.max((peaks - values) / peaks))
+
+
+def summarize(daily: pd.DataFrame, premiums_paid: float, proceeds: float) -> dict:
+    final_hedge_value = float(daily["hedge_value"].iloc[-1]) if len(daily) else 0.0
+    unhedged_dd = _max_drawdown(daily["unhedged_value"].to_numpy()) if len(daily) else 0.0
+    hedged_dd = _max_drawdown(daily["hedged_value"].to_numpy()) if len(daily) else 0.0
+    hedge_pnl = proceeds + final_hedge_value - premiums_paid
+    return {
+        "days": len(daily),
+        "premiums_paid": premiums_paid,
+        "realized_hedge_cost": premiums_paid - proceeds,
+        "hedge_pnl": hedge_pnl,
+        "hedge_roi": hedge_pnl / premiums_paid * 100 if premiums_paid else np.nan,
+        "unhedged_max_drawdown": unhedged_dd,
+        "hedged_max_drawdown": hedged_dd,
+        "drawdown_reduction": unhedged_dd - hedged_dd
+    }
+
+
+def _run_policy(args):
+    ticker, num_shares, policy, kwargs = args
+    _, summary = run_backtest(ticker, num_shares, policy, **kwargs)
+    return {**policy, **summary}
+
+
+def sweep(ticker, num_shares, policies, n_jobs=4, **kwargs) -> pd.DataFrame:
+    """Runs one backtest per policy dict across a process pool; kwargs go to run_backtest."""
+    tasks = [(ticker, num_shares, policy, kwargs) for policy in policies]
+    if n_jobs > 1:
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            results = list(pool.map(_run_policy, tasks))
+    else:
+        results = [_run_policy(task) for task in tasks]
+    return pd.DataFrame(results)
@@ -0,0 +1,132 @@
+# src/batch_runner.py
+# Non-interactive hedge scan over a portfolio file.
+# Run: python src/batch_runner.py portfolio.csv --expirations 3 --output logs/hedge_report.csv
+#
+# Portfolio columns: ticker, shares, cost_basis, hedge_budget[, budget_source]
+
+import argparse
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+import pandas as pd
+
+from bulk_fetcher import select_expirations
+import instrumentation
+from config.config_filters import FILTER_CONFIG
+from data_fetcher import get_option_expirations, get_put_option_chain, get_stock_info
+from option_analyzer import filter_puts
+from payoff import PiecewisePayoff
+from ranking import rank_hedges
+
+REQUIRED_COLUMNS = ["ticker", "shares", "cost_basis", "hedge_budget"]
+
+
+def load_portfolio(path) -> pd.DataFrame:
+    if path.endswith(".json"):
+        with open(path, "r") as f:
+            portfolio = pd.DataFrame(json.load(f))
+    else:
+        portfolio = pd.read_csv(path)
+    missing = [c for c in REQUIRED_COLUMNS if c not in portfolio.columns]
+    if missing:
+        raise ValueError(f"Portfolio file is missing columns: {missing}")
+    if "budget_source" not in portfolio.columns:
+        portfolio["budget_source"] = "cash"
+    return portfolio
+
+
+def scan_position(position: dict, selector=3, top_n=None, filter_config=None) -> list:
+    """
+    fetch -> filter_puts -> rank_hedges over every selected expiration. Returns the Pareto front
+    (cheapest protection first; at most top_n rows per expiration when given), each hedge with
+    its exact breakevens and max loss.
+    """
+    filter_config = filter_config or FILTER_CONFIG
+    ticker = position["ticker"]
+    current_price = get_stock_info(ticker)["current_price"]
+
+    chains = []
+    for expiration in select_expirations(get_option_expirations(ticker), selector):
+        chain = filter_puts(get_put_option_chain(ticker, expiration), current_price=current_price, **filter_config)
+        chains.append(chain.assign(expiration=expiration))
+    chains = pd.concat(chains, ignore_index=True) if chains else pd.DataFrame()
+    if chains.empty:
+        return [{"ticker": ticker, "current_price": current_price, "error": "No PUTs pass the filters"}]
+
+    front = rank_hedges(chains, current_price, num_shares=position["shares"], hedge_budget=position["hedge_budget"],
+                        avg_purchase_price=position["cost_basis"], budget_source=position["budget_source"])
+    if front.empty:
+        return [{"ticker": ticker, "current_price": current_price, "error": "No hedge fits the budget"}]
+    if top_n is not None:
+        front = front.groupby("expiration", sort=False).head(top_n)
+
+    # rank_hedges scores the shares left after a "sell" budget; the breakevens use the same count
+    remaining = position["shares"]
+    if str(position["budget_source"]).lower() == "sell":
+        remaining -= position["hedge_budget"] / current_price
+
+    rows = []
+    for rank, row in enumerate(front.itertuples(index=False)):
+        summary = PiecewisePayoff(remaining, position["cost_basis"], row.strike, row.contracts,
+                                  row.mid_price).summary()
+        rows.append({
+            "ticker": ticker,
+            "expiration": row.expiration,
+            "rank": rank,
+            "contractSymbol": row.contractSymbol,
+            "strike": row.strike,
+            "premium": row.mid_price,
+            "contracts": row.contracts,
+            "total_put_cost": row.total_put_cost,
+            "cost_per_protection": row.cost_per_protection,
+            "worst_case_pnl": row.worst_case_pnl,
+            "loss_zone_width": row.loss_zone_width,
+            "breakeven_low": summary["breakeven_low"],
+            "breakeven_high": summary["breakeven_high"],
+            "max_loss": summary["max_loss"],
+            "current_price": current_price,
+            "shares": position["shares"],
+            "cost_basis": position["cost_basis"],
+            "hedge_budget": position["hedge_budget"]
+        })
+    return rows
+
+
+def run_batch(portfolio: pd.DataFrame, selector=3, top_n=None, max_workers=8) -> pd.DataFrame:
+    """Scans every position concurrently and returns one consolidated report."""
+    positions = portfolio.to_dict("records")
+
+    def scan(position):
+        try:
+            return scan_position(position, selector=selector, top_n=top_n)
+        except Exception as e:
+            return [{"ticker": position["ticker"], "error": str(e)}]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        results = list(pool.map(scan, positions))
+    return pd.DataFrame([row for rows in results for row in rows])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scan hedges for every position in a portfolio file")
+    parser.add_argument("portfolio", help="CSV or JSON with ticker, shares, cost_basis, hedge_budget")
+    parser.add_argument("--expirations", type=int, default=3, help="Next N expirations per ticker")
+    parser.add_argument("--top", type=int, help="Cap on Pareto-front hedges reported per expiration")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--output", default=f"logs/hedge_report_{date.today().isoformat()}.csv")
+    parser.add_argument("--metrics", help="Write stage timings, network and cache metrics to this JSON file")
+    parser.add_argument("--profile", help="Write sampled call stacks (collapsed format) to this file")
+    args = parser.parse_args()
+    if args.metrics or args.profile:
+        instrumentation.enable(export_path=args.metrics, profile_path=args.profile)
+
+    report = run_batch(load_portfolio(args.portfolio), selector=args.expirations, top_n=args.top,
+                       max_workers=args.workers)
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    report.to_csv(args.output, index=False)
+    errors = report["error"].notna().sum() if "error" in report.columns else 0
+    print(f"✅ Report for {report['ticker'].nunique()} tickers saved to {args.output} ({errors} errors)")
+    if instrumentation.enabled():
+        print(instrumentation.report())
@@ -0,0 +1,123 @@
+# src/batch_simulator.py
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import timed
+from payoff import put_hedge_profile
+
+SHARES_PER_CONTRACT = 100
+
+
+@timed("simulate.simulate_chain")
+def simulate_chain(
+    current_price: float,
+    num_shares: float,
+    strikes,
+    premiums,
+    contracts=1,
+    avg_purchase_price: float = None,
+    hedge_budget: float = None,
+    budget_source: str = "cash",
+    price_range=None,
+    grid: bool = True
+) -> dict:
+    """
+    Simulates every PUT in a chain against one shared price grid in a single pass.
+
+    Row i of "hedged_pnl" is the portfolio P&L when hedging with strikes[i].
+    If hedge_budget is given, contracts are sized per row like simulate_decision
+    (rows the budget can't afford get 0 contracts); otherwise `contracts` is used.
+
+    Breakevens and max_loss (the largest loss in dollars, >= 0) are over all prices, like
+    simulate_decision's; ROI is at the bottom of price_range. All are solved on the
+    piecewise-linear payoff. grid=False skips the (strikes x prices) P&L matrix for
+    callers that only need those summaries.
+    """
+    strikes = np.asarray(strikes, dtype=np.float64)
+    premiums = np.asarray(premiums, dtype=np.float64)
+    if price_range is None:
+        price_range = np.linspace(current_price * 0.4, current_price * 1.6, 300)
+    price_range = np.asarray(price_range, dtype=np.float64)
+    if avg_purchase_price is None:
+        avg_purchase_price = current_price
+
+    option_cost = premiums * SHARES_PER_CONTRACT
+    if hedge_budget is not None:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            n_contracts = np.where(option_cost > 0, np.floor(hedge_budget / option_cost), 0)
+    else:
+        n_contracts = np.broadcast_to(np.asarray(contracts, dtype=np.float64), strikes.shape)
+    total_put_cost = n_contracts * option_cost
+
+    if hedge_budget is not None and budget_source.lower() == "sell":
+        shares_sold = hedge_budget / current_price
+        remaining_shares = num_shares - shares_sold
+        if remaining_shares <= 0:
+            raise ValueError("Not enough shares remaining after funding hedge from sales.")
+    else:
+        shares_sold = 0
+        remaining_shares = num_shares
+
+    lo, hi = float(price_range.min()), float(price_range.max())
+    in_range = put_hedge_profile(remaining_shares, avg_purchase_price, strikes, n_contracts, premiums, lo, hi)
+    exact = put_hedge_profile(remaining_shares, avg_purchase_price, strikes, n_contracts, premiums)
+
+    stock_pnl = hedged_pnl = None
+    if grid:
+        stock_pnl = (price_range - avg_purchase_price) * remaining_shares
+
+        # (strikes x prices) payoff matrix, built in place to avoid temporaries
+        hedged_pnl = np.subtract.outer(strikes, price_range)
+        np.maximum(hedged_pnl, 0, out=hedged_pnl)
+        hedged_pnl *= (n_contracts * SHARES_PER_CONTRACT)[:, None]
+        hedged_pnl += stock_pnl
+        hedged_pnl -= total_put_cost[:, None]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        hedge_profit = in_range["payout_lo"] - total_put_cost
+        roi_on_hedge = np.where(total_put_cost > 0, hedge_profit / total_put_cost * 100, np.nan)
+
+    return {
+        "price_range": price_range,
+        "unhedged_pnl": stock_pnl,
+        "hedged_pnl": hedged_pnl,
+        "contracts": n_contracts,
+        "total_put_cost": total_put_cost,
+        "shares_sold": shares_sold,
+        "remaining_shares": remaining_shares,
+        "breakeven_low": exact["breakeven_low"],
+        "breakeven_high": exact["breakeven_high"],
+        "max_loss": np.maximum(-exact["worst_pnl"], 0.0),
+        "hedge_profit": hedge_profit,
+        "roi_on_hedge": roi_on_hedge
+    }
+
+
+def summarize_chain(puts_df: pd.DataFrame, current_price: float, num_shares: float, **kwargs) -> pd.DataFrame:
+    """
+    Runs simulate_chain over a filtered chain and returns one summary row per contract.
+    """
+    premiums = puts_df["premium"] if "premium" in puts_df.columns else puts_df["mid_price"]
+    result = simulate_chain(
+        current_price=current_price,
+        num_shares=num_shares,
+        strikes=puts_df["strike"].to_numpy(),
+        premiums=premiums.to_numpy(),
+        grid=False,
+        **kwargs
+    )
+
+    summary = pd.DataFrame({
+        "strike": puts_df["strike"].to_numpy(),
+        "premium": premiums.to_numpy(),
+        "contracts": result["contracts"],
+        "total_put_cost": result["total_put_cost"],
+        "breakeven_low": result["breakeven_low"],
+        "breakeven_high": result["breakeven_high"],
+        "max_loss": result["max_loss"],
+        "roi_on_hedge": result["roi_on_hedge"]
+    })
+    if "contractSymbol" in puts_df.columns:
+        summary.insert(0, "contractSymbol", puts_df["contractSymbol"].to_numpy())
+    return summary
@@ -0,0 +1,353 @@
+# src/benchmark.py
+# Offline benchmarks and regression checks for the filtering, simulation and plotting hot paths.
+# Run: python src/benchmark.py              (compare against the stored baseline; exit 1 on regression)
+#      python src/benchmark.py --save       (record a new baseline)
+#      python src/benchmark.py --micro      (batch-vs-per-row, Greeks/IV and ranking micro benchmarks)
+# The baseline records python/numpy/pandas/matplotlib versions; the comparison is skipped when they
+# differ, so record it under requirements.txt.
+
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from hedge_decision_simulator import simulate_decision
+from batch_simulator import simulate_chain
+from pricing import bs_put_greeks, implied_vol
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+
+# (tickers, expirations per ticker, strikes per expiration)
+SCALES = {
+    "small": (1, 1, 25),
+    "medium": (1, 4, 100),
+    "large": (5, 8, 200)
+}
+SIMULATED_ROWS = 200     # per-contract simulator calls per case, like scanning a filtered chain
+TIME_TOLERANCE = 2.0     # fail when slower than baseline x this (and by more than MIN_TIME_DELTA)
+MIN_TIME_DELTA = 0.005
+MIN_RUN_SECONDS = 0.05   # fast cases loop until one timed run lasts this long, as timeit does
+CONFIRM_REPEAT = 3       # flagged cases are re-measured with this many times the repeats first
+VERSION_KEYS = ("python", "numpy", "pandas", "matplotlib")
+MEMORY_TOLERANCE = 1.5
+MEMORY_RUNS = 3
+RESULT_RTOL = 1e-9
+
+
+def make_synthetic_chain(current_price=250.0, num_strikes=500, seed=0, ticker="TSLA", expiration=None):
+    """PUT chain with the yfinance columns the analyzers read; prices are noisy but arbitrage-free enough."""
+    rng = np.random.default_rng(seed)
+    expiration = expiration or (date(2030, 1, 1) + timedelta(days=30)).isoformat()
+    strikes = np.linspace(current_price * 0.5, current_price * 1.5, num_strikes)
+    premiums = np.maximum(strikes - current_price, 0) + rng.uniform(0.5, 15.0, num_strikes)
+    spread = premiums * rng.uniform(0.01, 0.1, num_strikes)
+    return pd.DataFrame({
+        "contractSymbol": [f"{ticker}{expiration.replace('-', '')[2:]}P{int(k * 1000):08d}" for k in strikes],
+        "strike": strikes,
+        "lastPrice": premiums + rng.normal(0, 0.05, num_strikes),
+        "bid": premiums - spread / 2,
+        "ask": premiums + spread / 2,
+        "mid_price": premiums,
+        "volume": rng.integers(0, 2000, num_strikes).astype(np.float64),
+        "openInterest": rng.integers(0, 20000, num_strikes),
+        "impliedVolatility": rng.uniform(0.3, 0.9, num_strikes)
+    })
+
+
+def make_synthetic_chains(num_tickers=1, num_expirations=4, num_strikes=100, seed=0) -> pd.DataFrame:
+    """Stacked chains shaped like fetch_put_chains output (ticker and expiration columns)."""
+    frames = []
+    for i in range(num_tickers):
+        ticker = "TSLA" if i == 0 else f"SYN{i}"
+        for j in range(num_expirations):
+            expiration = (date(2030, 1, 4) + timedelta(weeks=j)).isoformat()
+            chain = make_synthetic_chain(250.0 * (1 + 0.1 * i), num_strikes, seed=seed + i * 1000 + j,
+                                         ticker=ticker, expiration=expiration)
+            frames.append(chain.assign(ticker=ticker, expiration=expiration))
+    return pd.concat(frames, ignore_index=True)
+
+
+def bench_decision_per_row_vs_batch(current_price=250.0, num_shares=500, num_strikes=500,
+                                    hedge_budget=50000, repeat=3):
+    chain = make_synthetic_chain(current_price, num_strikes)
+    strikes = chain["strike"].to_numpy()
+    premiums = chain["mid_price"].to_numpy()
+    price_range = np.linspace(current_price * 0.8, current_price * 1.2, 100)
+
+    def per_row():
+        rows = []
+        for strike, premium in zip(strikes, premiums):
+            df, meta = simulate_decision(current_price, current_price, num_shares, strike, premium, hedge_budget)
+            rows.append(df["Net P&L ($)"].to_numpy())
+        return np.vstack(rows)
+
+    def batched():
+        return simulate_chain(current_price, num_shares, strikes, premiums, hedge_budget=hedge_budget,
+                              price_range=price_range)["hedged_pnl"]
+
+    t_row = min(_timed(per_row) for _ in range(repeat))
+    t_batch = min(_timed(batched) for _ in range(repeat))
+
+    if not np.allclose(per_row(), batched()):
+        raise AssertionError("Batched simulation does not match per-row simulate_decision output")
+
+    print(f"simulate_decision x{num_strikes}: {t_row * 1000:.1f} ms")
+    print(f"simulate_chain ({num_strikes} strikes): {t_batch * 1000:.1f} ms")
+    print(f"Speedup: {t_row / t_batch:.0f}x")
+
+
+def bench_greeks_and_iv(current_price=250.0, num_rows=100_000, seed=0):
+    rng = np.random.default_rng(seed)
+    strikes = rng.uniform(current_price * 0.6, current_price * 1.4, num_rows)
+    t = rng.uniform(0.02, 2.0, num_rows)
+    vols = rng.uniform(0.15, 1.0, num_rows)
+
+    t_greeks = _timed(lambda: bs_put_greeks(current_price, strikes, t, vols))
+    prices = bs_put_greeks(current_price, strikes, t, vols)["theo_price"]
+    t_iv = _timed(lambda: implied_vol(prices, current_price, strikes, t))
+
+    print(f"bs_put_greeks ({num_rows} rows): {t_greeks * 1000:.1f} ms")
+    print(f"implied_vol ({num_rows} rows): {t_iv * 1000:.1f} ms")
+
+
+def bench_rank_grid_vs_exact(current_price=250.0, num_shares=500, hedge_budget=20000, repeat=3):
+    from ranking import rank_hedges
+
+    chains = make_synthetic_chains(*SCALES["large"])
+    t_grid = min(_timed(lambda: rank_hedges(chains, current_price, num_shares, hedge_budget, exact=False))
+                 for _ in range(repeat))
+    t_exact = min(_timed(lambda: rank_hedges(chains, current_price, num_shares, hedge_budget))
+                  for _ in range(repeat))
+
+    print(f"rank_hedges grid ({len(chains)} contracts): {t_grid * 1000:.1f} ms")
+    print(f"rank_hedges exact: {t_exact * 1000:.1f} ms")
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def build_cases(scale, output_dir, current_price=250.0, num_shares=500, hedge_budget=5000):
+    """(name, fn) pairs for one scale; every fn is deterministic and returns something to fingerprint."""
+    from option_analyzer import filter_puts, suggest_put
+    from utils import compute_breakeven_zones
+    from hedge_simulator import simulate_hedge
+    from visualizer import plot_breakeven_zone_map, plot_decision_simulation, plot_hedge_simulation
+
+    chains = make_synthetic_chains(*SCALES[scale])
+    filtered = filter_puts(chains, current_price, min_volume=100, moneyness_range=(0.8, 1.2))
+    rows = filtered.head(SIMULATED_ROWS)
+    strikes = rows["strike"].to_numpy()
+    premiums = rows["mid_price"].to_numpy()
+    zones = compute_breakeven_zones(filtered, current_price, num_shares)
+    hedge_df = simulate_hedge(current_price, num_shares, strikes[0], premiums[0])
+    decision_df, decision_meta = simulate_decision(current_price, current_price, num_shares, strikes[0],
+                                                   premiums[0], hedge_budget)
+
+    def simulate_rows(fn):
+        return pd.concat([fn(strike, premium) for strike, premium in zip(strikes, premiums)], ignore_index=True)
+
+    return [
+        ("filter_puts", lambda: filter_puts(chains, current_price, min_volume=100, moneyness_range=(0.8, 1.2))),
+        ("suggest_put", lambda: suggest_put(filtered, top_n=50)),
+        ("compute_breakeven_zones", lambda: compute_breakeven_zones(filtered, current_price, num_shares)),
+        ("simulate_hedge", lambda: simulate_rows(
+            lambda k, p: simulate_hedge(current_price, num_shares, k, p))),
+        ("simulate_decision", lambda: simulate_rows(
+            lambda k, p: simulate_decision(current_price, current_price, num_shares, k, p, 1e9)[0])),
+        ("simulate_chain", lambda: pd.DataFrame(simulate_chain(
+            current_price, num_shares, strikes, premiums, hedge_budget=1e9)["hedged_pnl"])),
+        ("plot_hedge_simulation", lambda: plot_hedge_simulation(
+            hedge_df, strikes[0], premiums[0], "bench", output_path=os.path.join(output_dir, "hedge.png"))),
+        ("plot_decision_simulation", lambda: plot_decision_simulation(
+            decision_df, strikes[0], premiums[0], "bench", roi=decision_meta["roi_on_hedge"],
+            output_path=os.path.join(output_dir, "decision.png"))),
+        ("plot_breakeven_zone_map", lambda: plot_breakeven_zone_map(
+            zones, "bench", output_path=os.path.join(output_dir, "zones.png")))
+    ]
+
+
+def fingerprint(result):
+    """[rows, sum of numeric cells] for frames; None for side-effect-only cases like plots."""
+    if isinstance(result, tuple):
+        result = result[0]
+    if isinstance(result, pd.DataFrame):
+        numeric = result.select_dtypes("number").to_numpy(dtype=np.float64)
+        return [len(result), float(np.nansum(numeric))]
+    return None
+
+
+def _autorange(fn):
+    """Calls per timed run so one run lasts at least MIN_RUN_SECONDS."""
+    number = 1
+    while True:
+        if _timed(lambda: [fn() for _ in range(number)]) >= MIN_RUN_SECONDS:
+            return number
+        number *= 2
+
+
+def measure(fn, repeat=5):
+    """
+    Best-of-`repeat` per-call wall time (each run looping fast cases, so timer and scheduler
+    noise is amortized), and the lowest peak Python-allocated memory of MEMORY_RUNS traced runs.
+    """
+    result = fn()  # warm-up: imports, caches, first-draw costs
+    number = _autorange(fn)
+    seconds = min(_timed(lambda: [fn() for _ in range(number)]) for _ in range(repeat)) / number
+    return {"seconds": seconds, "peak_bytes": min(_traced_peak(fn) for _ in range(MEMORY_RUNS)),
+            "fingerprint": fingerprint(result)}
+
+
+def _traced_peak(fn):
+    gc.collect()  # garbage left by the timed runs would otherwise be freed, or not, mid-trace
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def run_suite(scales=None, repeat=5, only=None) -> dict:
+    """Measures every case, or only the `only` keys ("name[scale]")."""
+    from visualizer import set_headless
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        set_headless(output_dir)
+        results = {}
+        for scale in scales or SCALES:
+            if only is not None and not any(key.endswith(f"[{scale}]") for key in only):
+                continue
+            for name, fn in build_cases(scale, output_dir):
+                key = f"{name}[{scale}]"
+                if only is None or key in only:
+                    results[key] = measure(fn, repeat)
+    return results
+
+
+def _slower(current, base, time_tolerance=TIME_TOLERANCE):
+    return current["seconds"] > base["seconds"] * time_tolerance and \
+        current["seconds"] - base["seconds"] > MIN_TIME_DELTA
+
+
+def confirm_slow(results, baseline, repeat=5, time_tolerance=TIME_TOLERANCE):
+    """Re-measures cases that look slower than the baseline and keeps the best time of both runs."""
+    slow = {key for key, r in results.items() if key in baseline and _slower(r, baseline[key], time_tolerance)}
+    if slow:
+        for key, r in run_suite(repeat=repeat * CONFIRM_REPEAT, only=slow).items():
+            results[key]["seconds"] = min(results[key]["seconds"], r["seconds"])
+    return results
+
+
+def compare(results, baseline, time_tolerance=TIME_TOLERANCE, memory_tolerance=MEMORY_TOLERANCE) -> list:
+    """Human-readable failures; an empty list means no regression."""
+    failures = []
+    for key, current in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        if base["fingerprint"] is not None and (
+                current["fingerprint"] is None or current["fingerprint"][0] != base["fingerprint"][0]
+                or not np.isclose(current["fingerprint"][1], base["fingerprint"][1], rtol=RESULT_RTOL)):
+            failures.append(f"{key}: result changed {base['fingerprint']} -> {current['fingerprint']}")
+        if _slower(current, base, time_tolerance):
+            failures.append(f"{key}: {current['seconds'] * 1000:.1f} ms vs baseline {base['seconds'] * 1000:.1f} ms")
+        if current["peak_bytes"] > base["peak_bytes"] * memory_tolerance and \
+                current["peak_bytes"] - base["peak_bytes"] > 1024 * 1024:
+            failures.append(f"{key}: peak {current['peak_bytes'] / 2**20:.1f} MB vs baseline "
+                            f"{base['peak_bytes'] / 2**20:.1f} MB")
+    return failures
+
+
+def library_versions() -> dict:
+    """Interpreter and library versions the timings depend on (matplotlib read without importing it)."""
+    from importlib.metadata import PackageNotFoundError, version
+
+    try:
+        mpl = version("matplotlib")
+    except PackageNotFoundError:
+        mpl = None
+    return {"python": platform.python_version(), "numpy": np.__version__, "pandas": pd.__version__,
+            "matplotlib": mpl}
+
+
+def load_baseline(path=BASELINE_FILE) -> tuple[dict, dict]:
+    """(results, recorded versions); both empty when there is no baseline."""
+    if not os.path.exists(path):
+        return {}, {}
+    with open(path, "r") as f:
+        stored = json.load(f)
+    return stored["results"], {key: stored.get(key) for key in VERSION_KEYS}
+
+
+def save_baseline(results, path=BASELINE_FILE):
+    with open(path, "w") as f:
+        json.dump({
+            **library_versions(),
+            "machine": platform.machine(),
+            "results": results
+        }, f, indent=2, sort_keys=True)
+
+
+def print_results(results, baseline):
+    print(f"{'case':<42}{'time':>12}{'baseline':>12}{'peak MB':>10}")
+    for key, r in results.items():
+        base = baseline.get(key)
+        base_ms = f"{base['seconds'] * 1000:.2f} ms" if base else "-"
+        print(f"{key:<42}{r['seconds'] * 1000:>9.2f} ms{base_ms:>12}{r['peak_bytes'] / 2**20:>10.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline benchmark and regression suite")
+    parser.add_argument("--scales", nargs="+", choices=list(SCALES), default=list(SCALES))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--save", action="store_true", help="Overwrite the stored baseline with this run")
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--time-tolerance", type=float, default=TIME_TOLERANCE)
+    parser.add_argument("--micro", action="store_true", help="Run the micro benchmarks instead")
+    args = parser.parse_args()
+
+    if args.micro:
+        bench_decision_per_row_vs_batch()
+        bench_greeks_and_iv()
+        bench_rank_grid_vs_exact()
+        sys.exit(0)
+
+    results = run_suite(args.scales, args.repeat)
+    baseline, recorded = load_baseline(args.baseline)
+    print_results(results, baseline)
+
+    if args.save:
+        save_baseline(results, args.baseline)
+        print(f"\n📁 Baseline saved to {args.baseline}")
+        sys.exit(0)
+    if not baseline:
+        print("\n⚠️ No baseline found; run with --save to record one.")
+        sys.exit(0)
+    mismatched = {key: (recorded[key], value) for key, value in library_versions().items()
+                  if recorded[key] != value}
+    if mismatched:
+        # Timings and peaks from other library versions say nothing about this code
+        print("\n⚠️ Baseline was recorded with different versions; skipping the comparison:")
+        for key, (was, now) in mismatched.items():
+            print(f"  {key}: {was} (baseline) vs {now}")
+        sys.exit(0)
+
+    results = confirm_slow(results, baseline, args.repeat, args.time_tolerance)
+    failures = compare(results, baseline, time_tolerance=args.time_tolerance)
+    if failures:
+        print("\n❌ REGRESSIONS:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("\n✅ No regressions against baseline.")
@@ -0,0 +1,175 @@
+# src/bulk_fetcher.py
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+import pandas as pd
+
+from instrumentation import timed, track_fetch
+
+RATE_LIMIT_MARKERS = ("too many requests", "rate limit", "429")
+
+
+def select_expirations(expirations, selector="all"):
+    """
+    Picks expirations from a ticker's list.
+    selector: "all", an int N (next N expirations) or a (start, end) tuple of YYYY-MM-DD dates.
+    """
+    expirations = sorted(expirations)
+    if selector == "all" or selector is None:
+        return expirations
+    if isinstance(selector, int):
+        return expirations[:selector]
+    start, end = selector
+    start = date.fromisoformat(start) if start else date.min
+    end = date.fromisoformat(end) if end else date.max
+    return [exp for exp in expirations if start <= date.fromisoformat(exp) <= end]
+
+
+def _is_rate_limited(error):
+    if type(error).__name__ == "YFRateLimitError":
+        return True
+    message = str(error).lower()
+    return any(marker in message for marker in RATE_LIMIT_MARKERS)
+
+
+def _with_backoff(fn, max_retries, backoff):
+    for attempt in range(max_retries + 1):
+        try:
+            return fn()
+        except Exception as e:
+            if attempt == max_retries or not _is_rate_limited(e):
+                raise
+            time.sleep(backoff * (2 ** attempt) * (1 + random.random()))
+
+
+def _default_ticker_factory(session=None):
+    """yf.Ticker factory; without an explicit session each worker thread gets its own requests.Session."""
+    import yfinance as yf
+    if session is not None:
+        return lambda symbol: yf.Ticker(symbol, session=session)
+
+    import requests
+    local = threading.local()
+
+    def factory(symbol):
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        return yf.Ticker(symbol, session=local.session)
+    return factory
+
+
+class StubTicker:
+    """
+    Offline stand-in for yf.Ticker: `.options` and `.option_chain(expiration).puts` from
+    in-memory chains. `failures` maps an expiration (or None for `.options`) to a list of
+    exceptions raised on successive calls before the data is returned, e.g.
+    {"2030-01-04": [Exception("429 Too Many Requests")]} to exercise retries.
+    """
+
+    def __init__(self, chains: dict, failures: dict = None):
+        self.chains = chains
+        self.failures = {k: list(v) for k, v in (failures or {}).items()}
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def _maybe_fail(self, key):
+        with self._lock:
+            self.calls.append(key)
+            pending = self.failures.get(key)
+            error = pending.pop(0) if pending else None
+        if error is not None:
+            raise error
+
+    @property
+    def options(self):
+        self._maybe_fail(None)
+        return tuple(self.chains)
+
+    def option_chain(self, expiration):
+        self._maybe_fail(expiration)
+        return type("OptionChain", (), {"puts": self.chains[expiration].copy()})()
+
+
+def stub_ticker_factory(stubs: dict):
+    """ticker_factory for fetch_put_chains serving {symbol: StubTicker}; unknown symbols raise KeyError."""
+    return lambda symbol: stubs[symbol]
+
+
+@timed("fetch.fetch_put_chains")
+def fetch_put_chains(
+    tickers,
+    selector="all",
+    max_workers: int = 8,
+    ticker_factory=None,
+    session=None,
+    cache=None,
+    max_retries: int = 4,
+    backoff: float = 1.0
+) -> pd.DataFrame:
+    """
+    Fetches PUT chains for every ticker and selected expiration concurrently.
+
+    Returns one frame with "ticker" and "expiration" columns prepended. Failed
+    (ticker, expiration) pairs are skipped and listed in df.attrs["errors"].
+
+    ticker_factory(symbol) may return any object exposing `.options` and
+    `.option_chain(expiration).puts` (e.g. StubTicker via stub_ticker_factory).
+    By default every worker thread uses its own HTTP session; an explicit
+    `session` is shared by all workers and must be safe for that.
+    """
+    if isinstance(tickers, str):
+        tickers = [tickers]
+    if ticker_factory is None:
+        ticker_factory = _default_ticker_factory(session)
+
+    def cached(symbol, expiration, endpoint, fetch):
+        fetch = track_fetch(endpoint, fetch)
+        if cache is None:
+            return fetch()
+        return cache.get_or_fetch(symbol, expiration, endpoint, fetch)
+
+    def fetch_expirations(symbol):
+        return cached(symbol, None, "expirations",
+                      lambda: tuple(_with_backoff(lambda: ticker_factory(symbol).options, max_retries, backoff)))
+
+    def fetch_chain(symbol, expiration):
+        return cached(symbol, expiration, "put_chain",
+                      lambda: _with_backoff(lambda: ticker_factory(symbol).option_chain(expiration).puts,
+                                            max_retries, backoff))
+
+    errors = []
+    frames = []
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        exp_futures = {symbol: pool.submit(fetch_expirations, symbol) for symbol in tickers}
+
+        chain_futures = {}
+        for symbol, future in exp_futures.items():
+            try:
+                expirations = select_expirations(future.result(), selector)
+            except Exception as e:
+                errors.append((symbol, None, str(e)))
+                continue
+            for expiration in expirations:
+                chain_futures[(symbol, expiration)] = pool.submit(fetch_chain, symbol, expiration)
+
+        for (symbol, expiration), future in chain_futures.items():
+            try:
+                puts = future.result()
+            except Exception as e:
+                errors.append((symbol, expiration, str(e)))
+                continue
+            puts = puts.copy()
+            puts.insert(0, "expiration", expiration)
+            puts.insert(0, "ticker", symbol)
+            frames.append(puts)
+
+    for symbol, expiration, message in errors:
+        print(f"⚠️ Could not fetch {symbol} {expiration or 'expirations'}: {message}")
+
+    result = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=["ticker", "expiration"])
+    result.attrs["errors"] = errors
+    return result
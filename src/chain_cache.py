@@ -0,0 +1,286 @@
+# src/chain_cache.py
+
+import json
+import os
+import threading
+import time
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+import instrumentation
+
+try:
+    import fcntl
+except ImportError:  # Windows: index merges still happen, without a cross-process lock
+    fcntl = None
+
+CACHE_DIR = os.path.join(os.path.dirname(__file__), '../cache')
+INDEX_FILE = "index.json"
+LOCK_FILE = "index.lock"
+
+# Seconds before an entry is refetched, per endpoint
+CACHE_TTLS = {
+    "info": 60,
+    "expirations": 3600,
+    "put_chain": 300,
+    "history": 900
+}
+MAX_CACHE_BYTES = 256 * 1024 * 1024
+
+
+def _fetched_after_expiration(expiration, fetched_at):
+    """True when the entry was fetched after its expiration date, i.e. holds the settled chain."""
+    try:
+        return date.fromisoformat(str(expiration)) < date.fromtimestamp(fetched_at)
+    except ValueError:
+        return False
+
+
+def save_frame(path, df: pd.DataFrame):
+    """
+    Writes a DataFrame as one typed array per column (npz, no pickling) to a path or binary
+    file object. Nulls in string columns are kept.
+    """
+    arrays = {}
+    meta = {"columns": [str(c) for c in df.columns], "tz": {}, "index": None, "nulls": []}
+
+    def pack(name, values):
+        if isinstance(values.dtype, pd.DatetimeTZDtype):
+            meta["tz"][name] = str(values.dtype.tz)
+            values = values.dt.tz_convert("UTC").dt.tz_localize(None)
+        arr = values.to_numpy()
+        if arr.dtype == object:
+            nulls = values.isna().to_numpy()
+            if nulls.any():
+                meta["nulls"].append(name)
+                arrays[name + "__nulls__"] = nulls
+            arr = values.astype(str).to_numpy().astype(np.str_)
+        arrays[name] = arr
+
+    for col in df.columns:
+        pack(str(col), df[col])
+    if not isinstance(df.index, pd.RangeIndex):
+        meta["index"] = df.index.name or "__index__"
+        pack("__index__", df.index.to_series())
+
+    arrays["__meta__"] = np.array(json.dumps(meta))
+    if hasattr(path, "write"):
+        np.savez(path, **arrays)
+        return
+    with open(path, "wb") as f:
+        np.savez(f, **arrays)
+
+
+def load_frame(path) -> pd.DataFrame:
+    with np.load(path, allow_pickle=False) as data:
+        meta = json.loads(str(data["__meta__"]))
+
+        def unpack(name):
+            values = pd.Series(data[name])
+            if name in meta["tz"]:
+                values = values.dt.tz_localize("UTC").dt.tz_convert(meta["tz"][name])
+            if name in meta.get("nulls", ()):
+                values = values.astype(object).mask(data[name + "__nulls__"], None)
+            return values
+
+        df = pd.DataFrame({col: unpack(col) for col in meta["columns"]})
+        if meta["index"] is not None:
+            df.index = pd.Index(unpack("__index__"), name=None if meta["index"] == "__index__" else meta["index"])
+    return df
+
+
+class ChainCache:
+    """
+    Persistent cache for Yahoo responses keyed by (ticker, expiration, endpoint).
+    DataFrames are stored columnar (npz), everything else as JSON.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, ttls=None, max_bytes=MAX_CACHE_BYTES):
+        self.cache_dir = cache_dir
+        self.ttls = dict(CACHE_TTLS, **(ttls or {}))
+        self.max_bytes = max_bytes
+        self.enabled = True
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+        self._lock = threading.RLock()
+        self._index = None
+
+    # --- index bookkeeping ---
+    def _index_path(self):
+        return os.path.join(self.cache_dir, INDEX_FILE)
+
+    def _read_index_file(self):
+        try:
+            with open(self._index_path(), "r") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _load_index(self):
+        if self._index is None:
+            self._index = self._read_index_file()
+        return self._index
+
+    def _file_lock(self):
+        """Exclusive lock shared by every process using this cache directory."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        lock = open(os.path.join(self.cache_dir, LOCK_FILE), "a")
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        return lock  # closing it releases the lock
+
+    def _merge_index(self):
+        """Folds entries written by other processes into ours; the newer write of a key wins."""
+        ours = self._load_index()
+        on_disk = self._read_index_file()
+        for key in [k for k in ours if k not in on_disk]:
+            if not os.path.exists(os.path.join(self.cache_dir, ours[key]["file"])):
+                del ours[key]  # evicted or cleared by another process
+        for key, entry in on_disk.items():
+            mine = ours.get(key)
+            if mine is None or entry["created"] > mine["created"]:
+                ours[key] = entry
+            else:
+                mine["last_access"] = max(mine["last_access"], entry["last_access"])
+        return ours
+
+    def _save_index(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = f"{self._index_path()}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._index, f)
+        os.replace(tmp_path, self._index_path())
+
+    @staticmethod
+    def make_key(ticker, expiration, endpoint):
+        return f"{ticker}|{expiration or ''}|{endpoint}"
+
+    def _is_fresh(self, entry, endpoint, expiration, ttl=None):
+        if endpoint == "put_chain" and _fetched_after_expiration(expiration, entry["created"]):
+            return True  # settled chains never change
+        ttl = self.ttls.get(endpoint, 0) if ttl is None else min(ttl, self.ttls.get(endpoint, 0))
+        return time.time() - entry["created"] < ttl
+
+    def _cached_value(self, key, endpoint, expiration, ttl=None):
+        entry = self._load_index().get(key)
+        if entry is None or not self._is_fresh(entry, endpoint, expiration, ttl):
+            return None
+        try:
+            value = self._read(entry)
+        except (FileNotFoundError, OSError, ValueError):
+            return None
+        if value is not None:
+            # Access times reach disk with the next write; hits never rewrite the index
+            entry["last_access"] = time.time()
+            self.hits += 1
+            instrumentation.count(f"cache.hit.{endpoint}")
+            self.saved_seconds += entry.get("fetch_seconds", 0.0)
+        return value
+
+    # --- public API ---
+    def get_or_fetch(self, ticker, expiration, endpoint, fetch, ttl=None):
+        """
+        Returns the cached value for the key, calling fetch() on a miss or stale entry.
+        `ttl` caps the endpoint's TTL for this call only (e.g. a poller that needs fresh quotes).
+        """
+        if not self.enabled:
+            return fetch()
+
+        key = self.make_key(ticker, expiration, endpoint)
+        with self._lock:
+            value = self._cached_value(key, endpoint, expiration, ttl)
+            if value is not None:
+                return value
+            # Another process may have fetched it since our index was loaded
+            self._merge_index()
+            value = self._cached_value(key, endpoint, expiration, ttl)
+            if value is not None:
+                return value
+
+        start = time.perf_counter()
+        value = fetch()
+        elapsed = time.perf_counter() - start
+
+        instrumentation.count(f"cache.miss.{endpoint}")
+        with self._lock:
+            self.misses += 1
+            self._write(key, value, elapsed)
+        return value
+
+    def stats(self):
+        with self._lock:
+            index = self._load_index()
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "saved_seconds": self.saved_seconds,
+                "entries": len(index),
+                "bytes": sum(e["size"] for e in index.values())
+            }
+
+    def clear(self):
+        with self._lock, self._file_lock():
+            for entry in self._merge_index().values():
+                try:
+                    os.remove(os.path.join(self.cache_dir, entry["file"]))
+                except FileNotFoundError:
+                    pass
+            self._index = {}
+            self._save_index()
+
+    # --- storage ---
+    def _read(self, entry):
+        path = os.path.join(self.cache_dir, entry["file"])
+        if entry["kind"] == "frame":
+            return load_frame(path)
+        with open(path, "r") as f:
+            value = json.load(f)
+        return tuple(value) if entry["kind"] == "tuple" else value
+
+    def _write(self, key, value, elapsed):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        safe_name = "".join(c if c.isalnum() or c in "-_" else "_" for c in key)
+        if isinstance(value, pd.DataFrame):
+            kind, filename = "frame", safe_name + ".npz"
+        else:
+            kind, filename = "tuple" if isinstance(value, tuple) else "json", safe_name + ".json"
+        path = os.path.join(self.cache_dir, filename)
+        tmp_path = f"{path}.{os.getpid()}.tmp"  # readers in other processes never see a partial file
+        if kind == "frame":
+            save_frame(tmp_path, value)
+        else:
+            with open(tmp_path, "w") as f:
+                json.dump(list(value) if kind == "tuple" else value, f)
+        os.replace(tmp_path, path)
+
+        now = time.time()
+        entry = {
+            "file": filename,
+            "kind": kind,
+            "created": now,
+            "last_access": now,
+            "fetch_seconds": elapsed,
+            "size": os.path.getsize(path)
+        }
+        with self._file_lock():
+            self._merge_index()[key] = entry
+            self._evict()
+            self._save_index()
+
+    def _evict(self):
+        index = self._load_index()
+        total = sum(e["size"] for e in index.values())
+        for key in sorted(index, key=lambda k: index[k]["last_access"]):
+            if total <= self.max_bytes:
+                break
+            entry = index.pop(key)
+            total -= entry["size"]
+            try:
+                os.remove(os.path.join(self.cache_dir, entry["file"]))
+            except FileNotFoundError:
+                pass
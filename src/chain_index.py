@@ -0,0 +1,86 @@
+# src/chain_index.py
+# Strike-sorted, array-backed view of a PUT chain for repeated filtering.
+# Built once per chain; each filter is a binary search for the moneyness window, one fused
+# mask over that slice and a partial selection for the nearest-to-ATM ordering.
+
+import numpy as np
+import pandas as pd
+
+
+class ChainIndex:
+    """
+    Holds strike, volume, mid and IV as contiguous float arrays sorted by strike, plus the
+    position of every entry in the source frame. The source frame is never copied; only
+    selected rows are materialized by to_frame().
+    """
+
+    def __init__(self, puts_df: pd.DataFrame):
+        strikes = puts_df["strike"].to_numpy(dtype=np.float64)
+        self.order = np.argsort(strikes, kind="stable")
+        self.strike = strikes[self.order]
+        self.volume = self._column(puts_df, "volume")
+        self.has_mid = "mid_price" in puts_df.columns
+        if self.has_mid:
+            self.mid = self._column(puts_df, "mid_price")
+        else:
+            self.mid = (self._column(puts_df, "bid") + self._column(puts_df, "ask")) / 2
+        self.iv = self._column(puts_df, "impliedVolatility") if "impliedVolatility" in puts_df.columns else None
+        self.frame = puts_df
+
+    def _column(self, df, name):
+        return df[name].to_numpy(dtype=np.float64)[self.order]
+
+    def __len__(self):
+        return len(self.strike)
+
+    def window(self, current_price, moneyness_range) -> slice:
+        """Sorted positions with strike inside [low, high] x current_price (inclusive, like Series.between)."""
+        lo = np.searchsorted(self.strike, current_price * moneyness_range[0], side="left")
+        hi = np.searchsorted(self.strike, current_price * moneyness_range[1], side="right")
+        return slice(lo, max(lo, hi))
+
+    def select(self, current_price, min_volume=100, moneyness_range=(0.95, 1.05), top_n=None,
+               min_iv=None) -> np.ndarray:
+        """
+        Source-frame positions passing the filters, nearest to ATM first.
+        Without top_n, ties come out in the same order as filter_puts' former
+        sort_values("abs_diff"). With top_n, only that many rows are ordered
+        (argpartition) instead of sorting the whole window, and ties keep source order.
+        """
+        window = self.window(current_price, moneyness_range)
+        mask = (self.volume[window] >= min_volume) & (self.mid[window] > 0)
+        if min_iv is not None and self.iv is not None:
+            mask &= self.iv[window] >= min_iv
+
+        hits = np.flatnonzero(mask) + window.start
+        distance = np.abs(self.strike[hits] - current_price)
+        positions = self.order[hits]
+        if top_n is None:
+            source_order = np.argsort(positions)
+            positions = positions[source_order]
+            return positions[np.argsort(distance[source_order], kind="quicksort")]
+        if top_n < len(hits):
+            keep = np.argpartition(distance, top_n - 1)[:top_n] if top_n > 0 else np.empty(0, dtype=np.intp)
+            distance, positions = distance[keep], positions[keep]
+        return positions[np.lexsort((positions, distance))]
+
+    def to_frame(self, positions, current_price) -> pd.DataFrame:
+        """Rows at `positions` with the derived columns filter_puts adds, in filter_puts' column order."""
+        rows = self.frame.iloc[positions]
+        strikes = rows["strike"].to_numpy(dtype=np.float64)
+        mid = rows["mid_price"].to_numpy(dtype=np.float64) if self.has_mid \
+            else (rows["bid"].to_numpy(dtype=np.float64) + rows["ask"].to_numpy(dtype=np.float64)) / 2
+        intrinsic = strikes - current_price
+        derived = {} if self.has_mid else {"mid_price": mid}
+        derived.update(intrinsic_value=intrinsic, time_value=mid - intrinsic, abs_diff=np.abs(intrinsic))
+        return rows.assign(**derived).reset_index(drop=True)
+
+    def filter(self, current_price, min_volume=100, moneyness_range=(0.95, 1.05), top_n=None) -> pd.DataFrame:
+        return self.to_frame(self.select(current_price, min_volume, moneyness_range, top_n), current_price)
+
+    def sweep(self, current_price, configs, top_n=None) -> list:
+        """
+        Positions for each filter config (dicts of min_volume / moneyness_range / min_iv).
+        Nothing is materialized, so thousands of variants cost a few array ops each.
+        """
+        return [self.select(current_price, top_n=top_n, **config) for config in configs]
@@ -1,6 +1,8 @@
 import os
 import shutil
 
+from session_manager import clear_session
+
 def clean_up_logs_and_cache():
     try:
         os.remove("logs/hedge_logs.csv")
@@ -8,8 +10,5 @@ def clean_up_logs_and_cache():
     except FileNotFoundError:
         print("ℹ️ No hedge log found to delete.")
 
-    try:
-        os.remove("session/selected_exp.txt")
-        print("✅ Deleted session expiration file")
-    except FileNotFoundError:
-        print("ℹ️ No session file found to delete.")
+    clear_session()
+    print("✅ Cleared session state")
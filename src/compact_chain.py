@@ -0,0 +1,244 @@
+# src/compact_chain.py
+# Compact, array-backed PUT chains for holding many intraday chains in memory.
+#
+# Prices and IVs are float32, volume/open interest int32, contract symbols int32 codes into a
+# SymbolTable shared across chains, and ticker/expiration small-int codes (categoricals).
+# to_frame() wraps the arrays in a DataFrame without copying them, so filter_puts, ChainIndex
+# and the simulators run on it unchanged; save()/load() persist one .npy per column and load
+# them memory-mapped.
+# Used where many chains are held at once (ReplayQuoteSource(compact=True)); the live monitor and
+# the backtester keep one mutable frame per chain at a time, so they stay on DataFrames.
+
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+SYMBOL_COLUMN = "contractSymbol"
+CATEGORY_COLUMNS = ("ticker", "expiration")
+COUNT_COLUMNS = ("volume", "openInterest")   # NaN (no trades reported) is stored as 0
+DROP_COLUMNS = ("change", "percentChange", "contractSize", "currency")  # unused by the analyzers
+META_FILE = "meta.json"
+SYMBOLS_FILE = "_symbols.npy"
+
+
+def _code_dtype(n):
+    """Same code width pandas picks for n categories, so Categorical.from_codes shares the array."""
+    for dtype in (np.int8, np.int16, np.int32):
+        if n < np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+class SymbolTable:
+    """
+    Interns contract symbols to int32 codes. Share one table across every chain of a
+    watchlist so each symbol string is stored once, however many snapshots reference it.
+    Safe to intern from several threads.
+    """
+
+    def __init__(self, symbols=()):
+        self.symbols = []
+        self.codes = {}
+        self._index = None
+        self._lock = threading.Lock()
+        if len(symbols):
+            self.intern(symbols)
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def intern(self, values) -> np.ndarray:
+        """int32 codes for `values`, adding unseen symbols to the table."""
+        local_codes, uniques = pd.factorize(pd.Series(values, dtype=object).fillna(""), sort=False)
+        mapping = np.empty(len(uniques), dtype=np.int32)
+        with self._lock:
+            for i, symbol in enumerate(uniques):
+                code = self.codes.get(symbol)
+                if code is None:
+                    code = self.codes[symbol] = len(self.symbols)
+                    self.symbols.append(symbol)
+                    self._index = None
+                mapping[i] = code
+        return mapping[local_codes]
+
+    def index(self) -> pd.Index:
+        """All symbols as a cached Index, used as the categories of every chain's contractSymbol."""
+        with self._lock:
+            if self._index is None:
+                self._index = pd.Index(self.symbols, dtype=object)
+            return self._index
+
+    def lookup(self, codes) -> np.ndarray:
+        return self.index().to_numpy()[np.asarray(codes)]
+
+
+class CompactChain:
+    """
+    Column arrays of one or more PUT chains. `columns` holds numeric/bool/datetime arrays
+    keyed by the yfinance column name; `codes` holds contractSymbol/ticker/expiration codes
+    and `categories` the ticker/expiration values they index. Without `symbols` the chain
+    gets its own SymbolTable, freed with it; pass one table to share it across chains.
+    """
+
+    def __init__(self, columns: dict, codes: dict, categories: dict, symbols: SymbolTable = None):
+        self.columns = columns
+        self.codes = codes
+        self.categories = categories
+        self.symbols = symbols if symbols is not None else SymbolTable()
+        self.order = [name for name in columns]
+
+    def __len__(self):
+        arrays = list(self.columns.values()) + list(self.codes.values())
+        return len(arrays[0]) if arrays else 0
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by this chain's arrays (the shared symbol table is not included)."""
+        return sum(arr.nbytes for arr in self.columns.values()) + sum(arr.nbytes for arr in self.codes.values())
+
+    # --- conversion ---
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, ticker=None, expiration=None, symbols: SymbolTable = None) -> "CompactChain":
+        """
+        Encodes a yfinance-style chain. `ticker` and `expiration` fill those columns when the
+        frame has none. Columns that already have the compact dtype (e.g. a frame produced by
+        to_frame()) are referenced, not copied. Other string columns are dropped.
+        """
+        symbols = symbols if symbols is not None else SymbolTable()
+        columns, codes, categories = {}, {}, {}
+        n = len(df)
+
+        for name, value in (("ticker", ticker), ("expiration", expiration)):
+            if name in df.columns:
+                values = df[name]
+                if isinstance(values.dtype, pd.CategoricalDtype):
+                    cats, local = values.cat.categories, values.cat.codes.to_numpy()
+                else:
+                    local, cats = pd.factorize(values.astype(str))
+                categories[name] = [str(c) for c in cats]
+                codes[name] = local.astype(_code_dtype(len(cats)), copy=False)
+            elif value is not None:
+                categories[name] = [str(value)]
+                codes[name] = np.zeros(n, dtype=np.int8)
+
+        for name in df.columns:
+            if name in CATEGORY_COLUMNS or name in DROP_COLUMNS:
+                continue
+            values = df[name]
+            if name == SYMBOL_COLUMN:
+                if isinstance(values.dtype, pd.CategoricalDtype):
+                    local = values.cat.codes.to_numpy()
+                    if values.cat.categories is symbols.index():
+                        codes[name] = local.astype(np.int32, copy=False)
+                    else:
+                        codes[name] = np.append(symbols.intern(values.cat.categories), symbols.intern([""]))[local]
+                else:
+                    codes[name] = symbols.intern(values.to_numpy())
+            elif isinstance(values.dtype, pd.DatetimeTZDtype) or pd.api.types.is_datetime64_any_dtype(values):
+                utc = values.dt.tz_convert("UTC").dt.tz_localize(None) if values.dt.tz is not None else values
+                columns[name] = utc.to_numpy().astype("datetime64[s]", copy=False)
+            elif pd.api.types.is_bool_dtype(values):
+                columns[name] = values.to_numpy(dtype=bool)
+            elif name in COUNT_COLUMNS:
+                arr = values.to_numpy()
+                columns[name] = arr if arr.dtype == np.int32 else np.nan_to_num(arr.astype(np.float64)).astype(np.int32)
+            elif pd.api.types.is_integer_dtype(values):
+                columns[name] = values.to_numpy().astype(np.int32, copy=False)
+            elif pd.api.types.is_float_dtype(values):
+                columns[name] = values.to_numpy(dtype=np.float32)
+        return cls(columns, codes, categories, symbols)
+
+    def to_frame(self, columns=None, symbols_as="category") -> pd.DataFrame:
+        """
+        DataFrame view over the arrays: numeric columns and ticker/expiration codes are shared, not
+        copied; contractSymbol codes are too once the symbol table needs int32 codes, and are cast
+        to pandas' narrower code dtype for smaller tables. symbols_as="object" materializes
+        contractSymbol as strings (a copy) for code that needs them.
+        lastTradeDate comes back as naive UTC datetime64[s].
+        """
+        wanted = columns or ([n for n in CATEGORY_COLUMNS if n in self.codes]
+                             + ([SYMBOL_COLUMN] if SYMBOL_COLUMN in self.codes else []) + self.order)
+        data = {}
+        for name in wanted:
+            if name == SYMBOL_COLUMN:
+                codes = self.codes[name]
+                if symbols_as == "object":
+                    data[name] = self.symbols.lookup(codes)
+                else:
+                    data[name] = pd.Categorical.from_codes(codes, categories=self.symbols.index())
+            elif name in self.categories:
+                data[name] = pd.Categorical.from_codes(self.codes[name], categories=self.categories[name])
+            else:
+                data[name] = self.columns[name]
+        return pd.DataFrame(data, copy=False)
+
+    def take(self, positions) -> "CompactChain":
+        """Rows at `positions` (a boolean mask or integer positions), sharing the symbol table."""
+        return CompactChain({k: v[positions] for k, v in self.columns.items()},
+                            {k: v[positions] for k, v in self.codes.items()},
+                            dict(self.categories), self.symbols)
+
+    @classmethod
+    def concat(cls, chains) -> "CompactChain":
+        """Stacks chains that share one SymbolTable, remapping ticker/expiration codes."""
+        chains = list(chains)
+        if not chains:
+            return cls({}, {}, {})
+        symbols = chains[0].symbols
+        if any(chain.symbols is not symbols for chain in chains):
+            raise ValueError("CompactChain.concat needs chains built on the same SymbolTable")
+
+        columns = {name: np.concatenate([chain.columns[name] for chain in chains]) for name in chains[0].order}
+        codes, categories = {}, {}
+        if all(SYMBOL_COLUMN in chain.codes for chain in chains):
+            codes[SYMBOL_COLUMN] = np.concatenate([chain.codes[SYMBOL_COLUMN] for chain in chains])
+        for name in CATEGORY_COLUMNS:
+            if not all(name in chain.categories for chain in chains):
+                continue
+            merged = list(dict.fromkeys(value for chain in chains for value in chain.categories[name]))
+            position = {value: i for i, value in enumerate(merged)}
+            dtype = _code_dtype(len(merged))
+            parts = []
+            for chain in chains:
+                remap = np.array([position[value] for value in chain.categories[name]], dtype=dtype)
+                parts.append(remap[chain.codes[name]])
+            codes[name], categories[name] = np.concatenate(parts), merged
+        return cls(columns, codes, categories, symbols)
+
+    # --- persistence ---
+    def save(self, path: str, include_symbols=True) -> str:
+        """
+        Writes <path>/<column>.npy per array plus meta.json. The symbol table is written to
+        _symbols.npy unless include_symbols=False (then the caller persists it once for all chains).
+        """
+        os.makedirs(path, exist_ok=True)
+        for name, arr in list(self.columns.items()) + list(self.codes.items()):
+            np.save(os.path.join(path, f"{name}.npy"), np.ascontiguousarray(arr))
+        if include_symbols:
+            np.save(os.path.join(path, SYMBOLS_FILE), np.asarray(self.symbols.symbols, dtype=np.str_))
+        meta = {"rows": len(self), "columns": self.order, "codes": list(self.codes), "categories": self.categories}
+        with open(os.path.join(path, META_FILE), "w") as f:
+            json.dump(meta, f)
+        return path
+
+    @classmethod
+    def load(cls, path: str, mmap=True, symbols: SymbolTable = None) -> "CompactChain":
+        """
+        Reads a saved chain; with mmap=True arrays are read-only memory maps paged in on use.
+        Pass `symbols` when the chain was saved with include_symbols=False.
+        """
+        with open(os.path.join(path, META_FILE), "r") as f:
+            meta = json.load(f)
+        mode = "r" if mmap else None
+        columns = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mode) for name in meta["columns"]}
+        codes = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mode) for name in meta["codes"]}
+
+        symbols_path = os.path.join(path, SYMBOLS_FILE)
+        if symbols is None and os.path.exists(symbols_path):
+            symbols = SymbolTable(np.load(symbols_path).tolist())
+        elif symbols is None and SYMBOL_COLUMN in codes:
+            raise ValueError(f"{path} was saved without its symbol table; pass the shared SymbolTable")
+        return cls(columns, codes, meta["categories"], symbols)
@@ -2,29 +2,43 @@
 import yfinance as yf
 from datetime import datetime
 
-def get_stock_info(ticker_symbol="TSLA"):
-    ticker = yf.Ticker(ticker_symbol)
-    info = ticker.info
-    return {
-        "current_price": info.get("regularMarketPrice"),
-        "previous_close": info.get("previousClose"),
-        "market_cap": info.get("marketCap"),
-        "beta": info.get("beta"),
-        "symbol": ticker_symbol
-    }
+from chain_cache import ChainCache
+from instrumentation import track_fetch
 
-def get_option_expirations(ticker_symbol="TSLA"):
-    ticker = yf.Ticker(ticker_symbol)
-    return ticker.options  # returns a list of expiration dates
+# Shared on-disk cache; set cache.enabled = False to always hit the network
+cache = ChainCache()
 
-def get_put_option_chain(ticker_symbol="TSLA", expiration=None):
-    ticker = yf.Ticker(ticker_symbol)
+def get_stock_info(ticker_symbol="TSLA", ttl=None):
+    def fetch():
+        ticker = yf.Ticker(ticker_symbol)
+        info = ticker.info
+        return {
+            "current_price": info.get("regularMarketPrice"),
+            "previous_close": info.get("previousClose"),
+            "market_cap": info.get("marketCap"),
+            "beta": info.get("beta"),
+            "symbol": ticker_symbol
+        }
+    return cache.get_or_fetch(ticker_symbol, None, "info", track_fetch("info", fetch), ttl=ttl)
+
+def get_option_expirations(ticker_symbol="TSLA", ttl=None):
+    def fetch():
+        ticker = yf.Ticker(ticker_symbol)
+        return ticker.options  # returns a list of expiration dates
+    return cache.get_or_fetch(ticker_symbol, None, "expirations", track_fetch("expirations", fetch), ttl=ttl)
+
+def get_put_option_chain(ticker_symbol="TSLA", expiration=None, ttl=None):
     if expiration is None:
-        expiration = ticker.options[0]  # soonest expiry by default
+        expiration = get_option_expirations(ticker_symbol)[0]  # soonest expiry by default
 
-    option_chain = ticker.option_chain(expiration)
-    return option_chain.puts  # DataFrame
+    def fetch():
+        ticker = yf.Ticker(ticker_symbol)
+        option_chain = ticker.option_chain(expiration)
+        return option_chain.puts  # DataFrame
+    return cache.get_or_fetch(ticker_symbol, expiration, "put_chain", track_fetch("put_chain", fetch), ttl=ttl)
 
 def get_historical_price(ticker_symbol="TSLA", period="5d"):
-    ticker = yf.Ticker(ticker_symbol)
-    return ticker.history(period=period)
+    def fetch():
+        ticker = yf.Ticker(ticker_symbol)
+        return ticker.history(period=period)
+    return cache.get_or_fetch(ticker_symbol, period, "history", track_fetch("history", fetch))
@@ -0,0 +1,230 @@
+# src/dynamic_hedge.py
+# Delta- or max-loss-targeted PUT hedges rebalanced along simulated price paths,
+# with transaction costs taken from each contract's bid/ask spread.
+
+import math
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import timed
+from pricing import RISK_FREE_RATE, bs_put_price, norm_cdf, time_to_expiry
+
+SHARES_PER_CONTRACT = 100
+TRADING_DAYS = 252
+MAX_COVERAGE = 4.0  # contracts never cover more than this multiple of the shares held
+
+
+def put_delta(spot, strikes, t, vol, rate=RISK_FREE_RATE):
+    """Black-Scholes PUT delta; cheaper than bs_put_greeks when only delta is needed."""
+    vol_sqrt_t = vol * np.sqrt(t)
+    d1 = (np.log(spot / strikes) + (rate + 0.5 * vol * vol) * t) / vol_sqrt_t
+    return norm_cdf(d1) - 1.0
+
+
+def contracts_for_delta(num_shares, deltas, target_delta=0.0):
+    """
+    Contracts per candidate that bring portfolio delta (in shares) to target_delta * num_shares.
+    Candidates with no delta (deep OTM, expired) get 0.
+    """
+    deltas = np.asarray(deltas, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        n = num_shares * (1.0 - target_delta) / (-deltas * SHARES_PER_CONTRACT)
+    return np.where(np.isfinite(n) & (n > 0), n, 0.0)
+
+
+def contracts_for_max_loss(num_shares, spot, strikes, premiums, max_loss, basis=None, realized=0.0):
+    """
+    Fewest contracts (per candidate) keeping the loss at expiry within max_loss, from the
+    kinked payoff: the worst case is at price 0 or at the strike. NaN where no count works.
+    The loss is measured from `basis` (default spot); `realized` is hedge P&L already booked
+    (cash from earlier trades plus the value of contracts held), which loosens or tightens the budget.
+    """
+    strikes = np.asarray(strikes, dtype=np.float64)
+    premiums = np.asarray(premiums, dtype=np.float64)
+    basis = spot if basis is None else basis
+    budget = max_loss + realized
+    with np.errstate(divide="ignore", invalid="ignore"):
+        n = (num_shares * basis - budget) / (SHARES_PER_CONTRACT * (strikes - premiums))
+    n = np.maximum(n, 0.0)
+    loss_at_strike = num_shares * (basis - strikes) + n * SHARES_PER_CONTRACT * premiums
+    return np.where((strikes > premiums) & (loss_at_strike <= budget), n, np.nan)
+
+
+def _targets(objective, target, num_shares, spot, strikes, tau, vols, rate, premiums, basis, realized):
+    if objective == "delta":
+        n = contracts_for_delta(num_shares, put_delta(spot, strikes, tau, vols, rate), target)
+    else:
+        n = contracts_for_max_loss(num_shares, spot, strikes, premiums, target, basis, realized)
+        # When no count meets the target, covering every share minimizes the worst case
+        n = np.where(np.isnan(n), np.where(strikes > premiums, num_shares / SHARES_PER_CONTRACT, 0.0), n)
+    # Far-OTM deltas would otherwise ask for unbounded contract counts
+    return np.minimum(n, MAX_COVERAGE * num_shares / SHARES_PER_CONTRACT)
+
+
+def _run_chunk(rng, n_paths, params):
+    """
+    Walks one chunk of paths step by step. Every array is (frequencies, paths, candidates)
+    or a broadcastable slice of it; deltas are computed once per step and shared by all
+    rebalancing frequencies.
+    """
+    strikes, vols, half_spread = params["strikes"], params["vols"], params["half_spread"]
+    freqs = params["rebalance_every"][:, None, None]
+    n_steps, dt, rate = params["n_steps"], params["dt"], params["rate"]
+    shape = (len(freqs), n_paths, len(strikes))
+
+    spot = np.full((n_paths, 1), params["spot"])
+    held = np.zeros(shape)
+    cash = np.zeros(shape)
+    costs = np.zeros(shape)
+    trades = np.zeros(shape)
+    drift = (params["drift"] - 0.5 * params["path_vol"] ** 2) * dt
+    shock = params["path_vol"] * math.sqrt(dt)
+
+    for step in range(n_steps + 1):
+        if step:
+            spot = spot * np.exp(drift + shock * rng.standard_normal((n_paths, 1)))
+        tau = params["t"] - step * dt
+        if step == n_steps:
+            break
+
+        due = (step % freqs) == 0
+        price = bs_put_price(spot, strikes, tau, vols, rate)
+        # Hedge P&L booked so far if the held contracts were sold now; max_loss targets the whole path
+        realized = cash + held * price * SHARES_PER_CONTRACT
+        target = _targets(params["objective"], params["target"], params["num_shares"], spot, strikes,
+                          tau, vols, rate, price, params["spot"], realized)
+        if params["whole_contracts"]:
+            target = np.round(target)
+        trade = np.where(due, target - held, 0.0)
+        cash -= trade * price * SHARES_PER_CONTRACT
+        cost = np.abs(trade) * half_spread * SHARES_PER_CONTRACT
+        costs += cost
+        trades += trade != 0
+        held += trade
+
+    final_value = bs_put_price(spot, strikes, tau, vols, rate) if tau > 1e-8 else np.maximum(strikes - spot, 0.0)
+    stock_pnl = (spot - params["spot"]) * params["num_shares"]                # (paths, 1)
+    hedge_pnl = held * final_value * SHARES_PER_CONTRACT + cash              # frictionless option P&L
+    pnl = stock_pnl + hedge_pnl - costs
+    if params["objective"] == "delta":
+        # A continuously rebalanced book would earn target x the stock move; the rest is hedge error
+        error = stock_pnl + hedge_pnl - stock_pnl * params["target"]
+    else:
+        error = np.maximum(-params["target"] - (stock_pnl + hedge_pnl), 0.0)
+
+    return {
+        "pnl_sum": pnl.sum(axis=1),
+        "pnl_sq": (pnl * pnl).sum(axis=1),
+        "error_sum": error.sum(axis=1),
+        "error_sq": (error * error).sum(axis=1),
+        "cost_sum": costs.sum(axis=1),
+        "trades_sum": trades.sum(axis=1),
+        "premium_sum": (-cash).sum(axis=1),
+        "stock_sum": stock_pnl.sum(),
+        "stock_sq": (stock_pnl * stock_pnl).sum()
+    }
+
+
+@timed("simulate.dynamic_hedge")
+def simulate_dynamic_hedge(
+    candidates: pd.DataFrame,
+    current_price: float,
+    num_shares: float,
+    expiration: str = None,
+    t: float = None,
+    horizon_days: int = None,
+    rebalance_every=(1, 5, 21),
+    objective: str = "delta",
+    target: float = 0.5,
+    vol: float = None,
+    drift: float = 0.0,
+    rate: float = RISK_FREE_RATE,
+    whole_contracts: bool = True,
+    n_paths: int = 20_000,
+    chunk_size: int = 2_000,
+    seed: int = 42
+) -> tuple[pd.DataFrame, dict]:
+    """
+    Simulates rebalancing a hedge in each candidate PUT every N trading days, for each N in
+    `rebalance_every`, over `n_paths` GBM paths until `horizon_days` (default: expiry).
+
+    objective="delta": hold enough contracts to keep portfolio delta at target x num_shares.
+    objective="max_loss": hold the fewest contracts keeping the loss at expiry, measured from
+    current_price and including hedge P&L already realized on the path, within `target` dollars.
+
+    Options trade at their Black-Scholes value (each candidate's own IV) plus half the chain's
+    bid/ask spread per contract traded. Paths use `vol`, defaulting to the candidates' median IV.
+    hedge_error_rmse is the RMS deviation from target x the stock move for "delta", and the
+    RMS shortfall below -target for "max_loss", both before transaction costs. total_cost is
+    the expected P&L given up versus not hedging.
+    Returns one row per (rebalance_every, strike) and the unhedged stats as metadata.
+    """
+    if objective not in ("delta", "max_loss"):
+        raise ValueError(f"Unknown objective: {objective}")
+    if np.any(np.asarray(rebalance_every) < 1):
+        raise ValueError("rebalance_every must be at least 1 trading day")
+    strikes = candidates["strike"].to_numpy(dtype=np.float64)
+    vols = candidates["impliedVolatility"].to_numpy(dtype=np.float64)
+    if "bid" in candidates.columns and "ask" in candidates.columns:
+        half_spread = np.maximum((candidates["ask"] - candidates["bid"]).to_numpy(dtype=np.float64), 0) / 2
+    else:
+        half_spread = np.zeros(len(strikes))
+    if t is None:
+        t = time_to_expiry(expiration)
+    t_days = max(int(round(t * TRADING_DAYS)), 1)
+    n_steps = min(horizon_days or t_days, t_days)
+
+    params = {
+        "strikes": strikes,
+        "vols": vols,
+        "half_spread": np.nan_to_num(half_spread),
+        "rebalance_every": np.asarray(rebalance_every, dtype=np.int64),
+        "n_steps": n_steps,
+        "dt": t / t_days,
+        "t": t,
+        "rate": rate,
+        "spot": current_price,
+        "num_shares": num_shares,
+        "objective": objective,
+        "target": target,
+        "path_vol": vol if vol is not None else float(np.nanmedian(vols)),
+        "drift": drift,
+        "whole_contracts": whole_contracts
+    }
+
+    totals = None
+    n_chunks = math.ceil(n_paths / chunk_size)
+    for i, child in enumerate(np.random.SeedSequence(seed).spawn(n_chunks)):
+        size = min(chunk_size, n_paths - i * chunk_size)
+        result = _run_chunk(np.random.default_rng(child), size, params)
+        totals = result if totals is None else {k: totals[k] + result[k] for k in totals}
+
+    def std(total, squares):
+        return np.sqrt(np.maximum(squares / n_paths - (total / n_paths) ** 2, 0))
+
+    n_freqs, n_candidates = len(params["rebalance_every"]), len(strikes)
+    df = pd.DataFrame({
+        "rebalance_every": np.repeat(params["rebalance_every"], n_candidates),
+        "strike": np.tile(strikes, n_freqs),
+        "expected_pnl": (totals["pnl_sum"] / n_paths).ravel(),
+        "pnl_std": std(totals["pnl_sum"], totals["pnl_sq"]).ravel(),
+        "hedge_error_rmse": np.sqrt(totals["error_sq"] / n_paths).ravel(),
+        "mean_transaction_cost": (totals["cost_sum"] / n_paths).ravel(),
+        "mean_option_spend": (totals["premium_sum"] / n_paths).ravel(),
+        "mean_trades": (totals["trades_sum"] / n_paths).ravel()
+    })
+    unhedged_expected = totals["stock_sum"] / n_paths
+    df["total_cost"] = unhedged_expected - df["expected_pnl"]
+
+    metadata = {
+        "n_paths": n_paths,
+        "n_steps": n_steps,
+        "seed": seed,
+        "objective": objective,
+        "target": target,
+        "path_vol": params["path_vol"],
+        "unhedged_expected_pnl": unhedged_expected,
+        "unhedged_pnl_std": float(std(totals["stock_sum"], totals["stock_sq"]))
+    }
+    return df, metadata
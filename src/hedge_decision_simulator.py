@@ -1,15 +1,24 @@
 import numpy as np
 import pandas as pd
 
-def simulate_decision(
+from instrumentation import timed
+from payoff import PiecewisePayoff, resolve_range
+
+def hedge_decision(
     current_price: float,
     avg_purchase_price: float,
     num_shares: float,
     strike: float,
     premium: float,
     hedge_budget: float,
-    budget_source: str = "cash"  # "cash" or "sell"
-) -> tuple[pd.DataFrame, dict]:
+    budget_source: str = "cash",
+    price_range=None
+) -> tuple[PiecewisePayoff, dict]:
+    """
+    The hedged position simulate_decision evaluates and its metadata, without the P&L table
+    (for callers such as the monitor that only need the numbers). ROI is at the bottom of
+    price_range (default 0.8-1.2x current price).
+    """
     shares_per_contract = 100
     option_cost = premium * shares_per_contract
     max_contracts = int(hedge_budget // option_cost)
@@ -28,24 +37,15 @@ def simulate_decision(
         shares_sold = 0
         remaining_shares = num_shares
 
-    price_range = np.linspace(current_price * 0.8, current_price * 1.2, 100)
-    hedge_payout = np.maximum(strike - price_range, 0) * shares_per_contract * max_contracts
-    stock_pnl = (price_range - avg_purchase_price) * remaining_shares
-    net_pnl = stock_pnl + hedge_payout - total_put_cost
+    payoff = PiecewisePayoff(remaining_shares, avg_purchase_price, strike, max_contracts, premium)
+    low, _ = resolve_range(current_price, price_range, default=(0.8, 1.2))
 
-    df = pd.DataFrame({
-        "Future Price ($)": price_range,
-        "Net P&L ($)": net_pnl
-    })
-
-    # ROI on hedge
-    worst_price = price_range[0]
-    hedge_profit = hedge_payout[0] - total_put_cost
+    # ROI on hedge at the bottom of the range
+    hedge_profit = float(payoff.payout(low)) - total_put_cost
     roi_on_hedge = (hedge_profit / total_put_cost) * 100
 
-    # Breakeven points (approx)
-    breakeven_low = strike - premium
-    breakeven_high = avg_purchase_price + (total_put_cost / remaining_shares)
+    # Edges of the loss zone, solved on the piecewise-linear payoff
+    exact = payoff.summary()
 
     metadata = {
         "contracts_purchased": max_contracts,
@@ -53,9 +53,39 @@ def simulate_decision(
         "roi_on_hedge": roi_on_hedge,
         "shares_sold": shares_sold,
         "remaining_shares": remaining_shares,
-        "breakeven_low": breakeven_low,
-        "breakeven_high": breakeven_high,
-        "hedge_profit": hedge_profit
+        "breakeven_low": exact["breakeven_low"],
+        "breakeven_high": exact["breakeven_high"],
+        "hedge_profit": hedge_profit,
+        "max_loss": exact["max_loss"]
     }
+    return payoff, metadata
+
+
+@timed("simulate.simulate_decision")
+def simulate_decision(
+    current_price: float,
+    avg_purchase_price: float,
+    num_shares: float,
+    strike: float,
+    premium: float,
+    hedge_budget: float,
+    budget_source: str = "cash",  # "cash" or "sell"
+    price_range=None,
+    num_points: int = 100
+) -> tuple[pd.DataFrame, dict]:
+    """
+    Net P&L over price_range ((low, high) bounds or an np.ndarray of prices; default 0.8-1.2x
+    current price). num_points=None samples only the range ends, strike and breakevens.
+    Breakevens and max_loss (the largest loss in dollars, >= 0) are exact over all prices,
+    not read off the grid; breakeven_low is NaN when the loss runs all the way down to 0.
+    """
+    payoff, metadata = hedge_decision(current_price, avg_purchase_price, num_shares, strike, premium,
+                                      hedge_budget, budget_source, price_range)
+    low, high = resolve_range(current_price, price_range, default=(0.8, 1.2))
+    prices = price_range if isinstance(price_range, np.ndarray) else payoff.sample(low, high, num_points)
 
+    df = pd.DataFrame({
+        "Future Price ($)": prices,
+        "Net P&L ($)": payoff.pnl(prices)
+    })
     return df, metadata
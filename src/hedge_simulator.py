@@ -3,31 +3,22 @@
 import numpy as np
 import pandas as pd
 
-def simulate_hedge(current_price, num_shares, strike, premium, contracts=1):
+from instrumentation import timed
+from payoff import PiecewisePayoff, resolve_range
+
+@timed("simulate.simulate_hedge")
+def simulate_hedge(current_price, num_shares, strike, premium, contracts=1, price_range=None, num_points=300):
     """
     Simulates P&L of portfolio with and without a PUT hedge.
     Returns a DataFrame with unhedged and hedged P&L across a range of future TSLA prices.
-    """
-    import numpy as np
-    import pandas as pd
-
-    price_range = np.linspace(current_price * 0.4, current_price * 1.6, 300)
-    total_stock_cost = current_price * num_shares
-    option_cost = contracts * 100 * premium
-
-    unhedged_values = price_range * num_shares
-    hedge_payouts = np.maximum(strike - price_range, 0) * contracts * 100
-    hedged_values = unhedged_values + hedge_payouts - option_cost
 
-    initial_value = total_stock_cost
-
-    df = pd.DataFrame({
-        "Future Price ($)": price_range,
-        "Unhedged P&L ($)": unhedged_values - initial_value,
-        "Hedged P&L ($)": hedged_values - initial_value,
-    })
-
-    return df
+    price_range: (low, high) bounds, or an np.ndarray of exact prices; defaults to 0.4-1.6x current price.
+    num_points=None returns only the range ends, strike and breakevens, which draw the P&L exactly.
+    """
+    payoff = PiecewisePayoff(num_shares, current_price, strike, contracts, premium)
+    low, high = resolve_range(current_price, price_range)
+    prices = price_range if isinstance(price_range, np.ndarray) else payoff.sample(low, high, num_points)
+    return payoff.frame(prices)
 # src/visualizer.py (add or replace this function)
 
 import matplotlib.pyplot as plt
@@ -0,0 +1,152 @@
+# src/incremental.py
+# Keeps a filtered/enriched chain in memory and re-derives only the rows whose quotes changed.
+
+import numpy as np
+import pandas as pd
+
+from option_analyzer import add_greeks
+from pricing import RISK_FREE_RATE, bs_put_greeks, time_to_expiry
+
+QUOTE_COLUMNS = ["lastPrice", "bid", "ask", "volume", "openInterest", "impliedVolatility"]
+SHARES_PER_CONTRACT = 100
+
+
+class IncrementalChain:
+    """
+    Live view of one expiration's PUT chain. refresh() takes a full new chain and
+    apply_updates() takes only changed rows; both re-derive the quote-dependent columns
+    (mid, lower breakeven, liquidity flag, solved IV) for the touched contracts only.
+
+    Rows are stored in strike order, so a new current_price costs nothing up front:
+    filtered() binary-searches the moneyness window and computes the price-dependent
+    columns (intrinsic/time value, upper breakeven, Greeks) for the rows inside it only.
+    """
+
+    def __init__(self, current_price, num_shares, min_volume=100, moneyness_range=(0.95, 1.05),
+                 expiration=None):
+        self.current_price = current_price
+        self.num_shares = num_shares
+        self.min_volume = min_volume
+        self.moneyness_range = tuple(moneyness_range)
+        self.expiration = expiration  # enables Greeks
+        self.last_changed = pd.Index([])
+        self._chain = None
+
+    def _derive(self, df):
+        """Columns that depend on the row's own quote only."""
+        strike = df["strike"].to_numpy(dtype=np.float64)
+        mid = (df["bid"].to_numpy(dtype=np.float64) + df["ask"].to_numpy(dtype=np.float64)) / 2
+        df = df.assign(
+            mid_price=mid,
+            premium=mid,
+            lower_breakeven=strike - mid,
+            liquid=(df["volume"].to_numpy(dtype=np.float64) >= self.min_volume) & (mid > 0)
+        )
+        if self.expiration is not None and len(df):
+            # IVs are solved once per quote; Greeks are recomputed from them in filtered()
+            df = df.assign(iv_used=add_greeks(df, self.current_price, self.expiration)["iv_used"].to_numpy())
+        return df
+
+    def _sort(self):
+        self._chain = self._chain.sort_values("strike", kind="stable")
+
+    def rebuild(self, raw_chain: pd.DataFrame, current_price=None):
+        """Full recompute, on first load or to discard the stored chain."""
+        self._chain = None
+        return self.refresh(raw_chain, current_price)
+
+    def set_price(self, current_price):
+        """Moves the underlying; price-dependent columns are computed by filtered(), for its window only."""
+        self.current_price = current_price
+
+    def refresh(self, raw_chain: pd.DataFrame, current_price=None) -> pd.DataFrame:
+        """Diffs a freshly fetched chain against the stored one and applies only the differences."""
+        self.update(raw_chain, current_price)
+        return self.filtered()
+
+    def update(self, raw_chain: pd.DataFrame, current_price=None):
+        """refresh() without building the filtered view, for callers that read filtered() themselves."""
+        if self._chain is None:
+            if current_price is not None:
+                self.current_price = current_price
+            self._chain = self._derive(raw_chain.set_index("contractSymbol"))
+            self._sort()
+            self.last_changed = self._chain.index
+            return
+        if current_price is not None:
+            self.set_price(current_price)
+
+        raw = raw_chain.set_index("contractSymbol")
+        old = self._chain
+        common = raw.index.intersection(old.index)
+        cols = [c for c in QUOTE_COLUMNS if c in raw.columns and c in old.columns]
+
+        new_vals = raw.loc[common, cols].to_numpy(dtype=np.float64)
+        old_vals = old.loc[common, cols].to_numpy(dtype=np.float64)
+        same = (new_vals == old_vals) | (np.isnan(new_vals) & np.isnan(old_vals))
+        changed = common[~same.all(axis=1)]
+
+        added = raw.index.difference(old.index)
+        removed = old.index.difference(raw.index)
+        self._apply(raw.loc[changed.append(added)], removed)
+
+    def apply_updates(self, updates: pd.DataFrame, removed=()) -> pd.DataFrame:
+        """Applies changed/new quote rows (indexed by or containing contractSymbol)."""
+        self._apply(updates, removed)
+        return self.filtered()
+
+    def _apply(self, updates, removed):
+        if "contractSymbol" in updates.columns:
+            updates = updates.set_index("contractSymbol")
+        if len(removed):
+            self._chain = self._chain.drop(index=removed)
+
+        existing = updates.index.intersection(self._chain.index)
+        added = updates.index.difference(self._chain.index)
+
+        if len(existing):
+            # Carry over columns the update doesn't include (e.g. a quote-only stream); assigned
+            # rather than DataFrame.update, which skips NaN, so a quote that goes to NaN is written
+            base = self._chain.loc[existing].copy()
+            quote_cols = updates.columns.intersection(base.columns)
+            base[quote_cols] = updates.loc[existing, quote_cols]
+            derived = self._derive(base)
+            cols = derived.columns.intersection(self._chain.columns)
+            self._chain.loc[existing, cols] = derived[cols]
+            if "strike" in quote_cols:
+                self._sort()
+        if len(added):
+            new_rows = self._derive(updates.loc[added])
+            self._chain = pd.concat([self._chain, new_rows])
+            self._sort()
+
+        self.last_changed = existing.append(added)
+
+    def filtered(self, num_shares=None) -> pd.DataFrame:
+        """
+        Same shape as filter_puts(): passing rows, closest to ATM first, with the price-dependent
+        columns for the current price. num_shares overrides the size used for upper_breakeven.
+        """
+        price = self.current_price
+        num_shares = self.num_shares if num_shares is None else num_shares
+        strikes = self._chain["strike"].to_numpy(dtype=np.float64)
+        lo = np.searchsorted(strikes, price * self.moneyness_range[0], side="left")
+        hi = np.searchsorted(strikes, price * self.moneyness_range[1], side="right")
+        window = self._chain.iloc[lo:hi]
+        window = window[window["liquid"].to_numpy(dtype=bool)]
+
+        strike = window["strike"].to_numpy(dtype=np.float64)
+        mid = window["mid_price"].to_numpy(dtype=np.float64)
+        intrinsic = strike - price
+        abs_diff = np.abs(intrinsic)
+        window = window.drop(columns="liquid").assign(
+            intrinsic_value=intrinsic,
+            time_value=mid - intrinsic,
+            abs_diff=abs_diff,
+            upper_breakeven=price + (mid * SHARES_PER_CONTRACT) / num_shares
+        )
+        if self.expiration is not None and "iv_used" in window.columns and len(window):
+            greeks = bs_put_greeks(price, strike, time_to_expiry(self.expiration),
+                                   window["iv_used"].to_numpy(dtype=np.float64), rate=RISK_FREE_RATE)
+            window = window.assign(**greeks)
+        return window.iloc[np.lexsort((strike, abs_diff))].reset_index()
@@ -0,0 +1,275 @@
+# src/instrumentation.py
+# Stage timers, counters and network/cache metrics for a session, plus an optional sampling profiler.
+# Off by default: a disabled timer costs one flag check per call.
+# Enable with HEDGE_METRICS=1 and HEDGE_PROFILE=1 (or paths to write to instead of the defaults),
+# or call enable(); 0/false/empty leave them off.
+
+import atexit
+import functools
+import json
+import math
+import os
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+
+METRICS_FILE = "logs/metrics.json"
+PROFILE_FILE = "logs/profile.txt"
+NUM_BUCKETS = 32  # log2 microsecond buckets: 1 us .. ~35 min
+
+_enabled = False
+_lock = threading.Lock()
+_timers = {}
+_counters = defaultdict(float)
+_profiler = None
+_export_registered = False
+
+
+class _Timer:
+    __slots__ = ("count", "total", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * NUM_BUCKETS
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        micros = seconds * 1e6
+        self.buckets[min(int(math.log2(micros)) if micros >= 1 else 0, NUM_BUCKETS - 1)] += 1
+
+    def quantile(self, q):
+        """Upper edge of the bucket holding the q-quantile, in seconds."""
+        target = q * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= target and n:
+                return min(2.0 ** (i + 1) / 1e6, self.max)
+        return self.max
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "total_s": self.total,
+            "mean_s": self.total / self.count if self.count else 0.0,
+            "p50_s": self.quantile(0.5),
+            "p95_s": self.quantile(0.95),
+            "max_s": self.max
+        }
+
+
+def enabled():
+    return _enabled
+
+
+def enable(export_path=None, profile_path=None, profile_interval=0.005):
+    """Turns collection on; metrics (and collapsed profiler stacks) are written at exit when paths are given."""
+    global _enabled, _profiler, _export_registered
+    _enabled = True
+    if profile_path and _profiler is None:
+        _profiler = SamplingProfiler(profile_interval)
+        _profiler.start()
+    if (export_path or profile_path) and not _export_registered:
+        atexit.register(_export_at_exit, export_path, profile_path)
+        _export_registered = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def reset():
+    with _lock:
+        _timers.clear()
+        _counters.clear()
+
+
+def record(stage, seconds):
+    if not _enabled:
+        return
+    with _lock:
+        timer = _timers.get(stage)
+        if timer is None:
+            timer = _timers[stage] = _Timer()
+        timer.add(seconds)
+
+
+def count(name, amount=1):
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] += amount
+
+
+def timed(stage):
+    """Decorator recording the wall time of every call under `stage`."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record(stage, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+class span:
+    """Context manager timing an inline block: `with span("simulate.grid"): ...`."""
+    __slots__ = ("stage", "start")
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter() if _enabled else None
+        return self
+
+    def __exit__(self, *exc):
+        if self.start is not None:
+            record(self.stage, time.perf_counter() - self.start)
+
+
+def payload_bytes(value):
+    """Approximate size of a fetched payload; yfinance does not expose wire bytes."""
+    if hasattr(value, "memory_usage"):
+        return int(value.memory_usage(deep=True).sum())
+    try:
+        return len(json.dumps(value, default=str))
+    except (TypeError, ValueError):
+        return sys.getsizeof(value)
+
+
+def track_fetch(endpoint, fetch):
+    """Wraps a network fetch so latency, call count and payload size are recorded per endpoint."""
+    if not _enabled:
+        return fetch
+
+    def wrapper():
+        start = time.perf_counter()
+        try:
+            value = fetch()
+        except Exception:
+            count(f"network.{endpoint}.errors")
+            raise
+        record(f"network.{endpoint}", time.perf_counter() - start)
+        count(f"network.{endpoint}.bytes", payload_bytes(value))
+        return value
+    return wrapper
+
+
+def snapshot() -> dict:
+    """Current metrics as plain data, with cache hit rates derived from the cache.* counters."""
+    with _lock:
+        timers = {stage: timer.to_dict() for stage, timer in sorted(_timers.items())}
+        counters = dict(sorted(_counters.items()))
+
+    hit_rates = {}
+    for name, hits in counters.items():
+        if name.startswith("cache.hit."):
+            endpoint = name[len("cache.hit."):]
+            total = hits + counters.get(f"cache.miss.{endpoint}", 0)
+            hit_rates[endpoint] = hits / total if total else 0.0
+    for name in counters:
+        if name.startswith("cache.miss.") and name[len("cache.miss."):] not in hit_rates:
+            hit_rates[name[len("cache.miss."):]] = 0.0
+
+    return {"ts": time.time(), "pid": os.getpid(), "timers": timers, "counters": counters,
+            "cache_hit_rates": hit_rates}
+
+
+def export(path=METRICS_FILE) -> str:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(snapshot(), f, indent=2)
+    return path
+
+
+def report(top=15) -> str:
+    """Stages sorted by total time, for printing at the end of a run."""
+    timers = snapshot()["timers"]
+    lines = [f"{'stage':<40}{'calls':>8}{'total':>11}{'p95':>11}"]
+    for stage, t in sorted(timers.items(), key=lambda kv: -kv[1]["total_s"])[:top]:
+        lines.append(f"{stage:<40}{t['count']:>8}{t['total_s'] * 1000:>9.1f}ms{t['p95_s'] * 1000:>9.2f}ms")
+    return "\n".join(lines)
+
+
+def _export_at_exit(export_path, profile_path):
+    if export_path:
+        export(export_path)
+    if profile_path and _profiler is not None:
+        _profiler.stop()
+        _profiler.write(profile_path)
+
+
+class SamplingProfiler:
+    """
+    Samples every thread's stack each `interval` seconds from a background thread.
+    write() emits collapsed stacks ("outer;inner;leaf count"), the input format of flamegraph tools.
+    """
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                self.samples[";".join(reversed(stack))] += 1
+
+    def write(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            for stack, n in self.samples.most_common():
+                f.write(f"{stack} {n}\n")
+        return path
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def _env_path(name, default=None):
+    """Path from an env switch: unset/""/0/false/no/off disable it, 1/true/yes/on pick `default`."""
+    value = os.environ.get(name, "").strip()
+    if value.lower() in ("", "0", "false", "no", "off"):
+        return None
+    return default if value.lower() in ("1", "true", "yes", "on") else value
+
+
+_env_metrics = _env_path("HEDGE_METRICS", METRICS_FILE)
+_env_profile = _env_path("HEDGE_PROFILE", PROFILE_FILE)
+if _env_metrics or _env_profile:
+    enable(export_path=_env_metrics, profile_path=_env_profile)
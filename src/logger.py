@@ -1,20 +1,194 @@
+import atexit
+import hashlib
+import json
+import math
 import os
+import queue
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from chain_cache import save_frame
+
+LOG_FILE = "logs/session_log.jsonl"
+GRID_DIR = "logs/grids"
+MAX_LOG_BYTES = 10 * 1024 * 1024
+BACKUP_COUNT = 5
+
+
+def frame_hash(df: pd.DataFrame) -> str:
+    """Content hash of a frame; numeric columns hash their raw buffers, which is much cheaper than pandas hashing."""
+    digest = hashlib.sha1(",".join(map(str, df.columns)).encode())
+    columns = [df.index.to_series()] if not isinstance(df.index, pd.RangeIndex) else []
+    columns += [df.iloc[:, i] for i in range(df.shape[1])]
+    for col in columns:
+        values = col.to_numpy()
+        if values.dtype.kind in "biufcmM":
+            digest.update(values.dtype.str.encode())
+            digest.update(np.ascontiguousarray(values).tobytes())
+        else:
+            digest.update(pd.util.hash_pandas_object(col, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+class StructuredLogger:
+    """
+    Writes one JSON record per line from a background thread. Callers only enqueue;
+    the writer batches lines, flushes every `flush_interval` seconds and rotates the
+    file past `max_bytes`. DataFrames are stored once as columnar sidecars in
+    GRID_DIR and referenced by content hash; log() copies frames when enqueued, so
+    callers may keep mutating them. NaN and infinities are written as null.
+    """
+
+    def __init__(self, path=LOG_FILE, grid_dir=GRID_DIR, max_bytes=MAX_LOG_BYTES, backup_count=BACKUP_COUNT,
+                 queue_size=10000, flush_interval=1.0):
+        self.path = path
+        self.grid_dir = grid_dir
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._file = None
+        self._known_grids = set()
+        self._thread = threading.Thread(target=self._run, name="structured-logger", daemon=True)
+        self._thread.start()
+
+    # --- caller side ---
+    def _snapshot(self, value):
+        """Copies frames and arrays (the mutable values the writer reads later); the rest is kept as is."""
+        if isinstance(value, (pd.DataFrame, pd.Series, np.ndarray)):
+            return value.copy()
+        if isinstance(value, dict):
+            return {k: self._snapshot(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [self._snapshot(v) for v in value]
+        return value
+
+    def log(self, record_type, **fields):
+        # Blocks only when the queue is full, which applies backpressure instead of dropping records
+        self._queue.put(("record", {"ts": time.time(), "type": record_type, "fields": self._snapshot(fields)}))
+
+    def reset(self, header=None):
+        self._queue.put(("reset", header))
+        self.flush()
+
+    def flush(self):
+        """Waits until everything queued so far is on disk."""
+        self._queue.join()
+
+    def close(self):
+        self.flush()
+        self._queue.put(("stop", None))
+        self._thread.join()
+
+    # --- writer thread ---
+    def _encode(self, value):
+        if isinstance(value, pd.DataFrame):
+            digest = frame_hash(value)
+            if digest not in self._known_grids:
+                os.makedirs(self.grid_dir, exist_ok=True)
+                path = os.path.join(self.grid_dir, f"{digest}.npz")
+                if not os.path.exists(path):
+                    save_frame(path, value)
+                self._known_grids.add(digest)
+            return {"$frame": digest, "rows": len(value), "columns": [str(c) for c in value.columns]}
+        if isinstance(value, pd.Series):
+            return self._encode(value.to_frame())
+        if isinstance(value, dict):
+            return {str(k): self._encode(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [self._encode(v) for v in value]
+        if isinstance(value, np.generic):
+            return self._encode(value.item())
+        if isinstance(value, np.ndarray):
+            return self._encode(value.tolist())
+        if isinstance(value, float):
+            return value if math.isfinite(value) else None
+        if isinstance(value, (str, int, bool)) or value is None:
+            return value
+        return str(value)
+
+    def _open(self, mode="a"):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._file = open(self.path, mode, encoding="utf-8")
+
+    def _rotate(self):
+        self._file.close()
+        for i in range(self.backup_count - 1, 0, -1):
+            src = f"{self.path}.{i}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.path}.{i + 1}")
+        os.replace(self.path, f"{self.path}.1")
+        self._open("w")
+
+    def _run(self):
+        self._open()
+        last_flush = time.monotonic()
+        while True:
+            try:
+                kind, payload = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                self._file.flush()
+                last_flush = time.monotonic()
+                continue
+
+            try:
+                if kind == "stop":
+                    self._file.close()
+                    return
+                if kind == "reset":
+                    self._file.close()
+                    self._open("w")
+                    if payload:
+                        self._file.write(json.dumps({"ts": time.time(), "type": "header", "fields": payload}) + "\n")
+                    self._file.flush()
+                    continue
+
+                payload["fields"] = self._encode(payload["fields"])
+                self._file.write(json.dumps(payload, allow_nan=False) + "\n")
+                if time.monotonic() - last_flush >= self.flush_interval or self._queue.empty():
+                    self._file.flush()
+                    last_flush = time.monotonic()
+                if self._file.tell() >= self.max_bytes:
+                    self._rotate()
+            except Exception as e:
+                print(f"⚠️ Could not write log record: {e}")
+            finally:
+                self._queue.task_done()
+
+
+_logger = None
+_logger_lock = threading.Lock()
+
+
+def get_logger() -> StructuredLogger:
+    global _logger
+    with _logger_lock:
+        if _logger is None:
+            _logger = StructuredLogger()
+            atexit.register(_logger.close)
+    return _logger
+
+
+def shutdown_logger():
+    """Flushes and closes the session logger, if one was started, so its files can be removed."""
+    global _logger
+    with _logger_lock:
+        if _logger is not None:
+            _logger.close()
+            atexit.unregister(_logger.close)
+            _logger = None
 
-LOG_FILE = "logs/session_log.txt"
 
 def reset_log():
-    os.makedirs("logs", exist_ok=True)
-    with open(LOG_FILE, "w") as f:
-        f.write("=== TSLA Hedge Session Log ===\n")
+    get_logger().reset({"title": "TSLA Hedge Session Log"})
+
 
 def log_simulation(**kwargs):
-    with open(LOG_FILE, "a") as f:
-        f.write("\n--- Hedge Simulation ---\n")
-        for k, v in kwargs.items():
-            f.write(f"{k}: {v}\n")
+    get_logger().log("hedge_simulation", **kwargs)
+
 
 def log_decision(**kwargs):
-    with open(LOG_FILE, "a") as f:
-        f.write("\n--- Decision Simulation ---\n")
-        for k, v in kwargs.items():
-            f.write(f"{k}: {v}\n")
+    get_logger().log("decision_simulation", **kwargs)
@@ -1,23 +1,10 @@
 # src/main.py
+# Heavy modules (yfinance, pandas, matplotlib) are imported inside the menu branches
+# that need them, so the menu appears before any of them load.
 
-from data_fetcher import (
-    get_stock_info,
-    get_option_expirations,
-    get_put_option_chain,
-    get_historical_price
-)
-from option_analyzer import filter_puts, suggest_put
-from hedge_simulator import simulate_hedge
-from hedge_decision_simulator import simulate_decision
-from visualizer import (
-    plot_hedge_simulation,
-    plot_decision_simulation,
-    plot_breakeven_zone_map
-)
-
-from logger import log_simulation, log_decision
-from utils import calculate_put_values, compute_breakeven_zones
-from session_manager import clear_cache_files
+import math
+
+from session_manager import clear_cache_files, get_session_store, save_selected_expiration
 from config.config_filters import FILTER_CONFIG
 
 try:
@@ -30,6 +17,47 @@ current_puts = None
 filtered_puts = None
 selected_strike = None
 selected_premium = None
+chain_states = {}  # expiration -> IncrementalChain
+_stock_info_future = None
+_snapshot_store = None
+
+def _fetch_stock_info():
+    from data_fetcher import get_stock_info
+    return get_stock_info()
+
+def start_stock_info_fetch():
+    """Starts loading yfinance and the quote in the background while the menu is shown."""
+    global _stock_info_future
+    if _stock_info_future is None:
+        from concurrent.futures import ThreadPoolExecutor
+        _stock_info_future = ThreadPoolExecutor(max_workers=1).submit(_fetch_stock_info)
+    return _stock_info_future
+
+def stock_info():
+    global _stock_info_future
+    try:
+        return start_stock_info_fetch().result()
+    except Exception:
+        _stock_info_future = None  # retry on the next call instead of re-raising this failure forever
+        raise
+
+def snapshot_store():
+    global _snapshot_store
+    if _snapshot_store is None:
+        from snapshot_store import SnapshotStore
+        _snapshot_store = SnapshotStore()
+    return _snapshot_store
+
+def load_filtered_puts(expiration, current_price):
+    """Fetch the PUT chain and refresh only the rows that changed since the last fetch."""
+    from data_fetcher import get_put_option_chain
+    from incremental import IncrementalChain
+
+    state = chain_states.get(expiration)
+    if state is None:
+        state = IncrementalChain(current_price, NUM_SHARES, expiration=expiration, **FILTER_CONFIG)
+        chain_states[expiration] = state
+    return state.refresh(get_put_option_chain(expiration=expiration), current_price=current_price)
 
 def menu():
     print("\n=== TSLA Hedging Toolkit ===")
@@ -44,75 +72,81 @@ def menu():
 def main():
     global selected_exp, current_puts, filtered_puts, selected_strike, selected_premium
 
-    info = get_stock_info()
-    current_price = info["current_price"]
-
     while True:
         menu()
+        start_stock_info_fetch()  # no-op after the first paint
         choice = input("\nEnter your choice: ").strip()
 
         if choice == "1":
             print("\n=== TSLA Stock Info ===")
-            for k, v in info.items():
-                print(f"{k}: {v}")
+            try:
+                for k, v in stock_info().items():
+                    print(f"{k}: {v}")
+            except Exception as e:
+                print(f"❌ Error fetching stock info: {e}")
 
         elif choice == "2":
+            from data_fetcher import get_historical_price
+
             print("\n=== TSLA Recent Price History ===")
             hist = get_historical_price()
             print(hist.tail())
 
         elif choice == "3":
+            from data_fetcher import get_option_expirations
+
             print("\n=== Available Expiration Dates ===")
             expirations = get_option_expirations()
             print(expirations)
             selected_exp = input("\nEnter expiration date (YYYY-MM-DD): ")
+            save_selected_expiration(selected_exp)
 
         elif choice == "4":
+            from data_fetcher import get_option_expirations
+
             print("\n=== Available Expiration Dates ===")
             expirations = get_option_expirations()
             print(expirations)
             selected_exp = input("\nEnter expiration date (YYYY-MM-DD): ")
+            save_selected_expiration(selected_exp)
             #current_puts = get_put_option_chain(expiration=selected_exp, save_to_file=True)
             print(f"\n✅ PUT chain saved to raw_put_chain_{selected_exp}.csv")
 
         elif choice == "5":
-            print("\n=== Available Expiration Dates ===")
-            expirations = get_option_expirations()
-            print(expirations)
-            selected_exp = input("\nEnter expiration date (YYYY-MM-DD): ")
-            current_puts = get_put_option_chain(expiration=selected_exp)
-
-            filtered_puts = filter_puts(current_puts, current_price=current_price, **FILTER_CONFIG)
-            suggestions = suggest_put(filtered_puts)
-
-            # Ensure 'premium' column exists
-            filtered_puts["premium"] = filtered_puts["mid_price"]
+            from data_fetcher import get_option_expirations
+            from option_analyzer import suggest_put
+            from hedge_simulator import simulate_hedge
+            from payoff import PiecewisePayoff
+            from visualizer import plot_hedge_simulation, plot_breakeven_zone_map
+            from logger import log_simulation
+            from utils import calculate_put_values
 
-            # Compute breakeven zones
-            lower_breakevens = filtered_puts["strike"] - filtered_puts["premium"]
-            upper_breakevens = current_price + (filtered_puts["premium"] * 100) / NUM_SHARES
-
-            breakeven_df = filtered_puts.copy()
-            breakeven_df["lower_breakeven"] = lower_breakevens
-            breakeven_df["upper_breakeven"] = upper_breakevens
+            try:
+                current_price = stock_info()["current_price"]
+                print("\n=== Available Expiration Dates ===")
+                expirations = get_option_expirations()
+                print(expirations)
+                selected_exp = input("\nEnter expiration date (YYYY-MM-DD): ")
+                save_selected_expiration(selected_exp)
+                filtered_puts = load_filtered_puts(selected_exp, current_price)
+                suggestions = suggest_put(filtered_puts)
 
-            plot_breakeven_zone_map(breakeven_df, selected_exp)
+                # Breakeven zones are maintained per row by the incremental chain
+                breakeven_df = filtered_puts
+                plot_breakeven_zone_map(breakeven_df, selected_exp)
 
-            # Save to log
-            breakeven_df.to_csv(f"logs/breakeven_map_{selected_exp}.csv", index=False)
-            print(f"\n📁 Breakeven zone data saved to logs/breakeven_map_{selected_exp}.csv")
+                # Save snapshot for historical queries
+                snapshot_path = snapshot_store().write(breakeven_df, stock_info()["symbol"], selected_exp,
+                                                       dataset="breakeven_maps")
+                print(f"\n📁 Breakeven zone data saved to {snapshot_path}")
+            except Exception as e:
+                print(f"❌ Error loading PUT chain: {e}")
+                continue
 
             print("\n=== Filtered Suggestions ===")
             print(suggestions)
 
             try:
-                # Compute and save breakeven map
-                breakeven_df = compute_breakeven_zones(suggestions, current_price=current_price, num_shares=NUM_SHARES)
-                breakeven_csv_path = f"logs/breakeven_map_{selected_exp}.csv"
-                breakeven_df.to_csv(breakeven_csv_path, index=False)
-                print(f"\n📁 Breakeven zone data saved to {breakeven_csv_path}")
-                plot_breakeven_zone_map(breakeven_df, selected_exp)
-                
                 selected_idx = int(input("\nSelect index of suggested put to simulate (e.g., 0): "))
                 selected_row = suggestions.iloc[selected_idx]
                 selected_strike = selected_row["strike"]
@@ -130,7 +164,9 @@ def main():
                 print(f"💡 Intrinsic Value: {intrinsic:.2f}")
                 print(f"⏳ Time Value: {time:.2f}")
 
-                df = simulate_hedge(
+                df = get_session_store().memoize(
+                    "simulate_hedge",
+                    simulate_hedge,
                     current_price=current_price,
                     num_shares=NUM_SHARES,
                     strike=selected_strike,
@@ -138,19 +174,29 @@ def main():
                     contracts=1
                 )
 
+                # One payoff for the plot and the explanation, so both show the same breakevens
+                breakeven_low, breakeven_high = PiecewisePayoff(NUM_SHARES, current_price, selected_strike, 1,
+                                                                selected_premium).breakevens()
                 plot_hedge_simulation(
                     df,
                     strike=selected_strike,
                     premium=selected_premium,
-                    expiration=selected_exp
+                    expiration=selected_exp,
+                    breakevens=(breakeven_low, breakeven_high)
                 )
 
                 # Explanation after graph
-                print(f"\n📈 Green Zone 1 (Left): Profit when TSLA falls below {selected_strike - selected_premium:.2f}")
-                print(f"You gain from exercising the PUT. Profit = ({selected_strike} - Market Price - {selected_premium}) * 100")
-
-                print(f"\n📈 Green Zone 2 (Right): Profit when TSLA rises above breakeven on stock")
-                print("Stock appreciation offsets cost of hedge.")
+                if math.isnan(breakeven_low):
+                    print("\n📉 No Green Zone 1 (Left): one PUT does not offset the stock loss at any lower price")
+                else:
+                    print(f"\n📈 Green Zone 1 (Left): Profit when TSLA falls below {breakeven_low:.2f}")
+                    print(f"You gain from exercising the PUT. Profit = ({selected_strike} - Market Price - {selected_premium}) * 100")
+
+                if math.isnan(breakeven_high):
+                    print("\n📉 No Green Zone 2 (Right): the position does not recover the hedge cost")
+                else:
+                    print(f"\n📈 Green Zone 2 (Right): Profit when TSLA rises above {breakeven_high:.2f}")
+                    print("Stock appreciation offsets cost of hedge.")
 
                 log_simulation(
                     df=df,
@@ -167,7 +213,14 @@ def main():
                 print(f"❌ Invalid selection: {e}")
 
         elif choice == "6":
+            from data_fetcher import get_option_expirations
+            from option_analyzer import suggest_put
+            from hedge_decision_simulator import simulate_decision
+            from visualizer import plot_decision_simulation
+            from logger import log_decision
+
             try:
+                current_price = stock_info()["current_price"]
                 avg_price = float(input("Your average TSLA purchase price: "))
                 hedge_budget = float(input("Budget for buying PUTs (e.g., 1000): "))
                 budget_source = input("Fund hedge using ('cash' or 'sell'): ").lower().strip()
@@ -176,9 +229,9 @@ def main():
                 expirations = get_option_expirations()
                 print(expirations)
                 selected_exp = input("Enter expiration date (YYYY-MM-DD): ")
+                save_selected_expiration(selected_exp)
 
-                current_puts = get_put_option_chain(expiration=selected_exp)
-                filtered_puts = filter_puts(current_puts, current_price=current_price, **FILTER_CONFIG)
+                filtered_puts = load_filtered_puts(selected_exp, current_price)
                 suggestions = suggest_put(filtered_puts)
 
                 print("\n=== Filtered Suggestions ===")
@@ -190,7 +243,9 @@ def main():
                 strike = selected_row["strike"]
                 premium = selected_row["mid_price"]
 
-                df, meta = simulate_decision(
+                df, meta = get_session_store().memoize(
+                    "simulate_decision",
+                    simulate_decision,
                     current_price=current_price,
                     avg_purchase_price=avg_price,
                     num_shares=NUM_SHARES,
@@ -0,0 +1,238 @@
+# src/monitor.py
+# Headless hedge monitor: polls prices/chains on an asyncio loop and emits threshold alerts.
+# Run: python src/monitor.py positions.json
+
+import asyncio
+import json
+import math
+import random
+import sys
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from hedge_decision_simulator import hedge_decision
+from incremental import IncrementalChain
+
+SHARES_PER_CONTRACT = 100
+
+
+def _price_text(value):
+    return "none" if math.isnan(value) else f"{value:.2f}"
+
+
+class DataFetcherSource:
+    """
+    Quote source backed by data_fetcher; its reads cap the cache TTL at `ttl` so polls see
+    fresh data, without changing the TTLs other users of the shared cache get.
+    """
+
+    def __init__(self, ttl=15):
+        import data_fetcher
+        self._fetcher = data_fetcher
+        self.ttl = ttl
+
+    def get_price(self, ticker):
+        return self._fetcher.get_stock_info(ticker, ttl=self.ttl)["current_price"]
+
+    def get_chain(self, ticker, expiration):
+        return self._fetcher.get_put_option_chain(ticker, expiration, ttl=self.ttl)
+
+    def get_expirations(self, ticker):
+        return self._fetcher.get_option_expirations(ticker)
+
+
+class ReplayQuoteSource:
+    """
+    Offline source for tests and demos: replays a list of prices per ticker and a
+    list of chains per (ticker, expiration), repeating the last entry when exhausted.
+    compact=True holds the chains as CompactChains (several times smaller) and
+    rebuilds a frame on each read.
+    """
+
+    def __init__(self, prices: dict, chains: dict, compact: bool = False):
+        self.prices = {k: list(v) for k, v in prices.items()}
+        self.chains = {k: list(v) for k, v in chains.items()}
+        self.compact = compact
+        if compact:
+            from compact_chain import CompactChain, SymbolTable
+            symbols = SymbolTable()
+            self.chains = {k: [CompactChain.from_frame(df, symbols=symbols) for df in v]
+                           for k, v in self.chains.items()}
+        self._calls = {}
+
+    def _next(self, key, values):
+        i = self._calls.get(key, 0)
+        self._calls[key] = i + 1
+        return values[min(i, len(values) - 1)]
+
+    def get_price(self, ticker):
+        return self._next(("price", ticker), self.prices[ticker])
+
+    def get_chain(self, ticker, expiration):
+        chain = self._next(("chain", ticker, expiration), self.chains[(ticker, expiration)])
+        return chain.to_frame(symbols_as="object") if self.compact else chain
+
+    def get_expirations(self, ticker):
+        return tuple(sorted(exp for t, exp in self.chains if t == ticker))
+
+
+class HedgeMonitor:
+    """
+    Polls every ticker in `positions` on its own task. A position is a dict with
+    ticker and expiration; held hedges also give strike, premium, num_shares,
+    avg_purchase_price and hedge_budget (optionally budget_source), matching
+    simulate_decision's arguments.
+
+    Positions on the same (ticker, expiration) share one IncrementalChain, refreshed under
+    that chain's lock; each reads its own filtered view (upper breakevens use its size),
+    and zones and seen contracts are kept per position.
+    """
+
+    def __init__(self, positions, source=None, interval=30.0, jitter=0.1, max_backoff=300.0,
+                 min_volume=100, moneyness_range=(0.95, 1.05), on_alert=None, max_workers=16):
+        self.positions = positions
+        self.source = source or DataFetcherSource(ttl=interval)
+        self.interval = interval
+        self.jitter = jitter
+        self.max_backoff = max_backoff
+        self.filter_config = {"min_volume": min_volume, "moneyness_range": moneyness_range}
+        self.on_alert = on_alert or (lambda alert: print(f"🔔 {alert['message']}"))
+        self.alerts = deque(maxlen=1000)
+        self.ticks = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._position_keys = {id(p): (p["ticker"], p["expiration"], i) for i, p in enumerate(positions)}
+        self._chains = {}
+        self._chain_locks = {}
+        self._state_lock = threading.Lock()
+        self._zones = {}
+        self._seen_better = {}
+
+    async def _call(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    def _emit(self, alerts):
+        for alert in alerts:
+            self.alerts.append(alert)
+            self.on_alert(alert)
+
+    def _zone(self, price, meta):
+        low, high = meta["breakeven_low"], meta["breakeven_high"]
+        if math.isnan(high):
+            return "above"  # no loss zone at all
+        if math.isnan(low):
+            low = -math.inf  # the loss runs all the way down
+        if price < low:
+            return "below"
+        if price > high:
+            return "above"
+        return "inside"
+
+    def evaluate(self, position, price, chain):
+        """
+        Re-evaluates one position for a tick and returns (result, alerts).
+        Safe to call from several threads at once: the shared chain is refreshed under its lock
+        and everything else touched is keyed by this position.
+        """
+        chain_key = (position["ticker"], position["expiration"])
+        key = self._position_keys.get(id(position), chain_key + (id(position),))
+        alerts = []
+
+        def alert(kind, message, **extra):
+            alerts.append({"ticker": key[0], "expiration": key[1], "type": kind, "message": message, **extra})
+
+        with self._state_lock:
+            lock = self._chain_locks.setdefault(chain_key, threading.Lock())
+        with lock:
+            state = self._chains.get(chain_key)
+            if state is None:
+                state = IncrementalChain(price, position.get("num_shares", 100), **self.filter_config)
+                self._chains[chain_key] = state
+            state.update(chain, current_price=price)
+            # Positions share the chain but not their size, so upper breakevens are per position
+            filtered = state.filtered(num_shares=position.get("num_shares", 100))
+
+        if "strike" not in position:
+            return None, alerts
+
+        # Metadata only; the P&L table simulate_decision would build is never used here
+        _, meta = hedge_decision(
+            current_price=price,
+            avg_purchase_price=position["avg_purchase_price"],
+            num_shares=position["num_shares"],
+            strike=position["strike"],
+            premium=position["premium"],
+            hedge_budget=position["hedge_budget"],
+            budget_source=position.get("budget_source", "cash")
+        )
+
+        held = chain[chain["strike"] == position["strike"]]
+        held_mid = (float(held["bid"].iloc[0]) + float(held["ask"].iloc[0])) / 2 if len(held) else position["premium"]
+        hedge_pnl = (held_mid - position["premium"]) * SHARES_PER_CONTRACT * meta["contracts_purchased"]
+        stock_pnl = (price - position["avg_purchase_price"]) * meta["remaining_shares"]
+
+        zone = self._zone(price, meta)
+        previous = self._zones.get(key)
+        self._zones[key] = zone
+        if previous is not None and zone != previous:
+            alert("breakeven_cross",
+                  f"{key[0]} {key[1]}: price {price:.2f} moved {previous} -> {zone} breakevens "
+                  f"({_price_text(meta['breakeven_low'])} / {_price_text(meta['breakeven_high'])})",
+                  price=price, zone=zone)
+
+        # A cheaper PUT that protects at least as well (strike >= held strike)
+        better = filtered[(filtered["strike"] >= position["strike"]) & (filtered["mid_price"] < held_mid)]
+        seen = self._seen_better.setdefault(key, set())
+        for row in better.itertuples(index=False):
+            if row.contractSymbol not in seen:
+                seen.add(row.contractSymbol)
+                alert("better_put",
+                      f"{key[0]} {key[1]}: {row.contractSymbol} strike {row.strike} at {row.mid_price:.2f} "
+                      f"beats held {position['strike']} at {held_mid:.2f}",
+                      contract=row.contractSymbol)
+
+        result = {"price": price, "hedge_pnl": hedge_pnl, "net_pnl": stock_pnl + hedge_pnl, "zone": zone, **meta}
+        return result, alerts
+
+    async def _poll_ticker(self, ticker, positions, max_ticks=None):
+        delay = self.interval
+        ticks = 0
+        while max_ticks is None or ticks < max_ticks:
+            try:
+                price = await self._call(self.source.get_price, ticker)
+                expirations = sorted({p["expiration"] for p in positions})
+                chains = await asyncio.gather(*(self._call(self.source.get_chain, ticker, exp) for exp in expirations))
+                by_exp = dict(zip(expirations, chains))
+                # pandas work runs off the loop so one ticker's evaluation never stalls the others
+                results = await asyncio.gather(*(self._call(self.evaluate, p, price, by_exp[p["expiration"]])
+                                                 for p in positions))
+                self.ticks[ticker] = [result for result, _ in results]
+                for _, alerts in results:
+                    self._emit(alerts)
+                delay = self.interval
+            except Exception as e:
+                print(f"⚠️ {ticker} poll failed: {e}")
+                delay = min(delay * 2, self.max_backoff)
+            ticks += 1
+            if max_ticks is None or ticks < max_ticks:
+                await asyncio.sleep(delay * (1 + random.uniform(-self.jitter, self.jitter)))
+
+    async def run(self, max_ticks=None):
+        """Polls until cancelled (or for max_ticks per ticker)."""
+        by_ticker = {}
+        for position in self.positions:
+            by_ticker.setdefault(position["ticker"], []).append(position)
+        try:
+            await asyncio.gather(*(self._poll_ticker(t, ps, max_ticks) for t, ps in by_ticker.items()))
+        finally:
+            self._executor.shutdown(wait=False)
+
+
+if __name__ == "__main__":
+    with open(sys.argv[1], "r") as f:
+        positions = json.load(f)
+    interval = float(sys.argv[2]) if len(sys.argv) > 2 else 30.0
+    try:
+        asyncio.run(HedgeMonitor(positions, interval=interval).run())
+    except KeyboardInterrupt:
+        print("Monitor stopped.")
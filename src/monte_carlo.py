@@ -0,0 +1,210 @@
+# src/monte_carlo.py
+# Monte Carlo P&L distributions for protective PUT candidates.
+
+import math
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import timed
+
+SHARES_PER_CONTRACT = 100
+TRADING_DAYS = 252
+NUM_BINS = 4096
+# Per-chunk working set in bytes: prices, stock P&L, one candidate's payoff/P&L and bin indices
+MAX_CHUNK_BYTES = 64 * 2**20
+CHUNK_VECTORS = 6
+
+
+def log_returns_from_history(hist_df: pd.DataFrame) -> np.ndarray:
+    """Daily log returns from a get_historical_price() frame."""
+    close = hist_df["Close"].to_numpy(dtype=np.float64)
+    return np.diff(np.log(close))
+
+
+def terminal_prices(rng, spot, t, n_paths, vol, drift=0.0, model="gbm",
+                    jump_intensity=0.0, jump_mean=0.0, jump_vol=0.0, returns=None):
+    """
+    Draws terminal prices for one chunk of paths.
+    model: "gbm", "jump" (Merton jump-diffusion) or "bootstrap" (resampled daily log returns).
+    """
+    if model == "bootstrap":
+        if returns is None or len(returns) == 0:
+            raise ValueError("Bootstrap model needs historical returns.")
+        steps = max(int(round(t * TRADING_DAYS)), 1)
+        log_ret = np.zeros(n_paths)
+        for _ in range(steps):
+            log_ret += returns[rng.integers(0, len(returns), n_paths)]
+        return spot * np.exp(log_ret)
+
+    log_ret = (drift - 0.5 * vol * vol) * t + vol * math.sqrt(t) * rng.standard_normal(n_paths)
+    if model == "jump":
+        compensator = jump_intensity * (math.exp(jump_mean + 0.5 * jump_vol ** 2) - 1)
+        n_jumps = rng.poisson(jump_intensity * t, n_paths)
+        log_ret += n_jumps * jump_mean + np.sqrt(n_jumps) * jump_vol * rng.standard_normal(n_paths)
+        log_ret -= compensator * t
+    elif model != "gbm":
+        raise ValueError(f"Unknown model: {model}")
+    return spot * np.exp(log_ret)
+
+
+def _run_chunk(task):
+    """
+    Evaluates every candidate on one chunk; returns only fixed-size accumulators.
+    Candidates are reduced into their histogram one at a time, so the working set is a
+    few chunk-length vectors however many candidates there are.
+    """
+    seed_seq, n_paths, params, bin_edges = task
+    rng = np.random.default_rng(seed_seq)
+    prices = terminal_prices(rng, n_paths=n_paths, **params["model"])
+    stock_pnl = (prices - params["avg_purchase_price"]) * params["num_shares"]
+
+    # Row 0 is the unhedged portfolio, rows 1.. are the candidates
+    n_rows, n_bins = len(bin_edges), len(bin_edges[0]) - 1
+    totals = {
+        "counts": np.empty((n_rows, n_bins), dtype=np.int64),
+        "sums": np.empty((n_rows, n_bins)),
+        "pnl_sum": np.empty(n_rows),
+        "loss_count": np.empty(n_rows, dtype=np.int64),
+        "payoff_sum": np.empty(n_rows - 1)
+    }
+    payoff = np.empty(n_paths)
+    pnl = np.empty(n_paths)
+    for i in range(n_rows):
+        if i == 0:
+            pnl[:] = stock_pnl
+        else:
+            np.subtract(params["strikes"][i - 1], prices, out=payoff)
+            np.maximum(payoff, 0, out=payoff)
+            payoff *= params["quantity"][i - 1]
+            totals["payoff_sum"][i - 1] = payoff.sum()
+            np.add(payoff, stock_pnl, out=pnl)
+            pnl -= params["cost"][i - 1]
+
+        bins = np.searchsorted(bin_edges[i], pnl, side="right") - 1
+        np.clip(bins, 0, n_bins - 1, out=bins)
+        totals["counts"][i] = np.bincount(bins, minlength=n_bins)
+        totals["sums"][i] = np.bincount(bins, weights=pnl, minlength=n_bins)
+        totals["pnl_sum"][i] = pnl.sum()
+        totals["loss_count"][i] = np.count_nonzero(pnl < 0)
+    return totals
+
+
+def _tail_stats(counts, sums, n_paths, confidence):
+    """VaR/CVaR (as positive losses) from a binned P&L distribution."""
+    tail_n = (1 - confidence) * n_paths
+    cum = np.cumsum(counts)
+    cut = int(np.searchsorted(cum, tail_n))
+    cut = min(cut, len(counts) - 1)
+    prior = cum[cut - 1] if cut > 0 else 0
+    # Take the needed fraction of the boundary bin
+    partial = (tail_n - prior) / counts[cut] if counts[cut] else 0.0
+    bin_mean = sums[cut] / counts[cut] if counts[cut] else 0.0
+    tail_sum = sums[:cut].sum() + partial * counts[cut] * bin_mean
+    return -bin_mean, -tail_sum / tail_n if tail_n else np.nan
+
+
+@timed("simulate.monte_carlo")
+def simulate_hedge_distribution(
+    current_price: float,
+    num_shares: float,
+    strikes,
+    premiums,
+    t: float,
+    vol: float,
+    contracts=1,
+    avg_purchase_price: float = None,
+    n_paths: int = 1_000_000,
+    chunk_size: int = None,
+    seed: int = 42,
+    confidence: float = 0.95,
+    n_jobs: int = 1,
+    **model_kwargs
+) -> tuple[pd.DataFrame, dict]:
+    """
+    Monte Carlo P&L for holding `num_shares` hedged with each candidate PUT.
+
+    Paths are drawn in chunks of `chunk_size` (default: what fits MAX_CHUNK_BYTES) from
+    per-chunk child seeds, so results are identical for any n_jobs and memory per worker
+    stays at O(chunk_size), independent of the number of candidates.
+    Extra keyword arguments (model, drift, jump_*, returns) go to terminal_prices().
+    """
+    strikes = np.atleast_1d(np.asarray(strikes, dtype=np.float64))
+    premiums = np.atleast_1d(np.asarray(premiums, dtype=np.float64))
+    quantity = np.broadcast_to(np.asarray(contracts, dtype=np.float64), strikes.shape) * SHARES_PER_CONTRACT
+    cost = quantity * premiums
+    if avg_purchase_price is None:
+        avg_purchase_price = current_price
+    if chunk_size is None:
+        chunk_size = MAX_CHUNK_BYTES // (CHUNK_VECTORS * 8)
+
+    params = {
+        "strikes": strikes,
+        "quantity": quantity,
+        "cost": cost,
+        "num_shares": num_shares,
+        "avg_purchase_price": avg_purchase_price,
+        "model": dict(spot=current_price, t=t, vol=vol, **model_kwargs)
+    }
+
+    # Fixed histogram edges per row from a pilot chunk, widened to cover the price-at-zero case
+    pilot_rng = np.random.default_rng(np.random.SeedSequence([seed, 0xB1]))
+    pilot = terminal_prices(pilot_rng, n_paths=min(chunk_size, 50_000), **params["model"])
+    grid = np.concatenate([[0.0], np.quantile(pilot, [0.0, 1.0]) * [0.5, 2.0]])
+    grid = np.linspace(0.0, grid.max(), 512)
+    stock_grid = (grid - avg_purchase_price) * num_shares
+    grid_pnl = np.vstack([stock_grid, np.maximum(strikes[:, None] - grid, 0) * quantity[:, None]
+                          + stock_grid - cost[:, None]])
+    bin_edges = np.linspace(grid_pnl.min(axis=1), grid_pnl.max(axis=1), NUM_BINS + 1, axis=1)
+
+    n_chunks = math.ceil(n_paths / chunk_size)
+    sizes = [min(chunk_size, n_paths - i * chunk_size) for i in range(n_chunks)]
+    tasks = [(child, size, params, bin_edges)
+             for child, size in zip(np.random.SeedSequence(seed).spawn(n_chunks), sizes)]
+
+    if n_jobs > 1:
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            results = pool.map(_run_chunk, tasks)
+            totals = _merge(results)
+    else:
+        totals = _merge(map(_run_chunk, tasks))
+
+    n_rows = len(strikes) + 1
+    var = np.empty(n_rows)
+    cvar = np.empty(n_rows)
+    for i in range(n_rows):
+        var[i], cvar[i] = _tail_stats(totals["counts"][i], totals["sums"][i], n_paths, confidence)
+
+    df = pd.DataFrame({
+        "strike": strikes,
+        "premium": premiums,
+        "total_put_cost": cost,
+        "expected_pnl": totals["pnl_sum"][1:] / n_paths,
+        "expected_hedge_payoff": totals["payoff_sum"] / n_paths,
+        "prob_loss": totals["loss_count"][1:] / n_paths,
+        "var": var[1:],
+        "cvar": cvar[1:]
+    })
+
+    metadata = {
+        "n_paths": n_paths,
+        "seed": seed,
+        "confidence": confidence,
+        "unhedged_expected_pnl": totals["pnl_sum"][0] / n_paths,
+        "unhedged_prob_loss": totals["loss_count"][0] / n_paths,
+        "unhedged_var": var[0],
+        "unhedged_cvar": cvar[0]
+    }
+    return df, metadata
+
+
+def _merge(results):
+    totals = None
+    for result in results:
+        if totals is None:
+            totals = result
+        else:
+            for key in totals:
+                totals[key] = totals[key] + result[key]
+    return totals
@@ -1,5 +1,14 @@
+import numpy as np
 import pandas as pd
 
+from chain_index import ChainIndex
+from pricing import RISK_FREE_RATE, bs_put_greeks, implied_vol, time_to_expiry
+from instrumentation import timed
+
+# Yahoo reports placeholder IVs (e.g. 1e-05) for contracts without a live quote
+MIN_VALID_IV = 0.01
+
+@timed("filter.filter_puts")
 def filter_puts(
     puts_df: pd.DataFrame,
     current_price: float,
@@ -11,33 +20,50 @@ def filter_puts(
     - Sufficient volume
     - Strike close to or above current price
     - Reasonable moneyness
-    """
-    puts_df = puts_df.copy()
-
-    # Calculate mid price if not already present
-    if "mid_price" not in puts_df.columns:
-        puts_df["mid_price"] = (puts_df["bid"] + puts_df["ask"]) / 2
-
-    puts_df["intrinsic_value"] = puts_df["strike"] - current_price
-    puts_df["time_value"] = puts_df["mid_price"] - puts_df["intrinsic_value"]
-
-    # Filter 1: strike within 95% to 105% of current price
-    min_strike = current_price * moneyness_range[0]
-    max_strike = current_price * moneyness_range[1]
-    puts_df = puts_df[puts_df["strike"].between(min_strike, max_strike)]
 
-    # Filter 2: must have sufficient volume
-    puts_df = puts_df[puts_df["volume"] >= min_volume]
+    Uses a ChainIndex: the strike window is found by binary search, the volume and
+    mid_price checks run as one mask, and only the surviving rows are copied.
+    Build the ChainIndex yourself to reuse it across many filter variants.
+    """
+    return ChainIndex(puts_df).filter(current_price, min_volume, moneyness_range)
 
-    # Filter 3: must have non-negative mid_price
-    puts_df = puts_df[puts_df["mid_price"] > 0]
+@timed("filter.add_greeks")
+def add_greeks(
+    puts_df: pd.DataFrame,
+    current_price: float,
+    expiration: str,
+    rate: float = RISK_FREE_RATE,
+    recompute_iv: bool = False,
+    surface=None
+) -> pd.DataFrame:
+    """
+    Add theoretical value and Greeks for every PUT in one vectorized pass.
+    Missing or stale impliedVolatility values are re-solved from mid_price,
+    or read off `surface` (a vol_surface.VolSurface) when one is given.
+    """
+    puts_df = puts_df.copy()
+    strikes = puts_df["strike"].to_numpy(dtype=np.float64)
+    t = time_to_expiry(expiration)
 
-    # Sort by moneyness (closest to ATM)
-    puts_df["abs_diff"] = abs(puts_df["strike"] - current_price)
-    puts_df = puts_df.sort_values("abs_diff")
+    iv = puts_df["impliedVolatility"].to_numpy(dtype=np.float64) if "impliedVolatility" in puts_df.columns \
+        else np.full(len(puts_df), np.nan)
+    stale = np.ones(len(puts_df), dtype=bool) if recompute_iv else ~(iv >= MIN_VALID_IV)
+    if stale.any() and surface is not None:
+        iv = iv.copy()
+        iv[stale] = surface.vol(strikes[stale], t)
+    elif stale.any():
+        solved = implied_vol(puts_df["mid_price"].to_numpy(dtype=np.float64)[stale], current_price,
+                             strikes[stale], t, rate=rate)
+        iv = iv.copy()
+        iv[stale] = solved
+    puts_df["iv_used"] = iv
 
-    return puts_df.reset_index(drop=True)
+    greeks = bs_put_greeks(current_price, strikes, t, iv, rate=rate)
+    for name, values in greeks.items():
+        puts_df[name] = values
+    return puts_df
 
+@timed("filter.suggest_put")
 def suggest_put(filtered_df: pd.DataFrame, top_n: int = 5) -> pd.DataFrame:
     """
     Return top N PUTs with reasonable hedging potential
@@ -46,4 +72,5 @@ def suggest_put(filtered_df: pd.DataFrame, top_n: int = 5) -> pd.DataFrame:
         "contractSymbol", "strike", "lastPrice", "bid", "ask",
         "mid_price", "volume", "impliedVolatility"
     ]
+    columns += [col for col in ("iv_used", "delta", "theo_price") if col in filtered_df.columns]
     return filtered_df[columns].head(top_n)
@@ -0,0 +1,173 @@
+# src/payoff.py
+# Exact expiry P&L of a share position hedged with long PUTs.
+# The P&L is piecewise linear in the price with kinks at the strikes, so breakevens, worst case
+# and the width of the loss zone are solved at the kinks: O(legs) per hedge instead of O(grid
+# points). Price grids are only built by sample()/frame() for plotting.
+
+import numpy as np
+import pandas as pd
+
+SHARES_PER_CONTRACT = 100
+DEFAULT_RANGE = (0.4, 1.6)  # x current price, the range simulate_hedge has always shown
+
+
+def resolve_range(current_price, price_range=None, default=DEFAULT_RANGE):
+    """(lo, hi) bounds from None (`default` x current price), a (lo, hi) pair or an array of prices."""
+    if price_range is None:
+        return current_price * default[0], current_price * default[1]
+    prices = np.asarray(price_range, dtype=np.float64)
+    return float(prices.min()), float(prices.max())
+
+
+def _negative_length(x0, x1, f0, f1):
+    """Length of the part of [x0, x1] where the line through (x0, f0), (x1, f1) is below zero."""
+    width = x1 - x0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        crossing = width * np.where(f0 < 0, f0 / (f0 - f1), f1 / (f1 - f0))
+    return np.where((f0 < 0) & (f1 < 0), width, np.where((f0 < 0) != (f1 < 0), crossing, 0.0))
+
+
+def _crossings(x, f):
+    """
+    Breakevens of the polyline through points x (sorted along the last axis) with values f:
+    the first downward and the last upward zero crossing, NaN where there is none.
+    Long-PUT hedges are convex, so everything between the two is the loss zone.
+    """
+    x0, x1, f0, f1 = x[..., :-1], x[..., 1:], f[..., :-1], f[..., 1:]
+    down = (f0 >= 0) & (f1 < 0)
+    up = (f0 < 0) & (f1 >= 0)
+    root = np.divide(f0 * (x1 - x0), f0 - f1, out=np.full(f0.shape, np.nan), where=down | up) + x0
+    return np.fmin.reduce(np.where(down, root, np.nan), axis=-1), np.fmax.reduce(np.where(up, root, np.nan), axis=-1)
+
+
+def curve_breakevens(prices, pnl) -> tuple:
+    """(low, high) edges of the loss zone of a sampled P&L curve, NaN where it doesn't cross zero."""
+    low, high = _crossings(np.asarray(prices, dtype=np.float64), np.asarray(pnl, dtype=np.float64))
+    return float(low), float(high)
+
+
+def put_hedge_profile(shares, basis, strikes, contracts, premiums, lo=0.0, hi=np.inf) -> dict:
+    """
+    Closed-form profile of `shares` bought at `basis` plus `contracts` PUTs at `strikes` costing
+    `premiums`, over prices [lo, hi]. strikes/contracts/premiums broadcast against each other
+    (e.g. (strikes, 1) x (1, counts) for ranking), so each hedge costs a handful of array ops.
+
+    Returns arrays: worst_pnl and worst_price (the minimum over the range), breakeven_low and
+    breakeven_high (edges of the loss zone, NaN when the loss extends past the range),
+    loss_width (length of the loss zone inside the range), pnl_lo and payout_lo (P&L and
+    PUT payout at lo) and total_put_cost.
+    """
+    strikes, contracts, premiums = np.broadcast_arrays(np.asarray(strikes, dtype=np.float64),
+                                                       np.asarray(contracts, dtype=np.float64),
+                                                       np.asarray(premiums, dtype=np.float64))
+    units = contracts * SHARES_PER_CONTRACT
+    cost = units * premiums
+
+    def pnl(price):
+        return (price - basis) * shares + units * np.maximum(strikes - price, 0) - cost
+
+    if np.isinf(hi):
+        if shares <= 0:
+            raise ValueError("An unbounded price range needs a positive share count.")
+        # Above the strike the P&L rises with slope `shares`, so past its root it stays positive
+        hi = np.maximum(np.maximum(strikes, lo), basis + cost / shares) + 1.0
+    hi = np.broadcast_to(hi, strikes.shape)
+
+    kink = np.clip(strikes, lo, hi)
+    x = np.stack([np.full(strikes.shape, float(lo)), kink, hi], axis=-1)
+    f = np.stack([pnl(x[..., 0]), pnl(kink), pnl(hi)], axis=-1)
+
+    low, high = _crossings(x, f)
+    worst_at = np.argmin(f, axis=-1)[..., None]
+    return {
+        "worst_pnl": np.take_along_axis(f, worst_at, axis=-1)[..., 0],
+        "worst_price": np.take_along_axis(x, worst_at, axis=-1)[..., 0],
+        "breakeven_low": low,
+        "breakeven_high": high,
+        "loss_width": _negative_length(x[..., 0], kink, f[..., 0], f[..., 1])
+        + _negative_length(kink, hi, f[..., 1], f[..., 2]),
+        "pnl_lo": f[..., 0],
+        "payout_lo": units * np.maximum(strikes - lo, 0),
+        "total_put_cost": cost
+    }
+
+
+class PiecewisePayoff:
+    """
+    Expiry P&L of shares bought at `basis` plus any number of long PUT legs
+    (strikes, contracts, premiums), evaluated exactly at any price.
+    """
+
+    def __init__(self, shares, basis, strikes=(), contracts=(), premiums=()):
+        self.shares = float(shares)
+        self.basis = float(basis)
+        legs = (np.atleast_1d(np.asarray(v, dtype=np.float64)) for v in (strikes, contracts, premiums))
+        self.strikes, self.contracts, self.premiums = np.broadcast_arrays(*legs)
+        self.units = self.contracts * SHARES_PER_CONTRACT
+        self.total_put_cost = float((self.units * self.premiums).sum())
+        self.kinks = np.unique(self.strikes[self.units != 0])
+
+    def payout(self, prices) -> np.ndarray:
+        prices = np.asarray(prices, dtype=np.float64)
+        return (np.maximum(self.strikes - prices[..., None], 0) * self.units).sum(axis=-1)
+
+    def unhedged(self, prices) -> np.ndarray:
+        return (np.asarray(prices, dtype=np.float64) - self.basis) * self.shares
+
+    def pnl(self, prices) -> np.ndarray:
+        return self.unhedged(prices) + self.payout(prices) - self.total_put_cost
+
+    def _points(self, lo, hi):
+        kinks = self.kinks
+        if hi == np.inf:
+            if self.shares <= 0:
+                raise ValueError("An unbounded price range needs a positive share count.")
+            tail_root = self.basis + self.total_put_cost / self.shares
+            hi = max(lo, tail_root, kinks.max() if len(kinks) else lo) + 1.0
+        x = np.concatenate([[lo], kinks[(kinks > lo) & (kinks < hi)], [hi]])
+        return x, self.pnl(x)
+
+    def summary(self, lo=0.0, hi=np.inf) -> dict:
+        """
+        breakeven_low/breakeven_high (edges of the loss zone, NaN where the loss runs past the
+        range), worst_price/worst_pnl and max_loss within [lo, hi], from one pass over the kinks.
+        """
+        x, f = self._points(lo, hi)
+        low, high = _crossings(x, f)
+        i = int(np.argmin(f))
+        return {"breakeven_low": float(low), "breakeven_high": float(high), "worst_price": float(x[i]),
+                "worst_pnl": float(f[i]), "max_loss": max(-float(f[i]), 0.0)}
+
+    def breakevens(self, lo=0.0, hi=np.inf) -> tuple:
+        summary = self.summary(lo, hi)
+        return summary["breakeven_low"], summary["breakeven_high"]
+
+    def worst(self, lo=0.0, hi=np.inf) -> tuple:
+        """(price, pnl) of the lowest P&L within [lo, hi]."""
+        summary = self.summary(lo, hi)
+        return summary["worst_price"], summary["worst_pnl"]
+
+    def max_loss(self, lo=0.0, hi=np.inf) -> float:
+        return self.summary(lo, hi)["max_loss"]
+
+    def loss_width(self, lo, hi) -> float:
+        x, f = self._points(lo, hi)
+        return float(_negative_length(x[:-1], x[1:], f[:-1], f[1:]).sum())
+
+    def sample(self, lo, hi, num_points=None) -> np.ndarray:
+        """
+        Prices for a chart of [lo, hi]: the range ends, kinks and breakevens, which draw the
+        P&L exactly, or num_points evenly spaced prices for a dense grid.
+        """
+        if num_points is not None:
+            return np.linspace(lo, hi, num_points)
+        x, f = self._points(lo, hi)
+        return np.unique(np.concatenate([x, [b for b in _crossings(x, f) if np.isfinite(b)]]))
+
+    def frame(self, prices) -> pd.DataFrame:
+        prices = np.asarray(prices, dtype=np.float64)
+        return pd.DataFrame({
+            "Future Price ($)": prices,
+            "Unhedged P&L ($)": self.unhedged(prices),
+            "Hedged P&L ($)": self.pnl(prices)
+        })
@@ -0,0 +1,149 @@
+# src/portfolio.py
+# Portfolio-level hedge P&L over correlated multi-asset price scenarios.
+# Positions and hedges live in flat arrays indexed into one ticker universe, so a basket
+# can be hedged with puts on any underlying (e.g. index puts against single stocks).
+
+import math
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from pricing import RISK_FREE_RATE, bs_put_price
+
+SHARES_PER_CONTRACT = 100
+TRADING_DAYS = 252
+MEMORY_BUDGET = 256 * 1024 * 1024  # bytes of scenario arrays alive per chunk
+SEED_BLOCK = 1024                  # scenarios per child seed, so chunking never changes results
+
+
+def load_returns(tickers, period="1y", max_workers=8) -> pd.DataFrame:
+    """Daily log returns per ticker from get_historical_price, aligned on common dates."""
+    from data_fetcher import get_historical_price
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        histories = list(pool.map(lambda t: get_historical_price(t, period=period), tickers))
+    closes = pd.concat({t: h["Close"] for t, h in zip(tickers, histories)}, axis=1).dropna()
+    return np.log(closes).diff().dropna()
+
+
+def estimate_covariance(returns: pd.DataFrame, tickers=None) -> np.ndarray:
+    """Daily covariance of log returns, columns ordered like `tickers`."""
+    if tickers is not None:
+        returns = returns[list(tickers)]
+    return np.atleast_2d(np.cov(returns.to_numpy(dtype=np.float64), rowvar=False))
+
+
+def _factor(cov):
+    """Lower-triangular factor of cov; negative eigenvalues from short histories are clipped."""
+    try:
+        return np.linalg.cholesky(cov)
+    except np.linalg.LinAlgError:
+        eigval, eigvec = np.linalg.eigh(cov)
+        return eigvec * np.sqrt(np.clip(eigval, 0, None))
+
+
+class Portfolio:
+    """
+    positions: frame with ticker, shares, cost_basis.
+    hedges: optional frame with ticker, strike, contracts, premium and, for hedges that
+    outlive the horizon, vol and t_remaining (years after the horizon; 0 = valued at intrinsic).
+    spots: {ticker: price}; tickers missing from it are looked up with get_stock_info.
+    """
+
+    def __init__(self, positions: pd.DataFrame, hedges: pd.DataFrame = None, spots: dict = None):
+        hedges = hedges if hedges is not None else pd.DataFrame(columns=["ticker", "strike", "contracts", "premium"])
+        self.tickers = list(dict.fromkeys(list(positions["ticker"]) + list(hedges["ticker"])))
+        index = {t: i for i, t in enumerate(self.tickers)}
+
+        # Shares and cost are summed per ticker so duplicate lots collapse into one column
+        pos_idx = positions["ticker"].map(index).to_numpy()
+        shares = positions["shares"].to_numpy(dtype=np.float64)
+        self.shares = np.bincount(pos_idx, weights=shares, minlength=len(self.tickers))
+        self.cost = float((shares * positions["cost_basis"].to_numpy(dtype=np.float64)).sum())
+
+        self.hedge_idx = hedges["ticker"].map(index).to_numpy(dtype=np.intp)
+        self.strikes = hedges["strike"].to_numpy(dtype=np.float64)
+        self.quantity = hedges["contracts"].to_numpy(dtype=np.float64) * SHARES_PER_CONTRACT
+        self.hedge_cost = float((self.quantity * hedges["premium"].to_numpy(dtype=np.float64)).sum())
+        self.hedge_vol = hedges["vol"].to_numpy(dtype=np.float64) if "vol" in hedges.columns else None
+        self.t_remaining = hedges["t_remaining"].to_numpy(dtype=np.float64) if "t_remaining" in hedges.columns \
+            else np.zeros(len(hedges))
+
+        spots = dict(spots or {})
+        missing = [t for t in self.tickers if t not in spots]
+        if missing:
+            from data_fetcher import get_stock_info
+            spots.update({t: get_stock_info(t)["current_price"] for t in missing})
+        self.spots = np.array([spots[t] for t in self.tickers], dtype=np.float64)
+
+    def hedge_value(self, prices):
+        """Hedge book value per scenario; `prices` is (scenarios, tickers)."""
+        if not len(self.strikes):
+            return np.zeros(len(prices))
+        under = prices[:, self.hedge_idx]
+        if self.hedge_vol is not None and (self.t_remaining > 0).any():
+            value = bs_put_price(under, self.strikes, np.maximum(self.t_remaining, 1e-8), self.hedge_vol,
+                                 RISK_FREE_RATE)
+            value = np.where(self.t_remaining > 0, value, np.maximum(self.strikes - under, 0))
+        else:
+            value = np.subtract(self.strikes, under, out=under)
+            np.maximum(value, 0, out=value)
+        return value @ self.quantity
+
+    def simulate(
+        self,
+        cov: np.ndarray,
+        horizon_days: int = 21,
+        n_scenarios: int = 100_000,
+        drift=0.0,
+        seed: int = 42,
+        confidence: float = 0.95,
+        memory_budget: int = MEMORY_BUDGET
+    ) -> tuple[pd.DataFrame, dict]:
+        """
+        Correlated lognormal scenarios at `horizon_days` from a daily covariance
+        (ordered like self.tickers). Each chunk turns (scenarios x tickers) prices into
+        portfolio P&L with one matrix-vector product per book, so only the two P&L
+        columns are kept for all scenarios.
+        """
+        n_assets = len(self.tickers)
+        factor = _factor(np.asarray(cov, dtype=np.float64)) * math.sqrt(horizon_days)
+        drift = (np.broadcast_to(np.asarray(drift, dtype=np.float64), (n_assets,)) * horizon_days / TRADING_DAYS
+                 - 0.5 * np.diag(cov) * horizon_days)
+
+        # Live per scenario row: normals, prices, the hedge-underlying view and its payoff
+        row_bytes = 8 * (2 * n_assets + 2 * len(self.strikes) + 2)
+        rows = max(memory_budget // row_bytes // SEED_BLOCK, 1) * SEED_BLOCK
+        children = np.random.SeedSequence(seed).spawn(math.ceil(n_scenarios / SEED_BLOCK))
+
+        unhedged = np.empty(n_scenarios)
+        hedged = np.empty(n_scenarios)
+        for start in range(0, n_scenarios, rows):
+            stop = min(start + rows, n_scenarios)
+            z = np.empty((stop - start, n_assets))
+            for block_start in range(start, stop, SEED_BLOCK):
+                rng = np.random.default_rng(children[block_start // SEED_BLOCK])
+                rng.standard_normal(out=z[block_start - start:min(block_start + SEED_BLOCK, stop) - start])
+            prices = z @ factor.T
+            prices += drift
+            np.exp(prices, out=prices)
+            prices *= self.spots
+
+            unhedged[start:stop] = prices @ self.shares - self.cost
+            hedged[start:stop] = unhedged[start:stop] + self.hedge_value(prices) - self.hedge_cost
+
+        pnl = pd.DataFrame({"unhedged_pnl": unhedged, "hedged_pnl": hedged})
+        return pnl, self.summarize(pnl, confidence)
+
+    def summarize(self, pnl: pd.DataFrame, confidence: float = 0.95) -> dict:
+        summary = {"n_scenarios": len(pnl), "hedge_cost": self.hedge_cost, "confidence": confidence}
+        for col in ("unhedged", "hedged"):
+            values = pnl[f"{col}_pnl"].to_numpy()
+            cutoff = np.quantile(values, 1 - confidence)
+            summary[f"{col}_expected_pnl"] = float(values.mean())
+            summary[f"{col}_prob_loss"] = float((values < 0).mean())
+            summary[f"{col}_var"] = float(-cutoff)
+            summary[f"{col}_cvar"] = float(-values[values <= cutoff].mean())
+        summary["cvar_reduction"] = summary["unhedged_cvar"] - summary["hedged_cvar"]
+        return summary
@@ -0,0 +1,115 @@
+# src/pricing.py
+# Vectorized Black-Scholes pricing, Greeks and implied volatility for PUT chains.
+
+from datetime import datetime
+
+import numpy as np
+
+RISK_FREE_RATE = 0.045
+MIN_VOL = 1e-4
+MAX_VOL = 5.0
+SQRT_2PI = np.sqrt(2 * np.pi)
+
+
+def norm_pdf(x):
+    return np.exp(-0.5 * x * x) / SQRT_2PI
+
+
+def norm_cdf(x):
+    """Standard normal CDF via the Numerical Recipes erfc approximation (rel. error < 1.2e-7)."""
+    z = np.abs(x) / np.sqrt(2.0)
+    t = 1.0 / (1.0 + 0.5 * z)
+    poly = -z * z - 1.26551223 + t * (1.00002368 + t * (0.37409196 + t * (0.09678418 + t * (
+        -0.18628806 + t * (0.27886807 + t * (-1.13520398 + t * (1.48851587 + t * (
+            -0.82215223 + t * 0.17087277))))))))
+    erfc = t * np.exp(poly)
+    return np.where(x >= 0, 1.0 - 0.5 * erfc, 0.5 * erfc)
+
+
+def time_to_expiry(expiration, now=None):
+    """Years until 16:00 on the expiration date (YYYY-MM-DD), floored at one minute."""
+    now = now or datetime.now()
+    expiry = datetime.fromisoformat(str(expiration)[:10]).replace(hour=16)
+    return max((expiry - now).total_seconds() / (365 * 24 * 3600), 1 / (365 * 24 * 60))
+
+
+def _d1_d2(spot, strike, t, vol, rate, div):
+    vol_sqrt_t = vol * np.sqrt(t)
+    d1 = (np.log(spot / strike) + (rate - div + 0.5 * vol * vol) * t) / vol_sqrt_t
+    return d1, d1 - vol_sqrt_t
+
+
+def bs_put_price(spot, strike, t, vol, rate=RISK_FREE_RATE, div=0.0):
+    spot, strike, t, vol = np.broadcast_arrays(*(np.asarray(a, dtype=np.float64) for a in (spot, strike, t, vol)))
+    d1, d2 = _d1_d2(spot, strike, t, vol, rate, div)
+    return strike * np.exp(-rate * t) * norm_cdf(-d2) - spot * np.exp(-div * t) * norm_cdf(-d1)
+
+
+def bs_put_greeks(spot, strike, t, vol, rate=RISK_FREE_RATE, div=0.0) -> dict:
+    """
+    Theoretical PUT value and Greeks for arrays of contracts.
+    vega and rho are per 1 percentage point, theta is per calendar day.
+    """
+    spot, strike, t, vol = np.broadcast_arrays(*(np.asarray(a, dtype=np.float64) for a in (spot, strike, t, vol)))
+    d1, d2 = _d1_d2(spot, strike, t, vol, rate, div)
+    sqrt_t = np.sqrt(t)
+    disc_r = np.exp(-rate * t)
+    disc_q = np.exp(-div * t)
+    pdf_d1 = norm_pdf(d1)
+    cdf_md1 = norm_cdf(-d1)
+    cdf_md2 = norm_cdf(-d2)
+
+    price = strike * disc_r * cdf_md2 - spot * disc_q * cdf_md1
+    theta = (-spot * disc_q * pdf_d1 * vol / (2 * sqrt_t)
+             + rate * strike * disc_r * cdf_md2
+             - div * spot * disc_q * cdf_md1)
+
+    return {
+        "theo_price": price,
+        "delta": -disc_q * cdf_md1,
+        "gamma": disc_q * pdf_d1 / (spot * vol * sqrt_t),
+        "vega": spot * disc_q * pdf_d1 * sqrt_t / 100,
+        "theta": theta / 365,
+        "rho": -strike * t * disc_r * cdf_md2 / 100
+    }
+
+
+def implied_vol(price, spot, strike, t, rate=RISK_FREE_RATE, div=0.0, tol=1e-6, max_iter=50):
+    """
+    Solves for PUT implied volatility on whole arrays at once.
+    Newton steps are used while they stay inside the bracket, bisection otherwise.
+    Prices outside the no-arbitrage bounds return NaN.
+    """
+    price, spot, strike, t = np.broadcast_arrays(*(np.asarray(a, dtype=np.float64) for a in (price, spot, strike, t)))
+    shape = price.shape
+    price, spot, strike, t = (a.ravel() for a in (price, spot, strike, t))
+    lower_bound = np.maximum(strike * np.exp(-rate * t) - spot * np.exp(-div * t), 0)
+    upper_bound = strike * np.exp(-rate * t)
+    valid = np.isfinite(price) & (price > lower_bound) & (price < upper_bound)
+
+    lo = np.full(price.shape, MIN_VOL)
+    hi = np.full(price.shape, MAX_VOL)
+    vol = np.full(price.shape, 0.5)
+    active = valid.copy()
+
+    for _ in range(max_iter):
+        if not active.any():
+            break
+        idx = np.nonzero(active)[0]
+        g = bs_put_greeks(spot[idx], strike[idx], t[idx], vol[idx], rate, div)
+        diff = g["theo_price"] - price[idx]
+
+        done = np.abs(diff) < tol
+        # Price is increasing in vol, so the sign of diff tightens the bracket
+        lo[idx] = np.where(diff < 0, vol[idx], lo[idx])
+        hi[idx] = np.where(diff > 0, vol[idx], hi[idx])
+
+        vega = g["vega"] * 100
+        with np.errstate(divide="ignore", invalid="ignore"):
+            newton = vol[idx] - diff / vega
+        use_newton = np.isfinite(newton) & (newton > lo[idx]) & (newton < hi[idx])
+        vol[idx] = np.where(done, vol[idx], np.where(use_newton, newton, 0.5 * (lo[idx] + hi[idx])))
+
+        active[idx] = ~done & ((hi[idx] - lo[idx]) > tol)
+
+    return np.where(valid, vol, np.nan).reshape(shape)
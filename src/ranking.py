@@ -0,0 +1,197 @@
+# src/ranking.py
+# Searches (expiration, strike, contract count) combinations under a hedge budget.
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import timed
+from payoff import put_hedge_profile, resolve_range
+
+SHARES_PER_CONTRACT = 100
+MAX_TENSOR_CELLS = 4_000_000
+PARETO_BLOCK = 512
+
+
+def _skyline(rows: np.ndarray) -> np.ndarray:
+    """
+    Non-dominated mask for distinct rows already in lexicographic order, so a row can only be
+    dominated by an earlier one. Rows are checked a block at a time against the front kept so
+    far (preallocated) and against earlier rows of the same block; comparing with dominated
+    rows is unnecessary because whatever dominates them dominates the later row too.
+    """
+    n, k = rows.shape
+    keep = np.zeros(n, dtype=bool)
+    front = np.empty_like(rows)
+    size = 0
+    for start in range(0, n, PARETO_BLOCK):
+        block = rows[start:start + PARETO_BLOCK]
+        alive = np.ones(len(block), dtype=bool)
+        step = max(MAX_TENSOR_CELLS // (len(block) * k), 1)
+        for f in range(0, size, step):
+            alive &= ~(front[f:min(f + step, size), None, :] <= block[None, :, :]).all(axis=2).any(axis=0)
+
+        # Survivors of the front check only need comparing with earlier survivors of this block
+        idx = np.flatnonzero(alive)
+        if len(idx) > 1:
+            cand = block[idx]
+            # within[i, j]: survivor j comes before survivor i and is no worse anywhere
+            within = (cand[None, :, :] <= cand[:, None, :]).all(axis=2) & np.tri(len(idx), k=-1, dtype=bool)
+            alive[idx[within.any(axis=1)]] = False
+
+        kept = block[alive]
+        front[size:size + len(kept)] = kept
+        size += len(kept)
+        keep[start:start + len(block)] = alive
+    return keep
+
+
+def pareto_front(objectives: np.ndarray) -> np.ndarray:
+    """
+    Boolean mask of non-dominated rows. Every column is minimized; identical rows share a verdict.
+    Two objectives are a single sweep (running minimum of the second column in sorted order);
+    more use a blocked skyline.
+    """
+    objectives = np.asarray(objectives, dtype=np.float64)
+    if len(objectives) == 0:
+        return np.zeros(0, dtype=bool)
+    rows, inverse = np.unique(objectives, axis=0, return_inverse=True)  # sorted lexicographically
+    if rows.shape[1] == 1:
+        keep = rows[:, 0] == rows[0, 0]
+    elif rows.shape[1] == 2:
+        keep = np.ones(len(rows), dtype=bool)
+        keep[1:] = rows[1:, 1] < np.minimum.accumulate(rows[:-1, 1])
+    else:
+        keep = _skyline(rows)
+    return keep[inverse.ravel()]
+
+
+def _grid_scores(strikes, option_cost, counts, num_shares, avg_purchase_price, price_range):
+    """Worst P&L and loss-zone width read off the price grid (exact=False)."""
+    # Per-contract net payoff over the grid, reused for every contract count
+    stock_pnl = (price_range - avg_purchase_price) * num_shares
+    unit = np.maximum(strikes[:, None] - price_range, 0) * SHARES_PER_CONTRACT - option_cost[:, None]
+    max_n = len(counts)
+
+    # (contracts, counts, prices) P&L tensor, built a block of counts at a time to bound memory
+    worst = np.empty((len(strikes), max_n))
+    loss_points = np.empty((len(strikes), max_n))
+    block = max(MAX_TENSOR_CELLS // max(unit.size, 1), 1)
+    for start in range(0, max_n, block):
+        pnl = stock_pnl + counts[None, start:start + block, None] * unit[:, None, :]
+        worst[:, start:start + block] = pnl.min(axis=2)
+        loss_points[:, start:start + block] = (pnl < 0).sum(axis=2)
+    return worst, loss_points * (price_range[1] - price_range[0])
+
+
+def _score_expiration(chain, current_price, num_shares, avg_purchase_price, hedge_budget,
+                      max_contracts, price_range, exact=True):
+    strikes = chain["strike"].to_numpy(dtype=np.float64)
+    premiums = chain["mid_price"].to_numpy(dtype=np.float64)
+    option_cost = premiums * SHARES_PER_CONTRACT
+
+    affordable = np.where(option_cost > 0, np.floor(hedge_budget / np.where(option_cost > 0, option_cost, 1)), 0)
+    if max_contracts is not None:
+        affordable = np.minimum(affordable, max_contracts)
+    max_n = int(affordable.max()) if len(affordable) else 0
+    if max_n == 0:
+        return None
+
+    counts = np.arange(1, max_n + 1, dtype=np.float64)
+    if exact:
+        # Closed form over [lo, hi]: O(strikes x counts), independent of any price grid
+        lo, hi = resolve_range(current_price, price_range)
+        profile = put_hedge_profile(num_shares, avg_purchase_price, strikes[:, None], counts[None, :],
+                                    premiums[:, None], lo, hi)
+        worst, loss_width = profile["worst_pnl"], profile["loss_width"]
+        unhedged_worst = min((lo - avg_purchase_price) * num_shares, (hi - avg_purchase_price) * num_shares)
+    else:
+        worst, loss_width = _grid_scores(strikes, option_cost, counts, num_shares, avg_purchase_price, price_range)
+        unhedged_worst = ((price_range - avg_purchase_price) * num_shares).min()
+
+    valid = counts[None, :] <= affordable[:, None]
+    protection = worst - unhedged_worst
+    valid &= protection > 0
+    row_idx, count_idx = np.nonzero(valid)
+
+    total_cost = counts[count_idx] * option_cost[row_idx]
+    prot = protection[row_idx, count_idx]
+    scored = pd.DataFrame({
+        "row": chain.index.to_numpy()[row_idx],
+        "contracts": counts[count_idx].astype(int),
+        "total_put_cost": total_cost,
+        "worst_case_pnl": worst[row_idx, count_idx],
+        "protection": prot,
+        "cost_per_protection": total_cost / prot,
+        "loss_zone_width": loss_width[row_idx, count_idx]
+    })
+    return scored
+
+
+def _objectives(scored, cols):
+    # Rounded so float noise between equivalent candidates doesn't keep both; worst case is maximized
+    return np.round(scored[cols].to_numpy(), 6) * [1, -1, 1]
+
+
+@timed("simulate.rank_hedges")
+def rank_hedges(
+    chains: pd.DataFrame,
+    current_price: float,
+    num_shares: float,
+    hedge_budget: float,
+    avg_purchase_price: float = None,
+    max_contracts: int = None,
+    price_range=None,
+    exact: bool = True,
+    budget_source: str = "cash"
+) -> pd.DataFrame:
+    """
+    Pareto front of hedges under `hedge_budget`, scored on cost per unit of
+    downside protection, worst-case P&L and width of the loss zone.
+
+    `chains` holds PUT chains for one underlying (e.g. from fetch_put_chains); rows without an
+    "expiration" column are treated as a single expiry. Each expiration is reduced
+    to its own front before merging, so dominated candidates are dropped early.
+
+    exact=True scores each hedge on its piecewise-linear payoff over [min, max] of price_range
+    (default 0.4-1.6x current price); exact=False evaluates the P&L on the price_range grid.
+    budget_source="sell" funds the budget by selling shares at current_price, as simulate_decision does.
+    """
+    if avg_purchase_price is None:
+        avg_purchase_price = current_price
+    budget_source = budget_source.lower()
+    if budget_source == "sell":
+        num_shares = num_shares - hedge_budget / current_price
+        if num_shares <= 0:
+            raise ValueError("Not enough shares remaining after funding hedge from sales.")
+    elif budget_source != "cash":
+        raise ValueError(f"Unknown budget_source {budget_source!r}; use 'cash' or 'sell'.")
+    if price_range is None and not exact:
+        price_range = np.linspace(current_price * 0.4, current_price * 1.6, 300)
+    if price_range is not None:
+        price_range = np.asarray(price_range, dtype=np.float64)
+
+    chains = chains.reset_index(drop=True)
+    if "mid_price" not in chains.columns:
+        chains = chains.assign(mid_price=(chains["bid"] + chains["ask"]) / 2)
+    groups = chains.groupby("expiration", sort=False) if "expiration" in chains.columns else [(None, chains)]
+
+    objective_cols = ["cost_per_protection", "worst_case_pnl", "loss_zone_width"]
+    survivors = []
+    for _, chain in groups:
+        scored = _score_expiration(chain, current_price, num_shares, avg_purchase_price, hedge_budget,
+                                   max_contracts, price_range, exact)
+        if scored is None or scored.empty:
+            continue
+        survivors.append(scored[pareto_front(_objectives(scored, objective_cols))])
+
+    if not survivors:
+        return pd.DataFrame(columns=["strike", "mid_price", "contracts"] + objective_cols)
+
+    candidates = pd.concat(survivors, ignore_index=True)
+    candidates = candidates[pareto_front(_objectives(candidates, objective_cols))]
+
+    info_cols = [c for c in ("ticker", "expiration", "contractSymbol", "strike", "mid_price", "impliedVolatility")
+                 if c in chains.columns]
+    front = chains.loc[candidates["row"], info_cols].reset_index(drop=True)
+    front = pd.concat([front, candidates.drop(columns="row").reset_index(drop=True)], axis=1)
+    return front.sort_values("cost_per_protection").reset_index(drop=True)
@@ -0,0 +1,404 @@
+# src/server.py
+# Long-running local HTTP API over the hedge analytics, so dashboards and scripts share one warm process.
+# Run: python src/server.py --port 8765 --workers 4 --preload TSLA
+#
+# GET  /health, /metrics
+# GET  /expirations?ticker=TSLA
+# GET  /chain?ticker=TSLA&expiration=YYYY-MM-DD
+# GET  /filter?ticker=TSLA&expiration=...&min_volume=100&moneyness_low=0.95&moneyness_high=1.05&top=5
+# GET  /breakeven_map?ticker=TSLA&expiration=...&num_shares=100[&format=png]
+# POST /rank      {"ticker", "num_shares", "hedge_budget", "expirations": 3, ...}
+# POST /simulate  {"kind": "hedge" | "decision" | "monte_carlo" | "dynamic" | "strategy", ...simulator arguments}
+# Query-string and JSON-body parameters are interchangeable; numeric strings are read as numbers.
+# Bodies over MAX_BODY_BYTES are rejected with 413.
+
+import argparse
+import json
+import os
+import tempfile
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlparse
+
+import numpy as np
+import pandas as pd
+
+import instrumentation
+from bulk_fetcher import select_expirations
+from chain_index import ChainIndex
+from config.config_filters import FILTER_CONFIG
+from monitor import DataFetcherSource
+from utils import compute_breakeven_zones
+
+DEFAULT_PORT = 8765
+MAX_BODY_BYTES = 1024 * 1024
+WARM_MODULES = ("hedge_simulator", "hedge_decision_simulator", "ranking", "monte_carlo", "dynamic_hedge",
+                "strategy", "visualizer")
+
+
+class UnknownEndpoint(LookupError):
+    pass
+
+
+class Coalescer:
+    """
+    Runs one call per key at a time: concurrent callers with the same key wait on the
+    first caller's result instead of repeating the work (e.g. one upstream chain fetch
+    for many requests on the same ticker/expiration).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self.coalesced = 0
+
+    def run(self, key, fn):
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+            else:
+                self.coalesced += 1
+                instrumentation.count("server.coalesced")
+        if not owner:
+            return future.result()
+
+        try:
+            future.set_result(fn())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                del self._inflight[key]
+        return future.result()
+
+
+# --- worker-pool side (must be importable top-level functions) ---
+def _init_worker():
+    from visualizer import set_headless
+    set_headless()
+
+
+def _warm_worker():
+    """Imports the simulators in this worker so the first real request doesn't pay for it."""
+    import importlib
+    for name in WARM_MODULES:
+        importlib.import_module(name)
+    return os.getpid()
+
+
+def _simulate(kind, kwargs):
+    if kind == "hedge":
+        from hedge_simulator import simulate_hedge
+        return simulate_hedge(**kwargs), None
+    if kind == "decision":
+        from hedge_decision_simulator import simulate_decision
+        return simulate_decision(**kwargs)
+    if kind == "monte_carlo":
+        from monte_carlo import simulate_hedge_distribution
+        return simulate_hedge_distribution(**kwargs)
+    if kind == "dynamic":
+        from dynamic_hedge import simulate_dynamic_hedge
+        kwargs["candidates"] = pd.DataFrame(kwargs["candidates"])
+        return simulate_dynamic_hedge(**kwargs)
+    if kind == "strategy":
+        from strategy import simulate_strategies
+        return simulate_strategies(**kwargs)
+    raise ValueError(f"Unknown simulation kind: {kind}")
+
+
+def _rank(chains, kwargs):
+    from ranking import rank_hedges
+    return rank_hedges(chains, **kwargs)
+
+
+def _render_breakeven_map(zones, expiration):
+    from visualizer import plot_breakeven_zone_map
+    with tempfile.TemporaryDirectory() as tmp:
+        path = plot_breakeven_zone_map(zones, expiration, output_path=os.path.join(tmp, "map.png"))
+        with open(path, "rb") as f:
+            return f.read()
+
+
+# --- service ---
+def to_records(df: pd.DataFrame) -> list:
+    """JSON-safe rows: NaN becomes null and timestamps become ISO strings."""
+    return json.loads(df.to_json(orient="records", date_format="iso"))
+
+
+def _number(value):
+    """Query-string values arrive as text: numeric strings become int/float, anything else is unchanged."""
+    if not isinstance(value, str):
+        return value
+    for cast in (int, float):
+        try:
+            return cast(value)
+        except ValueError:
+            pass
+    return value
+
+
+def _jsonable(value):
+    if isinstance(value, pd.DataFrame):
+        return to_records(value)
+    if isinstance(value, dict):
+        return {str(k): _jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    if isinstance(value, np.ndarray):
+        return _jsonable(value.tolist())
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not np.isfinite(value):
+        return None
+    return value
+
+
+class HedgeService:
+    """
+    Endpoint logic, independent of HTTP. Upstream reads go through the source
+    (data_fetcher and its on-disk cache by default) behind a Coalescer; CPU-heavy
+    simulation, ranking and rendering run on a process pool.
+    """
+
+    def __init__(self, source=None, workers=4):
+        self.source = source or DataFetcherSource(ttl=60)
+        self.fetches = Coalescer()
+        self.requests = Coalescer()
+        self.workers = workers
+        self.pool = self._new_pool() if workers > 0 else None
+        self._pool_lock = threading.Lock()
+
+    def _new_pool(self):
+        return ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+
+    def _offload(self, fn, *args):
+        """
+        Runs fn on the pool. A worker dying breaks the whole pool, failing every request in
+        flight on it: the pool is rebuilt and each of those requests retried once, so only a
+        request that breaks the fresh pool too (the one killing workers) gets the error.
+        """
+        if self.pool is None:
+            return fn(*args)
+        for attempt in range(2):
+            pool = self.pool
+            try:
+                return pool.submit(fn, *args).result()
+            except BrokenProcessPool:
+                self._replace_pool(pool)
+                if attempt:
+                    raise
+
+    def _replace_pool(self, broken):
+        with self._pool_lock:
+            if self.pool is not broken:
+                return  # another request already rebuilt it
+            broken.shutdown(wait=False, cancel_futures=True)
+            self.pool = self._new_pool()
+            instrumentation.count("server.pool_rebuilt")
+            self.warm()
+
+    # --- coalesced upstream reads ---
+    def price(self, ticker):
+        return self.fetches.run(("price", ticker), lambda: self.source.get_price(ticker))
+
+    def expirations(self, ticker):
+        return self.fetches.run(("expirations", ticker), lambda: tuple(self.source.get_expirations(ticker)))
+
+    def chain(self, ticker, expiration):
+        return self.fetches.run(("chain", ticker, expiration), lambda: self.source.get_chain(ticker, expiration))
+
+    def warm(self):
+        """Starts every pool worker and imports the simulators, in the workers or in-process without a pool."""
+        if self.pool is None:
+            return [_warm_worker()]
+        futures = [self.pool.submit(_warm_worker) for _ in range(self.workers)]
+        return sorted({future.result() for future in futures})
+
+    def preload(self, tickers):
+        for ticker in tickers:
+            self.price(ticker)
+            expirations = self.expirations(ticker)
+            if expirations:
+                self.chain(ticker, expirations[0])
+
+    # --- endpoints ---
+    def handle(self, path, params):
+        handler = ROUTES.get(path)
+        if handler is None:
+            raise UnknownEndpoint(f"Unknown endpoint: {path}")
+        # Identical in-flight requests share one computation
+        key = (path, json.dumps(params, sort_keys=True, default=str))
+        with instrumentation.span(f"server{path}"):
+            return self.requests.run(key, lambda: handler(self, params))
+
+    def expirations_endpoint(self, params):
+        ticker = params.get("ticker", "TSLA")
+        return {"ticker": ticker, "expirations": list(self.expirations(ticker))}
+
+    def chain_endpoint(self, params):
+        ticker, expiration = self._ticker_expiration(params)
+        return {"ticker": ticker, "expiration": expiration, "rows": to_records(self.chain(ticker, expiration))}
+
+    def filter_endpoint(self, params):
+        ticker, expiration = self._ticker_expiration(params)
+        current_price = float(params.get("current_price") or self.price(ticker))
+        filtered = self._filtered(ticker, expiration, current_price, params)
+        return {"ticker": ticker, "expiration": expiration, "current_price": current_price,
+                "rows": to_records(filtered)}
+
+    def breakeven_map_endpoint(self, params):
+        ticker, expiration = self._ticker_expiration(params)
+        current_price = float(params.get("current_price") or self.price(ticker))
+        zones = compute_breakeven_zones(self._filtered(ticker, expiration, current_price, params),
+                                        current_price, float(params["num_shares"]))
+        if params.get("format") == "png":
+            if zones.empty:
+                raise ValueError("No PUTs pass the filter; nothing to plot.")
+            return self._offload(_render_breakeven_map, zones, expiration)
+        return {"ticker": ticker, "expiration": expiration, "current_price": current_price,
+                "rows": to_records(zones)}
+
+    def rank_endpoint(self, params):
+        ticker = params.get("ticker", "TSLA")
+        current_price = float(params.get("current_price") or self.price(ticker))
+        selector = params.get("expirations", 3)
+        selector = int(selector) if isinstance(selector, str) and selector.isdigit() else selector
+        selector = tuple(selector) if isinstance(selector, list) else selector
+        expirations = select_expirations(self.expirations(ticker), selector)
+        chains = pd.concat([self.chain(ticker, exp).assign(expiration=exp) for exp in expirations],
+                           ignore_index=True)
+        kwargs = {
+            "current_price": current_price,
+            "num_shares": float(params["num_shares"]),
+            "hedge_budget": float(params["hedge_budget"]),
+            "avg_purchase_price": float(params["avg_purchase_price"]) if params.get("avg_purchase_price") else None,
+            "max_contracts": int(params["max_contracts"]) if params.get("max_contracts") else None,
+            "budget_source": params.get("budget_source", "cash")
+        }
+        front = self._offload(_rank, chains, kwargs)
+        return {"ticker": ticker, "current_price": current_price, "rows": to_records(front)}
+
+    def simulate_endpoint(self, params):
+        params = dict(params)
+        kind = params.pop("kind", "decision")
+        ticker = params.pop("ticker", None)
+        params = {k: _number(v) for k, v in params.items()}
+        if "current_price" not in params and ticker is not None:
+            params["current_price"] = self.price(ticker)
+        df, meta = self._offload(_simulate, kind, params)
+        return {"kind": kind, "rows": to_records(df), "meta": _jsonable(meta)}
+
+    def health_endpoint(self, params):
+        return {"status": "ok", "pid": os.getpid(), "coalesced_fetches": self.fetches.coalesced,
+                "coalesced_requests": self.requests.coalesced}
+
+    def metrics_endpoint(self, params):
+        return _jsonable(instrumentation.snapshot())
+
+    # --- helpers ---
+    def _ticker_expiration(self, params):
+        ticker = params.get("ticker", "TSLA")
+        expiration = params.get("expiration") or self.expirations(ticker)[0]
+        return ticker, expiration
+
+    def _filtered(self, ticker, expiration, current_price, params):
+        moneyness = (float(params.get("moneyness_low", FILTER_CONFIG["moneyness_range"][0])),
+                     float(params.get("moneyness_high", FILTER_CONFIG["moneyness_range"][1])))
+        top = int(params["top"]) if params.get("top") else None
+        return ChainIndex(self.chain(ticker, expiration)).filter(
+            current_price, float(params.get("min_volume", FILTER_CONFIG["min_volume"])), moneyness, top)
+
+
+ROUTES = {
+    "/health": HedgeService.health_endpoint,
+    "/metrics": HedgeService.metrics_endpoint,
+    "/expirations": HedgeService.expirations_endpoint,
+    "/chain": HedgeService.chain_endpoint,
+    "/filter": HedgeService.filter_endpoint,
+    "/breakeven_map": HedgeService.breakeven_map_endpoint,
+    "/rank": HedgeService.rank_endpoint,
+    "/simulate": HedgeService.simulate_endpoint
+}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    service = None  # set by make_server
+
+    def _dispatch(self):
+        url = urlparse(self.path)
+        params = dict(parse_qsl(url.query))
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            return self._send(400, {"error": "Invalid Content-Length"})
+        if length > MAX_BODY_BYTES:
+            self.close_connection = True  # the unread body would otherwise be parsed as the next request
+            return self._send(413, {"error": f"Request body over {MAX_BODY_BYTES} bytes"})
+        try:
+            if length:
+                params.update(json.loads(self.rfile.read(length)))
+            result = self.service.handle(url.path, params)
+        except UnknownEndpoint as e:
+            return self._send(404, {"error": str(e)})
+        except (ValueError, KeyError, TypeError) as e:
+            return self._send(400, {"error": f"{type(e).__name__}: {e}"})
+        except Exception as e:
+            return self._send(500, {"error": f"{type(e).__name__}: {e}"})
+        self._send(200, result)
+
+    def _send(self, status, result):
+        if isinstance(result, bytes):
+            body, content_type = result, "image/png"
+        else:
+            body, content_type = json.dumps(_jsonable(result)).encode(), "application/json"
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = _dispatch
+    do_POST = _dispatch
+
+    def log_message(self, format, *args):
+        pass  # request timings are in /metrics
+
+
+def make_server(service: HedgeService, host="127.0.0.1", port=DEFAULT_PORT) -> ThreadingHTTPServer:
+    handler = type("HedgeHandler", (_Handler,), {"service": service})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve hedge analytics over a local HTTP API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=4, help="Processes for simulation/ranking/rendering")
+    parser.add_argument("--preload", nargs="*", default=None,
+                        help="Tickers to fetch before accepting requests; also starts and warms the worker pool")
+    args = parser.parse_args()
+
+    instrumentation.enable()
+    service = HedgeService(workers=args.workers)
+    if args.preload is not None:
+        service.warm()
+        service.preload(args.preload)
+    server = make_server(service, args.host, args.port)
+    print(f"✅ Serving hedge analytics on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("Server stopped.")
+    finally:
+        server.server_close()
+        service.close()
@@ -1,29 +1,351 @@
+import glob
+import json
 import os
+import threading
+import time
+from collections import OrderedDict
+
+# hashlib, numpy, pandas, getpass and sqlite3 are imported where used; main.py imports this module before first paint
+SESSION_DIR = os.path.join(os.path.dirname(__file__), '../session')
+SESSION_DB = "sessions.db"
+MAX_ARTIFACT_BYTES = 512 * 1024 * 1024
+MEMORY_ITEMS = 64
+# Part of every memo key; bump it when a memoized function's results change meaning so stored artifacts are not reused
+MEMO_VERSION = 2  # 2: exact breakevens (NaN when unbounded) and max_loss over all prices
+
+
+def content_hash(*parts) -> str:
+    """Stable hash of memo inputs: frames by content, arrays by raw bytes, containers recursively."""
+    import hashlib
+
+    import numpy as np
+
+    digest = hashlib.sha1()
+
+    def feed(value):
+        if isinstance(value, np.generic):
+            # np.float64(1.0) and 1.0 are the same input; hash both as the Python scalar
+            feed(value.item())
+        elif hasattr(value, "iloc") and hasattr(value, "columns"):
+            from logger import frame_hash
+            digest.update(b"frame:" + frame_hash(value).encode())
+        elif hasattr(value, "iloc"):
+            feed(value.to_frame())
+        elif hasattr(value, "dtype") and hasattr(value, "tobytes"):
+            digest.update(f"array:{value.dtype.str}:{value.shape}:".encode() + value.tobytes())
+        elif isinstance(value, dict):
+            digest.update(b"{")
+            for k in sorted(value, key=str):
+                feed(str(k))
+                feed(value[k])
+            digest.update(b"}")
+        elif isinstance(value, (list, tuple)):
+            digest.update(b"[")
+            for v in value:
+                feed(v)
+            digest.update(b"]")
+        else:
+            digest.update(f"{type(value).__name__}:{value!r};".encode())
+
+    for part in parts:
+        feed(part)
+    return digest.hexdigest()
+
+
+def _pack(value, frames):
+    """
+    JSON skeleton of a memoized value. DataFrames (and Series/arrays, as frames) are appended to
+    `frames` and referenced by position; anything else that isn't JSON data raises TypeError.
+    """
+    import math
+
+    import numpy as np
+    import pandas as pd
+
+    if isinstance(value, pd.DataFrame):
+        frames.append(value)
+        return {"$frame": len(frames) - 1}
+    if isinstance(value, pd.Series):
+        frames.append(value.to_frame())
+        return {"$series": len(frames) - 1}
+    if isinstance(value, np.ndarray):
+        frames.append(pd.DataFrame({"values": value.ravel()}))
+        return {"$array": len(frames) - 1, "shape": list(value.shape)}
+    if isinstance(value, (list, tuple)):
+        return {"$tuple" if isinstance(value, tuple) else "$list": [_pack(v, frames) for v in value]}
+    if isinstance(value, dict):
+        if not all(isinstance(k, str) for k in value):
+            raise TypeError("Only dicts with string keys can be stored")
+        return {"$dict": {k: _pack(v, frames) for k, v in value.items()}}
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return {"$float": repr(value)}
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    raise TypeError(f"Cannot store a {type(value).__name__}")
+
+
+def _unpack(node, frame):
+    """Inverse of _pack; frame(i) loads the i-th stored frame."""
+    if isinstance(node, dict):
+        if "$frame" in node:
+            return frame(node["$frame"])
+        if "$series" in node:
+            return frame(node["$series"]).iloc[:, 0]
+        if "$array" in node:
+            return frame(node["$array"])["values"].to_numpy().reshape(node["shape"])
+        if "$tuple" in node:
+            return tuple(_unpack(v, frame) for v in node["$tuple"])
+        if "$list" in node:
+            return [_unpack(v, frame) for v in node["$list"]]
+        if "$dict" in node:
+            return {k: _unpack(v, frame) for k, v in node["$dict"].items()}
+        if "$float" in node:
+            return float(node["$float"])
+    return node
+
+
+def _write_artifact(path, value):
+    """One npz holding the JSON skeleton and each frame as save_frame bytes; nothing is pickled."""
+    import io
+
+    import numpy as np
+    from chain_cache import save_frame
+
+    frames = []
+    skeleton = _pack(value, frames)
+    arrays = {"__value__": np.array(json.dumps(skeleton))}
+    for i, df in enumerate(frames):
+        buffer = io.BytesIO()
+        save_frame(buffer, df)
+        arrays[f"frame{i}"] = np.frombuffer(buffer.getvalue(), dtype=np.uint8)
+    with open(path, "wb") as f:
+        np.savez(f, **arrays)
+
+
+def _read_artifact(path):
+    import io
+
+    import numpy as np
+    from chain_cache import load_frame
+
+    with np.load(path, allow_pickle=False) as data:
+        skeleton = json.loads(str(data["__value__"]))
+        return _unpack(skeleton, lambda i: load_frame(io.BytesIO(data[f"frame{i}"].tobytes())))
+
+
+class SessionStore:
+    """
+    Per-user/session state plus a content-addressed memo of derived artifacts
+    (filtered chains, breakeven tables, simulation grids) shared by all sessions.
+
+    State and the artifact index live in one SQLite database, so any number of
+    processes can use the same root; artifact files are written atomically and a
+    size-bounded LRU evicts the least recently used ones. Artifacts are npz files
+    (frames plus a JSON skeleton, never pickles), so reading one written by another
+    user cannot run code; values that can't be stored that way are memoized in memory
+    only. Memoized values are shared, so callers must not mutate what they get back.
+    """
+
+    def __init__(self, user=None, session_id=None, root=SESSION_DIR, max_bytes=MAX_ARTIFACT_BYTES,
+                 memory_items=MEMORY_ITEMS):
+        import getpass
+
+        self.user = user or os.environ.get("HEDGE_USER") or getpass.getuser()
+        self.session_id = session_id or os.environ.get("HEDGE_SESSION") or "default"
+        self.root = root
+        self.artifact_dir = os.path.join(root, "artifacts")
+        self.max_bytes = max_bytes
+        self.memory_items = memory_items
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+        # Artifacts decoded by this store, bounded by memory_items; get_session_store() keeps one
+        # store per process, so they survive Streamlit reruns without leaking across stores
+        self._memory = OrderedDict()
+        self._memory_lock = threading.Lock()
+        os.makedirs(self.artifact_dir, exist_ok=True)
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("CREATE TABLE IF NOT EXISTS state (user TEXT, session TEXT, name TEXT, value TEXT, "
+                       "updated REAL, PRIMARY KEY (user, session, name))")
+            db.execute("CREATE TABLE IF NOT EXISTS artifacts (key TEXT PRIMARY KEY, kind TEXT, file TEXT, "
+                       "size INTEGER, created REAL, last_access REAL)")
+
+    def _connect(self):
+        import sqlite3
+        # One short-lived connection per operation keeps the store usable from any thread or process
+        return _Connection(sqlite3.connect(os.path.join(self.root, SESSION_DB), timeout=30, isolation_level=None))
+
+    # --- per-session state ---
+    def get(self, name, default=None):
+        with self._connect() as db:
+            row = db.execute("SELECT value FROM state WHERE user=? AND session=? AND name=?",
+                             (self.user, self.session_id, name)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set(self, name, value):
+        with self._connect() as db:
+            db.execute("INSERT OR REPLACE INTO state VALUES (?, ?, ?, ?, ?)",
+                       (self.user, self.session_id, name, json.dumps(value), time.time()))
+
+    def clear(self):
+        """Drops this session's state; shared artifacts stay for other sessions."""
+        with self._connect() as db:
+            db.execute("DELETE FROM state WHERE user=? AND session=?", (self.user, self.session_id))
+
+    # --- shared artifact memo ---
+    def memoize(self, kind, fn, *args, **kwargs):
+        """fn(*args, **kwargs), reused while kind, fn, MEMO_VERSION and the inputs' content hash match."""
+        name = f"{getattr(fn, '__module__', '')}.{getattr(fn, '__qualname__', repr(fn))}"
+        key = content_hash(kind, name, MEMO_VERSION, args, kwargs)
+        found, value = self.lookup(key)
+        if found:
+            return value
+        value = fn(*args, **kwargs)
+        self.store(key, kind, value)
+        return value
+
+    def _count(self, hit):
+        with self._stats_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def lookup(self, key):
+        """(True, value) on a hit in memory or on disk, (False, None) otherwise."""
+        import zipfile
+
+        with self._memory_lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                found, value = True, self._memory[key]
+            else:
+                found, value = False, None
+        if found:
+            self._count(True)
+            return True, value
+
+        with self._connect() as db:
+            row = db.execute("SELECT file FROM artifacts WHERE key=?", (key,)).fetchone()
+            if row is None:
+                self._count(False)
+                return False, None
+            try:
+                value = _read_artifact(os.path.join(self.artifact_dir, row[0]))
+            except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+                # Evicted or half-written by another process; treat as a miss
+                self._count(False)
+                return False, None
+            db.execute("UPDATE artifacts SET last_access=? WHERE key=?", (time.time(), key))
+
+        self._remember(key, value)
+        self._count(True)
+        return True, value
+
+    def store(self, key, kind, value):
+        filename = f"{key}.npz"
+        path = os.path.join(self.artifact_dir, filename)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            _write_artifact(tmp_path, value)
+        except TypeError:
+            # Not representable without pickling: keep it for this process only
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            self._remember(key, value)
+            return
+        os.replace(tmp_path, path)
+
+        now = time.time()
+        with self._connect() as db:
+            db.execute("INSERT OR REPLACE INTO artifacts VALUES (?, ?, ?, ?, ?, ?)",
+                       (key, kind, filename, os.path.getsize(path), now, now))
+        self._remember(key, value)
+        self._evict()
+
+    def _remember(self, key, value):
+        with self._memory_lock:
+            self._memory[key] = value
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_items:
+                self._memory.popitem(last=False)
+
+    def _evict(self):
+        with self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")  # one evicting process at a time
+            total = db.execute("SELECT COALESCE(SUM(size), 0) FROM artifacts").fetchone()[0]
+            victims = []
+            if total > self.max_bytes:
+                for key, filename, size in db.execute("SELECT key, file, size FROM artifacts "
+                                                      "ORDER BY last_access").fetchall():
+                    if total <= self.max_bytes:
+                        break
+                    victims.append((key, filename))
+                    total -= size
+                db.executemany("DELETE FROM artifacts WHERE key=?", [(key,) for key, _ in victims])
+            db.execute("COMMIT")
+        for _, filename in victims:
+            try:
+                os.remove(os.path.join(self.artifact_dir, filename))
+            except FileNotFoundError:
+                pass
+
+    def stats(self):
+        with self._connect() as db:
+            entries, size = db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM artifacts").fetchone()
+        with self._stats_lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / total if total else 0.0,
+            "entries": entries,
+            "bytes": size
+        }
+
+
+class _Connection:
+    """Closes the sqlite connection on exit (sqlite3's own context manager only commits)."""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __enter__(self):
+        return self.connection
+
+    def __exit__(self, *exc):
+        self.connection.close()
+
+
+_default_store = None
+
+
+def get_session_store() -> SessionStore:
+    global _default_store
+    if _default_store is None:
+        _default_store = SessionStore()
+    return _default_store
 
-SESSION_FILE = os.path.join(os.path.dirname(__file__), '../session/selected_exp.txt')
 
 def save_selected_expiration(exp_date):
-    os.makedirs(os.path.dirname(SESSION_FILE), exist_ok=True)
-    with open(SESSION_FILE, 'w') as f:
-        f.write(exp_date)
+    get_session_store().set("selected_expiration", exp_date)
 
 def get_selected_expiration():
-    if os.path.exists(SESSION_FILE):
-        with open(SESSION_FILE, 'r') as f:
-            return f.read().strip()
-    return None
+    return get_session_store().get("selected_expiration")
 
 def clear_session():
-    try:
-        os.remove(SESSION_FILE)
-    except FileNotFoundError:
-        pass
-import os
-import glob
+    get_session_store().clear()
 
 def clear_cache_files():
     """Deletes cache files and session logs at the start of a session."""
-    cache_patterns = ["puts_*.csv", "logs/*.txt"]
+    from logger import shutdown_logger
+    shutdown_logger()  # the writer thread holds the .jsonl open
+
+    cache_patterns = ["puts_*.csv", "logs/*.txt", "logs/*.jsonl*", "logs/grids/*.npz"]
 
     for pattern in cache_patterns:
         for file in glob.glob(pattern):
@@ -0,0 +1,174 @@
+# src/snapshot_store.py
+# Append-only, partitioned columnar store for chain snapshots and breakeven maps.
+#
+# Layout: <root>/<dataset>/ticker=<T>/expiration=<YYYY-MM-DD>/date=<YYYY-MM-DD>/part-<ts>/
+#   _schema.json      column kinds, row count and min/max stats used for pruning
+#   <col>.npy         one typed array per column (memory-mapped on read)
+#   <col>.dict.npy    dictionary for string columns, whose .npy holds int32 codes
+
+import json
+import os
+import time
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+STORE_DIR = os.path.join(os.path.dirname(__file__), '../snapshots')
+SCHEMA_FILE = "_schema.json"
+STATS_COLUMNS = ("strike",)
+# Model outputs that tolerate float32; every other float column (strikes, prices, premiums,
+# breakevens) stays float64 so stored quotes read back exactly
+FLOAT32_COLUMNS = ("impliedVolatility", "iv_used", "delta", "gamma", "vega", "theta", "rho")
+
+
+def _encode_column(values: pd.Series, name=None):
+    """Returns (kind, arrays, column_meta) with compact dtypes."""
+    if isinstance(values.dtype, pd.DatetimeTZDtype) or pd.api.types.is_datetime64_any_dtype(values):
+        tz = str(values.dt.tz) if values.dt.tz is not None else None
+        utc = values.dt.tz_convert("UTC").dt.tz_localize(None) if tz else values
+        ns = utc.astype("datetime64[ns]").to_numpy().view(np.int64)
+        return "datetime", {"": ns}, {"tz": tz}
+    if pd.api.types.is_bool_dtype(values):
+        return "bool", {"": values.to_numpy(dtype=bool)}, {}
+    if pd.api.types.is_integer_dtype(values):
+        arr = values.to_numpy()
+        small = len(arr) == 0 or (arr.min() >= np.iinfo(np.int32).min and arr.max() <= np.iinfo(np.int32).max)
+        return "int", {"": arr.astype(np.int32 if small else np.int64)}, {}
+    if pd.api.types.is_float_dtype(values):
+        dtype = np.float32 if name in FLOAT32_COLUMNS else np.float64
+        return "float", {"": values.to_numpy(dtype=dtype)}, {}
+    # Stringify present values only; missing ones keep the -1 sentinel code and read back as null
+    present = values.notna()
+    strings = pd.Series(np.where(present, values.astype(str), None), index=values.index, dtype=object)
+    codes, uniques = pd.factorize(strings, use_na_sentinel=True)
+    return "dict", {"": codes.astype(np.int32), ".dict": np.asarray(uniques, dtype=np.str_)}, {}
+
+
+def _decode_column(part_dir, name, meta, mask=None):
+    arr = np.load(os.path.join(part_dir, f"{name}.npy"), mmap_mode="r")
+    if mask is not None:
+        arr = arr[mask]
+    kind = meta["kind"]
+    if kind == "datetime":
+        values = pd.Series(np.asarray(arr).view("datetime64[ns]"))
+        if meta.get("tz"):
+            values = values.dt.tz_localize("UTC").dt.tz_convert(meta["tz"])
+        return values
+    if kind == "dict":
+        dictionary = np.load(os.path.join(part_dir, f"{name}.dict.npy"))
+        codes = np.asarray(arr)
+        return pd.Series(pd.Categorical.from_codes(codes, categories=dictionary) if len(dictionary)
+                         else np.full(len(codes), None, dtype=object))
+    return pd.Series(np.asarray(arr))
+
+
+class SnapshotStore:
+    """
+    Append-only snapshot store. Every write() creates a new immutable part, so readers
+    never see partial data; reads prune by partition (ticker, expiration, date) and by
+    per-part strike stats before touching any column file.
+    """
+
+    def __init__(self, root=STORE_DIR):
+        self.root = root
+
+    def write(self, df: pd.DataFrame, ticker: str, expiration: str, snapshot_date=None,
+              dataset: str = "chains", snapshot_ts=None) -> str:
+        snapshot_ts = snapshot_ts or time.time()
+        snapshot_date = str(snapshot_date or datetime.fromtimestamp(snapshot_ts).date())
+        partition = os.path.join(self.root, dataset, f"ticker={ticker}", f"expiration={expiration}",
+                                 f"date={snapshot_date}")
+        os.makedirs(partition, exist_ok=True)
+
+        part_name = f"part-{int(snapshot_ts * 1e6)}-{os.getpid()}"
+        tmp_dir = os.path.join(partition, "." + part_name)
+        os.makedirs(tmp_dir)
+
+        schema = {"rows": len(df), "snapshot_ts": snapshot_ts, "columns": {}, "stats": {}}
+        for col in df.columns:
+            kind, arrays, meta = _encode_column(df[col], col)
+            for suffix, arr in arrays.items():
+                np.save(os.path.join(tmp_dir, f"{col}{suffix}.npy"), arr)
+            schema["columns"][str(col)] = {"kind": kind, **meta}
+            if col in STATS_COLUMNS and len(df):
+                schema["stats"][col] = [float(df[col].min()), float(df[col].max())]
+
+        with open(os.path.join(tmp_dir, SCHEMA_FILE), "w") as f:
+            json.dump(schema, f)
+        final_dir = os.path.join(partition, part_name)
+        os.rename(tmp_dir, final_dir)
+        return final_dir
+
+    # --- reading ---
+    def _partitions(self, dataset, ticker=None, expiration=None, start_date=None, end_date=None):
+        """Yields (ticker, expiration, date, part_dir) in date order, pruned by directory name."""
+        base = os.path.join(self.root, dataset)
+        start_date = str(start_date) if start_date else None
+        end_date = str(end_date) if end_date else None
+
+        def listing(path, prefix):
+            if not os.path.isdir(path):
+                return []
+            return sorted(name[len(prefix):] for name in os.listdir(path) if name.startswith(prefix))
+
+        tickers = [ticker] if isinstance(ticker, str) else ticker
+        expirations = [expiration] if isinstance(expiration, str) else expiration
+        rows = []
+        for t in listing(base, "ticker="):
+            if tickers and t not in tickers:
+                continue
+            for exp in listing(os.path.join(base, f"ticker={t}"), "expiration="):
+                if expirations and exp not in expirations:
+                    continue
+                exp_dir = os.path.join(base, f"ticker={t}", f"expiration={exp}")
+                for d in listing(exp_dir, "date="):
+                    if (start_date and d < start_date) or (end_date and d > end_date):
+                        continue
+                    date_dir = os.path.join(exp_dir, f"date={d}")
+                    for part in listing(date_dir, "part-"):
+                        rows.append((d, t, exp, os.path.join(date_dir, "part-" + part)))
+        for d, t, exp, part_dir in sorted(rows):
+            yield t, exp, d, part_dir
+
+    def iter_snapshots(self, dataset="chains", ticker=None, expiration=None, start_date=None, end_date=None,
+                       columns=None, strike_range=None):
+        """
+        Lazily yields (ticker, expiration, snapshot_date, snapshot_ts, df), one part at a time.
+        Only `columns` are read (memory-mapped); strike_range=(lo, hi) skips parts by stats
+        and filters rows before decoding the other columns.
+        """
+        for t, exp, d, part_dir in self._partitions(dataset, ticker, expiration, start_date, end_date):
+            with open(os.path.join(part_dir, SCHEMA_FILE), "r") as f:
+                schema = json.load(f)
+
+            mask = None
+            if strike_range is not None and "strike" in schema["columns"]:
+                lo, hi = strike_range
+                stats = schema["stats"].get("strike")
+                if stats and (stats[1] < lo or stats[0] > hi):
+                    continue
+                strikes = np.load(os.path.join(part_dir, "strike.npy"), mmap_mode="r")
+                mask = (strikes >= lo) & (strikes <= hi)
+                if not mask.any():
+                    continue
+
+            names = [c for c in (columns or schema["columns"]) if c in schema["columns"]]
+            df = pd.DataFrame({name: _decode_column(part_dir, name, schema["columns"][name], mask)
+                               for name in names})
+            yield t, exp, d, schema["snapshot_ts"], df
+
+    def read(self, dataset="chains", ticker=None, expiration=None, start_date=None, end_date=None,
+             columns=None, strike_range=None) -> pd.DataFrame:
+        """Concatenates matching snapshots, tagged with ticker, expiration, snapshot_date and snapshot_ts."""
+        frames = []
+        for t, exp, d, ts, df in self.iter_snapshots(dataset, ticker, expiration, start_date, end_date,
+                                                     columns, strike_range):
+            df.insert(0, "snapshot_ts", ts)
+            df.insert(0, "snapshot_date", d)
+            df.insert(0, "expiration", exp)
+            df.insert(0, "ticker", t)
+            frames.append(df)
+        if not frames:
+            return pd.DataFrame(columns=["ticker", "expiration", "snapshot_date", "snapshot_ts"] + list(columns or []))
+        return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,86 @@
+# src/startup_bench.py
+# Measures cold-start latency of the CLI: import time of main.py and time to first menu paint.
+# Run: python src/startup_bench.py [runs]
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_FILE = os.path.join(SRC_DIR, "../logs/startup_bench.jsonl")
+
+# Runs inside a fresh interpreter; the background stock-info fetch is not started,
+# since first paint must not depend on it.
+PROBE = """
+import io, json, sys, time, contextlib
+t0 = time.perf_counter()
+import main
+t1 = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    main.menu()
+t2 = time.perf_counter()
+heavy = [m for m in ("yfinance", "pandas", "numpy", "matplotlib") if m in sys.modules]
+print("BENCH " + json.dumps({"import_s": t1 - t0, "first_paint_s": t2 - t0, "heavy_modules_loaded": heavy}))
+"""
+
+
+def run_once():
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=SRC_DIR,
+        input="100\n",  # answers the NUM_SHARES prompt when config has no NUM_SHARES
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    # The NUM_SHARES prompt has no trailing newline, so locate the marker rather than the last line
+    result = json.loads(proc.stdout[proc.stdout.rindex("BENCH ") + len("BENCH "):])
+    result["process_s"] = time.perf_counter() - start
+    return result
+
+
+def import_breakdown(top=10):
+    """Slowest modules (cumulative microseconds) from -X importtime for `import main`."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"], cwd=SRC_DIR,
+                          input="100\n", capture_output=True, text=True, check=True)
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        # "import time:  self_us | cumulative_us | module"
+        _, cumulative_us, name = line.split("|")
+        rows.append((int(cumulative_us), name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def bench(runs=5):
+    results = [run_once() for _ in range(runs)]
+    summary = {
+        "ts": time.time(),
+        "runs": runs,
+        "import_s_median": statistics.median(r["import_s"] for r in results),
+        "first_paint_s_median": statistics.median(r["first_paint_s"] for r in results),
+        "process_s_median": statistics.median(r["process_s"] for r in results),
+        "heavy_modules_loaded": results[-1]["heavy_modules_loaded"]
+    }
+    os.makedirs(os.path.dirname(RESULTS_FILE), exist_ok=True)
+    with open(RESULTS_FILE, "a") as f:
+        f.write(json.dumps(summary) + "\n")
+    return summary
+
+
+if __name__ == "__main__":
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    summary = bench(runs)
+    print(f"Import main.py:   {summary['import_s_median'] * 1000:.1f} ms")
+    print(f"First menu paint: {summary['first_paint_s_median'] * 1000:.1f} ms")
+    print(f"Process total:    {summary['process_s_median'] * 1000:.1f} ms")
+    print(f"Heavy modules at first paint: {summary['heavy_modules_loaded'] or 'none'}")
+    print("\nSlowest imports (cumulative):")
+    for cumulative_us, name in import_breakdown():
+        print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+    print(f"\n📁 Results appended to {RESULTS_FILE}")
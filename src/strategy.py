@@ -0,0 +1,212 @@
+# src/strategy.py
+# Multi-leg option strategies (collars, spreads, ladders) stored as parallel leg arrays.
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import timed
+from payoff import resolve_range
+from pricing import RISK_FREE_RATE, bs_put_greeks
+
+SHARES_PER_CONTRACT = 100
+PUT = 0
+CALL = 1
+
+
+class StrategySet:
+    """
+    Many strategies held as flat leg arrays. Legs of one strategy are contiguous and
+    `offsets[i]` is the index of strategy i's first leg. Quantities are in contracts,
+    positive for long and negative for short; premiums are per share.
+    """
+
+    def __init__(self, strategy_id, option_type, strike, quantity, premium, shares=None, cost_basis=None):
+        strategy_id = np.asarray(strategy_id, dtype=np.int32)
+        order = np.argsort(strategy_id, kind="stable")
+        self.strategy_id = strategy_id[order]
+        self.option_type = np.asarray(option_type, dtype=np.int8)[order]
+        self.strike = np.asarray(strike, dtype=np.float64)[order]
+        self.quantity = np.asarray(quantity, dtype=np.float64)[order]
+        self.premium = np.asarray(premium, dtype=np.float64)[order]
+
+        self.n_strategies = int(self.strategy_id.max()) + 1 if len(self.strategy_id) else 0
+        counts = np.bincount(self.strategy_id, minlength=self.n_strategies)
+        if np.any(counts == 0):
+            raise ValueError("Every strategy needs at least one leg.")
+        self.offsets = np.concatenate([[0], np.cumsum(counts)[:-1]])
+
+        self.shares = np.zeros(self.n_strategies) if shares is None else \
+            np.broadcast_to(np.asarray(shares, dtype=np.float64), (self.n_strategies,)).copy()
+        self.cost_basis = np.zeros(self.n_strategies) if cost_basis is None else \
+            np.broadcast_to(np.asarray(cost_basis, dtype=np.float64), (self.n_strategies,)).copy()
+
+    def __len__(self):
+        return self.n_strategies
+
+    # --- builders ---
+    @classmethod
+    def from_legs(cls, strategies, shares=None, cost_basis=None):
+        """strategies: list of leg lists, each leg a dict with type ("put"/"call"), strike, quantity, premium."""
+        rows = [(i, CALL if leg["type"] == "call" else PUT, leg["strike"], leg["quantity"], leg["premium"])
+                for i, legs in enumerate(strategies) for leg in legs]
+        return cls(*zip(*rows), shares=shares, cost_basis=cost_basis)
+
+    @classmethod
+    def collars(cls, put_strikes, put_premiums, call_strikes, call_premiums, contracts=1, shares=0, cost_basis=0):
+        """Long PUT + short CALL per element of the (broadcast) input arrays."""
+        put_strikes, put_premiums, call_strikes, call_premiums, contracts = np.broadcast_arrays(
+            put_strikes, put_premiums, call_strikes, call_premiums, contracts)
+        n = put_strikes.size
+        return cls(
+            strategy_id=np.repeat(np.arange(n), 2),
+            option_type=np.tile([PUT, CALL], n),
+            strike=np.column_stack([put_strikes.ravel(), call_strikes.ravel()]).ravel(),
+            quantity=np.column_stack([contracts.ravel(), -contracts.ravel()]).ravel(),
+            premium=np.column_stack([put_premiums.ravel(), call_premiums.ravel()]).ravel(),
+            shares=shares,
+            cost_basis=cost_basis
+        )
+
+    @classmethod
+    def put_spreads(cls, long_strikes, long_premiums, short_strikes, short_premiums, contracts=1):
+        """Long PUT at the higher strike, short PUT at the lower strike."""
+        long_strikes, long_premiums, short_strikes, short_premiums, contracts = np.broadcast_arrays(
+            long_strikes, long_premiums, short_strikes, short_premiums, contracts)
+        n = long_strikes.size
+        return cls(
+            strategy_id=np.repeat(np.arange(n), 2),
+            option_type=np.full(2 * n, PUT),
+            strike=np.column_stack([long_strikes.ravel(), short_strikes.ravel()]).ravel(),
+            quantity=np.column_stack([contracts.ravel(), -contracts.ravel()]).ravel(),
+            premium=np.column_stack([long_premiums.ravel(), short_premiums.ravel()]).ravel()
+        )
+
+    @classmethod
+    def put_ladder(cls, strikes, premiums, quantities):
+        """One strategy holding PUTs at several strikes (e.g. a 1x-1x-1x ladder)."""
+        n = len(strikes)
+        return cls(np.zeros(n), np.full(n, PUT), strikes, quantities, premiums)
+
+    # --- evaluation ---
+    def _segment_sum(self, values):
+        return np.add.reduceat(values, self.offsets, axis=0)
+
+    def leg_pnl(self, price_range):
+        price_range = np.asarray(price_range, dtype=np.float64)
+        # +1 for CALLs, -1 for PUTs turns both payoffs into max(direction * (S - K), 0)
+        direction = np.where(self.option_type == CALL, 1.0, -1.0)
+        intrinsic = np.subtract.outer(-self.strike, -price_range)
+        intrinsic *= direction[:, None]
+        np.maximum(intrinsic, 0, out=intrinsic)
+        intrinsic -= self.premium[:, None]
+        intrinsic *= (self.quantity * SHARES_PER_CONTRACT)[:, None]
+        return intrinsic
+
+    def payoff(self, price_range) -> np.ndarray:
+        """(strategies x prices) P&L at expiry, including any stock held."""
+        price_range = np.asarray(price_range, dtype=np.float64)
+        pnl = self._segment_sum(self.leg_pnl(price_range))
+        pnl += self.shares[:, None] * (price_range[None, :] - self.cost_basis[:, None])
+        return pnl
+
+    def upper_slope(self) -> np.ndarray:
+        """Slope of P&L above every strike: stock plus net CALL quantity."""
+        call_qty = self._segment_sum(np.where(self.option_type == CALL, self.quantity, 0.0))
+        return self.shares + call_qty * SHARES_PER_CONTRACT
+
+    def _pnl_at(self, x) -> np.ndarray:
+        """P&L of strategy i at prices x[i] (strategies x points)."""
+        direction = np.where(self.option_type == CALL, 1.0, -1.0)
+        legs = x[self.strategy_id] - self.strike[:, None]
+        legs *= direction[:, None]
+        np.maximum(legs, 0, out=legs)
+        legs -= self.premium[:, None]
+        legs *= (self.quantity * SHARES_PER_CONTRACT)[:, None]
+        return self._segment_sum(legs) + self.shares[:, None] * (x - self.cost_basis[:, None])
+
+    def _points(self, lo=0.0):
+        """
+        Each strategy's P&L is piecewise linear with kinks at its strikes, so it is exactly the
+        polyline through lo, the strikes and a point past both the top strike and any root of the
+        upper tail. Shorter strategies repeat lo, adding only zero-length segments.
+        """
+        counts = np.diff(np.append(self.offsets, len(self.strike)))
+        kinks = np.full((self.n_strategies, int(counts.max())), float(lo))
+        kinks[self.strategy_id, np.arange(len(self.strike)) - self.offsets[self.strategy_id]] = \
+            np.maximum(self.strike, lo)
+        kinks.sort(axis=1)
+        top = kinks[:, -1] + 1.0
+        x = np.column_stack([np.full(self.n_strategies, float(lo)), kinks, top])
+        f = self._pnl_at(x)
+
+        slope = self.upper_slope()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            root = top - f[:, -1] / slope
+        end = np.where(np.isfinite(root) & (root > top), root, top) + 1.0
+        return np.column_stack([x, end]), np.column_stack([f, f[:, -1] + slope * (end - top)])
+
+    def breakevens(self, lo=0.0) -> pd.DataFrame:
+        """Every price at or above lo where a strategy's P&L changes sign, solved at the strikes."""
+        x, f = self._points(lo)
+        x0, x1, f0, f1 = x[:, :-1], x[:, 1:], f[:, :-1], f[:, 1:]
+        rows, cols = np.nonzero(((f0 >= 0) & (f1 < 0)) | ((f0 < 0) & (f1 >= 0)))
+        y0, y1 = f0[rows, cols], f1[rows, cols]
+        root = x0[rows, cols] + y0 * (x1[rows, cols] - x0[rows, cols]) / (y0 - y1)
+        return pd.DataFrame({"strategy": rows, "breakeven": root})
+
+    def max_loss_gain(self, lo=0.0) -> pd.DataFrame:
+        """
+        max_loss (largest loss in dollars, >= 0) and max_gain (best P&L) over prices >= lo,
+        exact from the kinks; inf where the upper tail is unbounded.
+        """
+        x, f = self._points(lo)
+        slope = self.upper_slope()
+        max_loss = np.where(slope < 0, np.inf, np.maximum(-f.min(axis=1), 0.0))
+        max_gain = np.where(slope > 0, np.inf, f.max(axis=1))
+        return pd.DataFrame({"max_loss": max_loss, "max_gain": max_gain})
+
+    def greeks(self, spot, t, vol, rate=RISK_FREE_RATE, div=0.0) -> pd.DataFrame:
+        """
+        Position Greeks per strategy. `t` and `vol` may be scalars or one value per leg
+        (in self's sorted leg order). CALL Greeks come from put-call parity.
+        """
+        g = bs_put_greeks(spot, self.strike, t, vol, rate=rate, div=div)
+        is_call = self.option_type == CALL
+        t = np.broadcast_to(np.asarray(t, dtype=np.float64), self.strike.shape)
+
+        g["delta"] = np.where(is_call, g["delta"] + np.exp(-div * t), g["delta"])
+        call_theta = g["theta"] + (div * spot * np.exp(-div * t) - rate * self.strike * np.exp(-rate * t)) / 365
+        g["theta"] = np.where(is_call, call_theta, g["theta"])
+        g["rho"] = np.where(is_call, g["rho"] + self.strike * t * np.exp(-rate * t) / 100, g["rho"])
+
+        scale = self.quantity * SHARES_PER_CONTRACT
+        out = {name: self._segment_sum(g[name] * scale) for name in ("delta", "gamma", "vega", "theta", "rho")}
+        out["delta"] = out["delta"] + self.shares
+        return pd.DataFrame(out)
+
+
+@timed("simulate.simulate_strategies")
+def simulate_strategies(current_price, strategies, shares=0, cost_basis=None, price_range=None,
+                        num_points=100) -> tuple[pd.DataFrame, dict]:
+    """
+    Expiry P&L of multi-leg strategies (leg lists as in StrategySet.from_legs) over price_range
+    (default 0.4-1.6x current price), one column per strategy. Metadata holds each strategy's
+    breakevens, max_loss and max_gain over all prices, which are exact rather than read off the grid.
+    """
+    cost_basis = current_price if cost_basis is None else cost_basis
+    book = StrategySet.from_legs(strategies, shares=shares, cost_basis=cost_basis)
+    low, high = resolve_range(current_price, price_range)
+    prices = price_range if isinstance(price_range, np.ndarray) else np.linspace(low, high, num_points)
+
+    pnl = book.payoff(prices)
+    df = pd.DataFrame({"Future Price ($)": prices,
+                       **{f"Strategy {i} P&L ($)": pnl[i] for i in range(len(book))}})
+    extremes = book.max_loss_gain()
+    breakevens = book.breakevens()
+    metadata = {"strategies": [
+        {"breakevens": breakevens.loc[breakevens["strategy"] == i, "breakeven"].tolist(),
+         "max_loss": float(extremes["max_loss"].iloc[i]),
+         "max_gain": float(extremes["max_gain"].iloc[i])}
+        for i in range(len(book))
+    ]}
+    return df, metadata
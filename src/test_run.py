@@ -10,4 +10,4 @@ df = simulate_hedge(
     contracts=1
 )
 
-plot_hedge_simulation(df)
+plot_hedge_simulation(df, strike=240, premium=5.0, expiration="sample")
@@ -1,10 +1,13 @@
 import pandas as pd
 
+from instrumentation import timed
+
 def calculate_put_values(strike, market_price, option_price):
     intrinsic_value = max(strike - market_price, 0)
     time_value = option_price - intrinsic_value
     return intrinsic_value, time_value
 
+@timed("filter.compute_breakeven_zones")
 def compute_breakeven_zones(df: pd.DataFrame, current_price: float, num_shares: float) -> pd.DataFrame:
     # Estimate breakeven zones
     shares_per_contract = 100
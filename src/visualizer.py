@@ -1,52 +1,127 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
+from matplotlib.collections import LineCollection
+from matplotlib.figure import Figure
+from matplotlib.lines import Line2D
+
+from instrumentation import timed
+from payoff import curve_breakevens
+
+# Headless mode renders to files on reused Figure objects instead of calling plt.show()
+RENDER_CONFIG = {
+    "headless": False,
+    "output_dir": "logs/charts",
+    "format": "png",
+    "dpi": 100
+}
+HEADLESS_MARGINS = {"left": 0.08, "right": 0.92, "bottom": 0.1, "top": 0.92}
+_figures = {}
+
+
+def set_headless(output_dir=None, fmt=None, dpi=None):
+    """Switch to the Agg backend and write charts to output_dir instead of showing them."""
+    plt.switch_backend("Agg")
+    RENDER_CONFIG["headless"] = True
+    if output_dir:
+        RENDER_CONFIG["output_dir"] = output_dir
+    if fmt:
+        RENDER_CONFIG["format"] = fmt
+    if dpi:
+        RENDER_CONFIG["dpi"] = dpi
+
+
+def _figure(key, figsize):
+    """
+    New pyplot figure when interactive. Headless, a cached Figure (no pyplot manager) whose
+    main Axes is cleared and reused; extra axes such as twinx() are dropped.
+    """
+    if not RENDER_CONFIG["headless"]:
+        fig = plt.figure(figsize=figsize)
+        return fig, fig.add_subplot()
+    fig = _figures.get(key)
+    if fig is None:
+        fig = _figures[key] = Figure(figsize=figsize)
+        return fig, fig.add_subplot()
+    ax, *extra = fig.axes
+    for other in extra:
+        other.remove()
+    ax.clear()
+    return fig, ax
+
+
+def _finish(fig, name, output_path=None):
+    if not RENDER_CONFIG["headless"] and output_path is None:
+        fig.tight_layout()
+        plt.show()
+        return None
+    # tight_layout needs an extra full draw; fixed margins keep batch renders to one draw per chart
+    fig.subplots_adjust(**HEADLESS_MARGINS)
+    if output_path is None:
+        output_path = os.path.join(RENDER_CONFIG["output_dir"], f"{name}.{RENDER_CONFIG['format']}")
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    fig.savefig(output_path, dpi=RENDER_CONFIG["dpi"])
+    if not RENDER_CONFIG["headless"]:
+        plt.close(fig)  # pyplot keeps every open figure alive until closed
+    return output_path
+
 
 # --- Option 5 hedge simulation plot ---
-def plot_hedge_simulation(df, strike, premium, expiration):
+@timed("plot.hedge_simulation")
+def plot_hedge_simulation(df, strike, premium, expiration, output_path=None, breakevens=None):
+    """
+    breakevens: (low, high) edges of the hedged loss zone, e.g. PiecewisePayoff.breakevens();
+    by default they are solved on the plotted curve. NaN edges (no crossing) are not drawn.
+    """
     future_prices = df["Future Price ($)"]
     hedged_pnl = df["Hedged P&L ($)"]
     unhedged_pnl = df["Unhedged P&L ($)"]
 
-    plt.figure(figsize=(12, 6))
-    plt.plot(future_prices, unhedged_pnl, linestyle='--', color='blue', label="Unhedged P&L")
-    plt.plot(future_prices, hedged_pnl, color='orange', label="Hedged P&L")
+    fig, ax = _figure("hedge_simulation", (12, 6))
+    ax.plot(future_prices, unhedged_pnl, linestyle='--', color='blue', label="Unhedged P&L")
+    ax.plot(future_prices, hedged_pnl, color='orange', label="Hedged P&L")
 
     # Fill profit and loss regions
-    plt.fill_between(future_prices, hedged_pnl, where=(hedged_pnl >= 0), color='green', alpha=0.1)
-    plt.fill_between(future_prices, hedged_pnl, where=(hedged_pnl < 0), color='red', alpha=0.1)
-
-    # Breakeven
-    breakeven = strike - premium
-    plt.axvline(breakeven, linestyle=':', color='green', label=f"Breakeven: ${breakeven:.2f}")
-
-    plt.axhline(0, color='gray', linewidth=1)
-    plt.xlabel("Future TSLA Price ($)")
-    plt.ylabel("Profit / Loss ($)")
-    plt.title(f"PUT Simulation | Strike: {strike} | Exp: {expiration} | Premium: ${premium:.2f}")
-    plt.legend()
-    plt.grid(True)
-    plt.tight_layout()
-    plt.show()
+    ax.fill_between(future_prices, hedged_pnl, where=(hedged_pnl >= 0), color='green', alpha=0.1)
+    ax.fill_between(future_prices, hedged_pnl, where=(hedged_pnl < 0), color='red', alpha=0.1)
+
+    # Breakevens of the hedged position
+    if breakevens is None:
+        breakevens = curve_breakevens(future_prices, hedged_pnl)
+    for breakeven in breakevens:
+        if np.isfinite(breakeven):
+            ax.axvline(breakeven, linestyle=':', color='green', label=f"Breakeven: ${breakeven:.2f}")
+
+    ax.axhline(0, color='gray', linewidth=1)
+    ax.set_xlabel("Future TSLA Price ($)")
+    ax.set_ylabel("Profit / Loss ($)")
+    ax.set_title(f"PUT Simulation | Strike: {strike} | Exp: {expiration} | Premium: ${premium:.2f}")
+    ax.legend()
+    ax.grid(True)
+    return _finish(fig, f"hedge_simulation_{expiration}_{strike}", output_path)
 
 # --- Option 6 capital-preserving hedge plot ---
-def plot_decision_simulation(df, strike, premium, expiration, roi=None):
+@timed("plot.decision_simulation")
+def plot_decision_simulation(df, strike, premium, expiration, roi=None, output_path=None):
     price_col = "Future Price ($)" if "Future Price ($)" in df.columns else "Future Price"
     net_col = "Net P&L ($)" if "Net P&L ($)" in df.columns else "Net PnL"
 
-    plt.figure(figsize=(12, 7))
-    plt.plot(df[price_col], df[net_col], label="Total Portfolio P&L", color="blue")
+    fig, ax = _figure("decision_simulation", (12, 7))
+    ax.plot(df[price_col], df[net_col], label="Total Portfolio P&L", color="blue")
 
-    plt.axhline(0, linestyle="--", color="gray")
-    plt.fill_between(df[price_col], df[net_col], 0, where=(df[net_col] >= 0), interpolate=True, color='green', alpha=0.1)
-    plt.fill_between(df[price_col], df[net_col], 0, where=(df[net_col] < 0), interpolate=True, color='red', alpha=0.1)
+    ax.axhline(0, linestyle="--", color="gray")
+    ax.fill_between(df[price_col], df[net_col], 0, where=(df[net_col] >= 0), interpolate=True, color='green', alpha=0.1)
+    ax.fill_between(df[price_col], df[net_col], 0, where=(df[net_col] < 0), interpolate=True, color='red', alpha=0.1)
 
-    plt.title(f"Hedge Decision | Strike {strike}, Premium {premium}, Exp {expiration}")
-    plt.xlabel("Future TSLA Price ($)")
-    plt.ylabel("Net P&L ($)")
+    ax.set_title(f"Hedge Decision | Strike {strike}, Premium {premium}, Exp {expiration}")
+    ax.set_xlabel("Future TSLA Price ($)")
+    ax.set_ylabel("Net P&L ($)")
 
     if roi is not None:
-        plt.text(
+        ax.text(
             df[price_col].iloc[-1] * 0.6,
             max(df[net_col]) * 0.95,
             f"ROI on hedge: {roi:.2f}%",
@@ -54,29 +129,29 @@ def plot_decision_simulation(df, strike, premium, expiration, roi=None):
             bbox=dict(boxstyle="round", facecolor="lightyellow", edgecolor="gray")
         )
 
-    plt.legend()
-    plt.tight_layout()
-    plt.show()
+    ax.legend()
+    return _finish(fig, f"decision_simulation_{expiration}_{strike}", output_path)
 
 # --- Option 5: Breakeven zone map with volume-based vertical lines ---
-def plot_breakeven_zone_map(df: pd.DataFrame, expiration: str):
-    strikes = df["strike"]
-    premiums = df["mid_price"]
-    volumes = df["volume"]
-    lower = df["lower_breakeven"]
-    upper = df["upper_breakeven"]
+@timed("plot.breakeven_zone_map")
+def plot_breakeven_zone_map(df: pd.DataFrame, expiration: str, output_path=None):
+    strikes = df["strike"].to_numpy()
+    premiums = df["mid_price"].to_numpy()
+    volumes = df["volume"].to_numpy()
+    lower = df["lower_breakeven"].to_numpy()
+    upper = df["upper_breakeven"].to_numpy()
 
     # Percentile thresholds
     v80 = np.percentile(volumes, 80)
     v20 = np.percentile(volumes, 20)
 
-    fig, ax1 = plt.subplots(figsize=(14, 6))
+    fig, ax1 = _figure("breakeven_zone_map", (14, 6))
 
-    # Plot breakeven ranges per strike
-    for i in range(len(df)):
-        vol = volumes.iloc[i]
-        color = "green" if vol >= v80 else "orange" if vol > v20 else "red"
-        ax1.plot([strikes.iloc[i], strikes.iloc[i]], [lower.iloc[i], upper.iloc[i]], color=color, linewidth=3)
+    # Breakeven range per strike, drawn as a single collection
+    colors = np.where(volumes >= v80, "green", np.where(volumes > v20, "orange", "red"))
+    segments = np.stack([np.column_stack([strikes, lower]), np.column_stack([strikes, upper])], axis=1)
+    ax1.add_collection(LineCollection(segments, colors=colors, linewidths=3))
+    ax1.autoscale_view()
 
     ax1.set_xlabel("Strike Price ($)")
     ax1.set_ylabel("Breakeven Prices ($)", color='blue')
@@ -90,14 +165,32 @@ def plot_breakeven_zone_map(df: pd.DataFrame, expiration: str):
 
     # Build and show custom legend
     lines = [
-        plt.Line2D([0], [0], color="green", linewidth=3, label=f"High Volume (≥ {v80:.0f})"),
-        plt.Line2D([0], [0], color="orange", linewidth=3, label=f"Medium Volume ({v20:.0f}–{v80:.0f})"),
-        plt.Line2D([0], [0], color="red", linewidth=3, label=f"Low Volume (≤ {v20:.0f})"),
-        plt.Line2D([0], [0], linestyle='None', marker='x', color='gray', label="Premium")
+        Line2D([0], [0], color="green", linewidth=3, label=f"High Volume (≥ {v80:.0f})"),
+        Line2D([0], [0], color="orange", linewidth=3, label=f"Medium Volume ({v20:.0f}–{v80:.0f})"),
+        Line2D([0], [0], color="red", linewidth=3, label=f"Low Volume (≤ {v20:.0f})"),
+        Line2D([0], [0], linestyle='None', marker='x', color='gray', label="Premium")
     ]
     ax1.legend(handles=lines, loc="upper left")
 
-    plt.title(f"Breakeven Zones vs Strike Prices | Exp: {expiration}")
-    plt.grid(True)
-    plt.tight_layout()
-    plt.show()
+    ax1.set_title(f"Breakeven Zones vs Strike Prices | Exp: {expiration}")
+    ax1.grid(True)
+    return _finish(fig, f"breakeven_zone_map_{expiration}", output_path)
+
+
+# --- Batch rendering ---
+def _render_job(job):
+    name, kwargs = job
+    return globals()[name](**kwargs)
+
+
+def render_many(jobs, output_dir=None, n_jobs=4, fmt=None):
+    """
+    Renders (function_name, kwargs) jobs headlessly, e.g.
+    ("plot_breakeven_zone_map", {"df": df, "expiration": exp, "output_path": "maps/a.png"}).
+    Each worker process keeps its own figures alive between jobs. Returns the written paths.
+    """
+    if n_jobs <= 1:
+        set_headless(output_dir, fmt)
+        return [_render_job(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=n_jobs, initializer=set_headless, initargs=(output_dir, fmt)) as pool:
+        return list(pool.map(_render_job, jobs, chunksize=max(len(jobs) // (n_jobs * 4), 1)))
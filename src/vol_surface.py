@@ -0,0 +1,220 @@
+# src/vol_surface.py
+# Implied-volatility surface across expirations: a quadratic smile in log-forward moneyness
+# per expiry, linear interpolation in total variance between expiries.
+
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from option_analyzer import MIN_VALID_IV
+from pricing import RISK_FREE_RATE, MIN_VOL, bs_put_price, implied_vol, time_to_expiry
+
+MAX_SURFACES = 32
+MIN_SMILE_POINTS = 3
+RATE_DECIMALS = 6  # rates are rounded to this many decimals in cache keys
+
+_surfaces = OrderedDict()
+_surfaces_lock = threading.Lock()
+
+
+def _chain_groups(chains):
+    """{expiration: chain} from a dict or from one frame with an "expiration" column."""
+    if isinstance(chains, dict):
+        return chains
+    return {exp: chain for exp, chain in chains.groupby("expiration", sort=False)}
+
+
+def _chain_points(chain, spot, t, rate):
+    """Log-forward moneyness, total variance and fit weights for the usable rows of one chain."""
+    strikes = chain["strike"].to_numpy(dtype=np.float64)
+    mid = chain["mid_price"].to_numpy(dtype=np.float64) if "mid_price" in chain.columns \
+        else (chain["bid"].to_numpy(dtype=np.float64) + chain["ask"].to_numpy(dtype=np.float64)) / 2
+    iv = chain["impliedVolatility"].to_numpy(dtype=np.float64) if "impliedVolatility" in chain.columns \
+        else np.full(len(chain), np.nan)
+
+    stale = ~(iv >= MIN_VALID_IV) & (mid > 0)
+    if stale.any():
+        iv = iv.copy()
+        iv[stale] = implied_vol(mid[stale], spot, strikes[stale], t, rate=rate)
+
+    usable = np.isfinite(iv) & (iv >= MIN_VALID_IV) & (strikes > 0)
+    volume = chain["volume"].to_numpy(dtype=np.float64) if "volume" in chain.columns else np.ones(len(chain))
+    k = np.log(strikes[usable] / (spot * np.exp(rate * t)))
+    return k, iv[usable] ** 2 * t, np.sqrt(1 + np.nan_to_num(volume[usable]))
+
+
+def fit_smiles(moneyness, total_variance, weights):
+    """
+    Weighted least-squares fit of w(k) = a + b*k + c*k^2 for every expiry at once.
+    Inputs are lists of per-expiry arrays; they are padded to one (expiries, points) block
+    with zero weight so all normal equations are solved in a single batched call.
+    Expiries with fewer than MIN_SMILE_POINTS quotes get a flat smile.
+    """
+    counts = np.array([len(k) for k in moneyness])
+    width = max(counts.max(initial=0), 1)
+    k = np.zeros((len(counts), width))
+    w = np.zeros_like(k)
+    wt = np.zeros_like(k)
+    for i, n in enumerate(counts):
+        k[i, :n], w[i, :n], wt[i, :n] = moneyness[i], total_variance[i], weights[i]
+
+    design = np.stack([np.ones_like(k), k, k * k], axis=2)
+    weighted = design * wt[..., None]
+    normal = np.einsum("eni,enj->eij", weighted, design) + 1e-12 * np.eye(3)
+    params = np.linalg.solve(normal, np.einsum("eni,en->ei", weighted, w)[..., None])[..., 0]
+
+    flat = counts < MIN_SMILE_POINTS
+    if flat.any():
+        params[flat] = 0.0
+        with np.errstate(invalid="ignore"):
+            params[flat, 0] = (w[flat] * wt[flat]).sum(axis=1) / wt[flat].sum(axis=1)
+    return params
+
+
+class VolSurface:
+    """
+    Fitted surface for one underlying at one snapshot.
+    Queries take strikes plus either year fractions or YYYY-MM-DD expirations and broadcast
+    against each other. Moneyness is clamped to each expiry's quoted range, and total variance
+    is scaled proportionally in time outside the listed expiries (flat vol).
+    """
+
+    def __init__(self, expirations, t, params, k_bounds, spot, rate=RISK_FREE_RATE, asof=None):
+        order = np.argsort(t)
+        self.expirations = [expirations[i] for i in order]
+        self.t = np.asarray(t, dtype=np.float64)[order]
+        self.params = np.asarray(params, dtype=np.float64)[order]
+        self.k_bounds = np.asarray(k_bounds, dtype=np.float64)[order]
+        self.spot = spot
+        self.rate = rate
+        self.asof = asof or datetime.now()
+
+    def t_for(self, expirations):
+        """Year fractions from this surface's as-of time to each expiration."""
+        unique, inverse = np.unique(np.asarray(expirations, dtype=str), return_inverse=True)
+        years = np.array([time_to_expiry(exp, self.asof) for exp in unique])
+        return years[inverse].reshape(np.shape(expirations))
+
+    def _years(self, when):
+        when = np.asarray(when)
+        return self.t_for(when) if when.dtype.kind in "USO" else when.astype(np.float64)
+
+    def _smile(self, idx, k):
+        lo, hi = self.k_bounds[idx, 0], self.k_bounds[idx, 1]
+        k = np.clip(k, lo, hi)
+        a, b, c = self.params[idx, 0], self.params[idx, 1], self.params[idx, 2]
+        return a + k * (b + k * c)
+
+    def total_variance(self, strikes, when):
+        strikes, t = np.broadcast_arrays(np.asarray(strikes, dtype=np.float64), self._years(when))
+        k = np.log(strikes / (self.spot * np.exp(self.rate * t)))
+
+        # Bracketing expiries; queries outside [t0, tn] reuse the nearest pair's end point
+        hi = np.clip(np.searchsorted(self.t, t), 1, max(len(self.t) - 1, 1)) if len(self.t) > 1 \
+            else np.zeros(t.shape, dtype=np.intp)
+        lo = np.maximum(hi - 1, 0)
+        w_lo = self._smile(lo, k)
+        w_hi = self._smile(hi, k)
+
+        t_lo, t_hi = self.t[lo], self.t[hi]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            frac = np.where(t_hi > t_lo, (t - t_lo) / (t_hi - t_lo), 0.0)
+        w = np.where(t < self.t[0], w_lo * t / t_lo,
+                     np.where(t > self.t[-1], w_hi * t / t_hi, w_lo + np.clip(frac, 0, 1) * (w_hi - w_lo)))
+        return np.maximum(w, MIN_VOL ** 2 * t)
+
+    def vol(self, strikes, when):
+        t = self._years(when)
+        return np.sqrt(self.total_variance(strikes, t) / t)
+
+    def price_puts(self, strikes, when, spot=None):
+        """Black-Scholes PUT values off the surface; `spot` shifts the underlying, not the smile."""
+        t = self._years(when)
+        return bs_put_price(self.spot if spot is None else spot, strikes, t, self.vol(strikes, t), self.rate)
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame({
+            "expiration": self.expirations,
+            "t": self.t,
+            "a": self.params[:, 0],
+            "b": self.params[:, 1],
+            "c": self.params[:, 2],
+            "k_min": self.k_bounds[:, 0],
+            "k_max": self.k_bounds[:, 1],
+            "atm_vol": np.sqrt(np.maximum(self.params[:, 0], 0) / self.t)
+        })
+
+
+def surface_key(chains, spot, asof=None, rate=RISK_FREE_RATE) -> str:
+    """Content hash of the quote columns and inputs (spot, date, rate) a surface is fitted from."""
+    digest = hashlib.sha1(f"{spot}|{(asof or datetime.now()).date()}|{round(rate, RATE_DECIMALS)}".encode())
+    for exp, chain in sorted(_chain_groups(chains).items()):
+        digest.update(str(exp).encode())
+        for col in ("strike", "mid_price", "bid", "ask", "impliedVolatility", "volume"):
+            if col in chain.columns:
+                digest.update(np.ascontiguousarray(chain[col].to_numpy(dtype=np.float64)).tobytes())
+    return digest.hexdigest()
+
+
+def fit_surface(chains, spot, asof=None, rate=RISK_FREE_RATE) -> VolSurface:
+    asof = asof or datetime.now()
+    expirations, years, moneyness, variances, weights = [], [], [], [], []
+    for exp, chain in _chain_groups(chains).items():
+        t = time_to_expiry(exp, asof)
+        k, w, wt = _chain_points(chain, spot, t, rate)
+        if len(k):
+            expirations.append(exp)
+            years.append(t)
+            moneyness.append(k)
+            variances.append(w)
+            weights.append(wt)
+    if not expirations:
+        raise ValueError("No chain has usable implied volatilities to fit a surface")
+
+    params = fit_smiles(moneyness, variances, weights)
+    k_bounds = [(k.min(), k.max()) for k in moneyness]
+    return VolSurface(expirations, years, params, k_bounds, spot, rate, asof)
+
+
+def build_surface(chains, spot, asof=None, rate=RISK_FREE_RATE, key=None) -> VolSurface:
+    """
+    Fitted surface for `chains` ({expiration: chain} or a frame with an "expiration" column),
+    reused across calls. Pass `key` (e.g. (ticker, snapshot_ts)) to skip hashing the quotes;
+    the rate is added to it, since the same quotes fit a different surface at another rate.
+    """
+    key = (key, round(rate, RATE_DECIMALS)) if key is not None else surface_key(chains, spot, asof, rate)
+    with _surfaces_lock:
+        if key in _surfaces:
+            _surfaces.move_to_end(key)
+            return _surfaces[key]
+
+    surface = fit_surface(chains, spot, asof, rate)
+    with _surfaces_lock:
+        _surfaces[key] = surface
+        while len(_surfaces) > MAX_SURFACES:
+            _surfaces.popitem(last=False)
+    return surface
+
+
+def clear_surface_cache():
+    with _surfaces_lock:
+        _surfaces.clear()
+
+
+def hypothetical_puts(surface: VolSurface, expiration, strikes) -> pd.DataFrame:
+    """Chain-shaped frame of surface-priced PUTs, usable wherever a fetched chain is (e.g. rank_hedges)."""
+    strikes = np.asarray(strikes, dtype=np.float64)
+    t = surface.t_for(expiration)
+    vol = surface.vol(strikes, t)
+    return pd.DataFrame({
+        "contractSymbol": None,
+        "expiration": expiration,
+        "strike": strikes,
+        "mid_price": bs_put_price(surface.spot, strikes, t, vol, surface.rate),
+        "impliedVolatility": vol,
+        "volume": 0
+    })
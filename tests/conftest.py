@@ -0,0 +1,7 @@
+# tests/conftest.py
+# The modules live flat in src/ and import each other by name.
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
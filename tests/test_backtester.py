@@ -0,0 +1,29 @@
+import pandas as pd
+
+from backtester import run_backtest
+from snapshot_store import SnapshotStore
+
+
+def _snapshot(store, day, spot, expiration="2030-01-18"):
+    chain = pd.DataFrame({
+        "contractSymbol": ["TSLA-P100"], "strike": [100.0], "lastPrice": [5.0], "bid": [4.9], "ask": [5.1],
+        "mid_price": [5.0], "volume": [500], "impliedVolatility": [0.5], "current_price": [spot]
+    })
+    store.write(chain, "TSLA", expiration, snapshot_date=day)
+
+
+def test_expired_put_settles_once_and_holds_cash(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    _snapshot(store, "2030-01-10", 100.0)
+    _snapshot(store, "2030-01-18", 90.0)
+    _snapshot(store, "2030-01-22", 80.0)
+
+    # A negative roll window would otherwise keep marking the expired PUT on later spots
+    policy = {"entry_dte": 8, "roll_dte": -5, "hedge_budget": 1000}
+    daily, summary = run_backtest("TSLA", 100, policy, store_root=str(tmp_path))
+
+    assert daily["held"].notna().tolist() == [True, False, False]
+    assert summary["premiums_paid"] == 1000.0
+    assert summary["hedge_pnl"] == 1000.0  # 2 contracts settled at 10 intrinsic on expiry day
+    cash = (daily["hedged_value"] - daily["unhedged_value"]).tolist()
+    assert cash[1:] == [1000.0, 1000.0]
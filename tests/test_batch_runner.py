@@ -0,0 +1,42 @@
+# tests/test_batch_runner.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ranking import pareto_front, rank_hedges
+
+pytest.importorskip("yfinance")  # batch_runner reads through data_fetcher
+import batch_runner  # noqa: E402
+
+EXPIRATIONS = ("2030-01-04", "2030-01-11", "2030-01-18")
+
+
+def _chain(expiration, shift):
+    strikes = np.arange(90.0, 101.0)
+    mid = np.maximum(strikes - 100.0, 0) + 1.0 + shift + (strikes - 90.0) * 0.3
+    return pd.DataFrame({"contractSymbol": [f"TSLA{expiration}P{int(k)}" for k in strikes], "strike": strikes,
+                         "bid": mid - 0.05, "ask": mid + 0.05, "volume": 500, "openInterest": 1000,
+                         "impliedVolatility": 0.5})
+
+
+def test_scan_reports_rank_hedges_front(monkeypatch):
+    chains = {exp: _chain(exp, i * 0.5) for i, exp in enumerate(EXPIRATIONS)}
+    monkeypatch.setattr(batch_runner, "get_stock_info", lambda ticker: {"current_price": 100.0})
+    monkeypatch.setattr(batch_runner, "get_option_expirations", lambda ticker: list(EXPIRATIONS))
+    monkeypatch.setattr(batch_runner, "get_put_option_chain", lambda ticker, exp: chains[exp])
+    position = {"ticker": "TSLA", "shares": 200, "cost_basis": 100.0, "hedge_budget": 1000.0,
+                "budget_source": "cash"}
+
+    rows = pd.DataFrame(batch_runner.scan_position(position, selector=2,
+                                                   filter_config={"min_volume": 0, "moneyness_range": (0.9, 1.0)}))
+
+    assert set(rows["expiration"]) <= set(EXPIRATIONS[:2])
+    front = rank_hedges(pd.concat([chains[exp].assign(expiration=exp) for exp in EXPIRATIONS[:2]]), 100.0,
+                        200, 1000.0)
+    assert set(zip(rows["contractSymbol"], rows["contracts"])) == set(zip(front["contractSymbol"], front["contracts"]))
+    assert rows["cost_per_protection"].is_monotonic_increasing
+    # Every reported hedge is on the front: none dominates another
+    objectives = rows[["cost_per_protection", "worst_case_pnl", "loss_zone_width"]].to_numpy() * [1, -1, 1]
+    assert pareto_front(objectives).all()
+    assert (rows["max_loss"] >= 0).all()
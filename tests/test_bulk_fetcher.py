@@ -0,0 +1,51 @@
+# tests/test_bulk_fetcher.py
+
+import pandas as pd
+
+from bulk_fetcher import StubTicker, fetch_put_chains, stub_ticker_factory
+
+EXPIRATIONS = ("2030-01-04", "2030-01-11", "2030-01-18")
+
+
+def _chain(expiration):
+    return pd.DataFrame({"contractSymbol": [f"TSLA{expiration}P{k}" for k in (240, 250)],
+                         "strike": [240.0, 250.0], "bid": [4.0, 8.0], "ask": [4.4, 8.6]})
+
+
+def _stub(failures=None):
+    return StubTicker({exp: _chain(exp) for exp in EXPIRATIONS}, failures)
+
+
+def test_fetches_every_selected_expiration():
+    df = fetch_put_chains("TSLA", selector=2, ticker_factory=stub_ticker_factory({"TSLA": _stub()}))
+    assert sorted(df["expiration"].unique()) == list(EXPIRATIONS[:2])
+    assert (df["ticker"] == "TSLA").all()
+    assert len(df) == 4 and df.attrs["errors"] == []
+
+
+def test_rate_limited_calls_are_retried():
+    stub = _stub({None: [Exception("429 Too Many Requests")],
+                  EXPIRATIONS[0]: [Exception("Rate limit exceeded")] * 2})
+    df = fetch_put_chains("TSLA", selector=1, ticker_factory=stub_ticker_factory({"TSLA": stub}), backoff=0)
+    assert len(df) == 2 and df.attrs["errors"] == []
+    assert stub.calls.count(None) == 2
+    assert stub.calls.count(EXPIRATIONS[0]) == 3
+
+
+def test_partial_failure_keeps_the_other_chains():
+    stub = _stub({EXPIRATIONS[1]: [ValueError("bad response")]})
+    factory = stub_ticker_factory({"TSLA": stub})
+    df = fetch_put_chains(["TSLA", "NOPE"], ticker_factory=factory, backoff=0)
+    assert sorted(df["expiration"].unique()) == [EXPIRATIONS[0], EXPIRATIONS[2]]
+    failed = {(symbol, expiration) for symbol, expiration, _ in df.attrs["errors"]}
+    assert failed == {("TSLA", EXPIRATIONS[1]), ("NOPE", None)}
+    assert stub.calls.count(EXPIRATIONS[1]) == 1  # not rate limited, so not retried
+
+
+def test_gives_up_after_max_retries():
+    stub = _stub({EXPIRATIONS[0]: [Exception("429")] * 5})
+    df = fetch_put_chains("TSLA", selector=1, ticker_factory=stub_ticker_factory({"TSLA": stub}),
+                          max_retries=2, backoff=0)
+    assert df.empty
+    assert len(df.attrs["errors"]) == 1
+    assert stub.calls.count(EXPIRATIONS[0]) == 3
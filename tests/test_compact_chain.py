@@ -0,0 +1,17 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from compact_chain import SymbolTable
+
+
+def test_concurrent_intern_gives_one_code_per_symbol():
+    table = SymbolTable()
+    batches = [[f"TSLA{(i * 7 + j) % 500:04d}P" for j in range(200)] for i in range(64)]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(table.intern, batches))
+
+    assert len(table) == len(set(table.symbols)) == 500
+    for batch, codes in zip(batches, results):
+        assert list(table.lookup(codes)) == batch
+        assert np.array_equal(codes, table.intern(batch))
@@ -0,0 +1,19 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from dynamic_hedge import simulate_dynamic_hedge
+
+CANDIDATES = pd.DataFrame({"strike": [90.0, 100.0], "impliedVolatility": [0.5, 0.5],
+                           "bid": [1.0, 3.0], "ask": [1.1, 3.1]})
+
+
+def test_max_loss_target_holds_over_the_path():
+    df, _ = simulate_dynamic_hedge(CANDIDATES, 100.0, 100, t=0.25, objective="max_loss", target=1500.0,
+                                   whole_contracts=False, n_paths=2000)
+    assert np.allclose(df["hedge_error_rmse"], 0.0, atol=1e-6)
+
+
+def test_rebalance_every_must_be_positive():
+    with pytest.raises(ValueError):
+        simulate_dynamic_hedge(CANDIDATES, 100.0, 100, t=0.25, rebalance_every=(0, 5), n_paths=10)
@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+
+from incremental import IncrementalChain
+
+
+def _chain(n=20, price=100.0):
+    strikes = np.linspace(price * 0.9, price * 1.1, n)
+    bid = np.maximum(strikes - price, 0) + 1.0
+    return pd.DataFrame({
+        "contractSymbol": [f"TSLA{i:03d}P" for i in range(n)],
+        "strike": strikes,
+        "lastPrice": bid + 0.05,
+        "bid": bid,
+        "ask": bid + 0.1,
+        "volume": np.full(n, 500, dtype=np.int64),
+        "openInterest": np.full(n, 1000, dtype=np.int64),
+        "impliedVolatility": np.full(n, 0.5),
+    })
+
+
+def _sorted(df):
+    return df.sort_values("contractSymbol").reset_index(drop=True)
+
+
+def test_nan_quote_is_written_and_not_redone():
+    raw = _chain()
+    state = IncrementalChain(100.0, 100, min_volume=0, moneyness_range=(0.8, 1.2))
+    state.rebuild(raw)
+
+    raw.loc[3, "volume"] = np.nan
+    state.refresh(raw)
+    assert list(state.last_changed) == [raw.loc[3, "contractSymbol"]]
+    assert np.isnan(state._chain.loc[raw.loc[3, "contractSymbol"], "volume"])
+
+    state.refresh(raw)
+    assert len(state.last_changed) == 0
+
+
+def test_price_move_matches_full_rebuild():
+    raw = _chain()
+    expiration = (pd.Timestamp.now() + pd.Timedelta(days=30)).strftime("%Y-%m-%d")
+    state = IncrementalChain(100.0, 100, min_volume=0, expiration=expiration)
+    state.rebuild(raw)
+
+    raw.loc[5, ["bid", "ask"]] = [2.0, 2.2]
+    moved = state.refresh(raw, current_price=103.0)
+    fresh = IncrementalChain(103.0, 100, min_volume=0, expiration=expiration).rebuild(raw)
+
+    assert list(state.last_changed) == [raw.loc[5, "contractSymbol"]]
+    cols = ["contractSymbol", "mid_price", "intrinsic_value", "upper_breakeven", "delta"]
+    pd.testing.assert_frame_equal(_sorted(moved[cols]), _sorted(fresh[cols]))
+
+
+def test_price_move_only_derives_changed_quotes(monkeypatch):
+    raw = _chain(200)
+    expiration = (pd.Timestamp.now() + pd.Timedelta(days=30)).strftime("%Y-%m-%d")
+    state = IncrementalChain(100.0, 100, min_volume=0, expiration=expiration)
+    state.rebuild(raw)
+
+    derived = []
+    original = IncrementalChain._derive
+    monkeypatch.setattr(IncrementalChain, "_derive", lambda self, df: derived.append(len(df)) or original(self, df))
+
+    state.refresh(raw, current_price=101.0)
+    assert derived == []
+
+    raw.loc[7, "bid"] += 0.05
+    moved = state.refresh(raw, current_price=102.0)
+    assert derived == [1]
+    assert moved["strike"].between(102.0 * 0.95, 102.0 * 1.05).all()
+    assert moved["abs_diff"].is_monotonic_increasing
+
+
+def test_upper_breakeven_uses_each_positions_size():
+    state = IncrementalChain(100.0, 100, min_volume=0)
+    state.update(_chain())
+
+    small = state.filtered()
+    large = state.filtered(num_shares=400)
+    assert np.allclose(small["upper_breakeven"] - 100.0, 4 * (large["upper_breakeven"] - 100.0))
+    assert np.allclose(large["upper_breakeven"], 100.0 + large["mid_price"] * 100 / 400)
@@ -0,0 +1,22 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from chain_cache import load_frame
+from logger import StructuredLogger
+
+
+def test_frames_are_snapshotted_and_nan_is_null(tmp_path):
+    log = StructuredLogger(path=str(tmp_path / "log.jsonl"), grid_dir=str(tmp_path / "grids"))
+    df = pd.DataFrame({"price": [1.0, 2.0], "pnl": [np.nan, 3.0]})
+    log.log("sim", grid=df, breakeven=float("nan"), values=np.array([1.0, np.inf]))
+    df.loc[0, "price"] = 99.0
+    log.close()
+
+    (line,) = (tmp_path / "log.jsonl").read_text().splitlines()
+    fields = json.loads(line)["fields"]
+    assert fields["breakeven"] is None
+    assert fields["values"] == [1.0, None]
+    saved = load_frame(str(tmp_path / "grids" / f"{fields['grid']['$frame']}.npz"))
+    assert saved["price"].tolist() == [1.0, 2.0]
@@ -0,0 +1,76 @@
+import asyncio
+
+import pandas as pd
+
+from monitor import HedgeMonitor, ReplayQuoteSource
+
+
+def _chain(held_bid=5.0):
+    return pd.DataFrame({
+        "contractSymbol": ["TSLA-P95", "TSLA-P100", "TSLA-P101"],
+        "strike": [95.0, 100.0, 101.0],
+        "lastPrice": [2.0, held_bid, 4.0],
+        "bid": [1.9, held_bid, 3.9],
+        "ask": [2.1, held_bid + 0.2, 4.1],
+        "volume": [500, 500, 500],
+        "openInterest": [1000, 1000, 1000],
+        "impliedVolatility": [0.5, 0.5, 0.5],
+    })
+
+
+def _position(**extra):
+    return {"ticker": "TSLA", "expiration": "2030-01-18", "strike": 100.0, "premium": 5.0,
+            "num_shares": 100, "avg_purchase_price": 100.0, "hedge_budget": 1000.0, **extra}
+
+
+def _run(positions, prices, chains, compact=False):
+    source = ReplayQuoteSource({"TSLA": prices}, {("TSLA", "2030-01-18"): chains}, compact=compact)
+    monitor = HedgeMonitor(positions, source=source, interval=0, jitter=0, on_alert=lambda alert: None)
+    asyncio.run(monitor.run(max_ticks=len(prices)))
+    return monitor
+
+
+def test_breakeven_cross_alerts_each_position():
+    # Two identical positions on one chain keep separate zones, so both see the cross
+    positions = [_position(), _position()]
+    monitor = _run(positions, [100.0, 85.0, 85.0], [_chain()])
+
+    crosses = [a for a in monitor.alerts if a["type"] == "breakeven_cross"]
+    assert len(crosses) == 2
+    assert all(a["zone"] == "below" for a in crosses)
+    assert [r["zone"] for r in monitor.ticks["TSLA"]] == ["below", "below"]
+
+
+def test_better_put_alerted_once_per_position():
+    # Only the 100-strike holder has a cheaper PUT at or above its strike
+    monitor = _run([_position(), _position(strike=95.0, premium=2.0)], [100.0, 100.5, 101.0], [_chain()],
+                   compact=True)
+
+    better = [a for a in monitor.alerts if a["type"] == "better_put"]
+    assert [a["contract"] for a in better] == ["TSLA-P101"]
+
+
+def test_failed_poll_backs_off_and_recovers():
+    class FlakySource(ReplayQuoteSource):
+        failures = 1
+
+        def get_price(self, ticker):
+            if self.failures:
+                self.failures -= 1
+                raise ConnectionError("offline")
+            return super().get_price(ticker)
+
+    source = FlakySource({"TSLA": [100.0]}, {("TSLA", "2030-01-18"): [_chain()]})
+    monitor = HedgeMonitor([_position()], source=source, interval=0, jitter=0, on_alert=lambda alert: None)
+    asyncio.run(monitor.run(max_ticks=2))
+    assert monitor.ticks["TSLA"][0]["zone"] == "inside"
+
+
+def test_cross_alert_without_lower_breakeven():
+    # 200 shares and 2 PUTs: the loss never recovers on the way down, so breakeven_low is NaN
+    position = _position(num_shares=200, strike=90.0, hedge_budget=1000.0, avg_purchase_price=100.0)
+    monitor = _run([position], [120.0, 95.0, 60.0], [_chain()])
+
+    assert [r["zone"] for r in monitor.ticks["TSLA"]] == ["inside"]
+    crosses = [a for a in monitor.alerts if a["type"] == "breakeven_cross"]
+    assert [a["zone"] for a in crosses] == ["inside"]
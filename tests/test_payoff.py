@@ -0,0 +1,14 @@
+import numpy as np
+
+from batch_simulator import simulate_chain
+from hedge_decision_simulator import simulate_decision
+
+
+def test_max_loss_means_the_same_in_both_simulators():
+    _, meta = simulate_decision(100, 200, 100, 90, 5, 1000)
+    chain = simulate_chain(100, 100, [90.0], [5.0], avg_purchase_price=200, hedge_budget=1000, grid=False)
+
+    assert np.isnan(meta["breakeven_low"])
+    assert np.isnan(chain["breakeven_low"][0])
+    assert chain["breakeven_high"][0] == meta["breakeven_high"]
+    assert chain["max_loss"][0] == meta["max_loss"] > 0
@@ -0,0 +1,73 @@
+import http.client
+import json
+import os
+import threading
+from concurrent.futures.process import BrokenProcessPool
+
+import pandas as pd
+import pytest
+
+from monitor import ReplayQuoteSource
+from server import MAX_BODY_BYTES, HedgeService, make_server
+
+
+@pytest.fixture
+def server():
+    chain = pd.DataFrame({"contractSymbol": ["P95", "P100"], "strike": [95.0, 100.0], "bid": [1.9, 4.9],
+                          "ask": [2.1, 5.1], "volume": [500, 500], "openInterest": [1000, 1000],
+                          "impliedVolatility": [0.5, 0.5]})
+    source = ReplayQuoteSource({"TSLA": [100.0]}, {("TSLA", "2030-01-18"): [chain]})
+    service = HedgeService(source=source, workers=0)
+    httpd = make_server(service, port=0)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd.server_address[1]
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _request(port, method, path, body=None, headers=None):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    conn.request(method, path, body=body, headers=headers or {})
+    response = conn.getresponse()
+    status, payload = response.status, json.loads(response.read())
+    conn.close()
+    return status, payload
+
+
+def test_simulate_get_coerces_query_numbers(server):
+    query = "kind=decision&ticker=TSLA&avg_purchase_price=90&num_shares=200&strike=95&premium=2&hedge_budget=1000"
+    status, payload = _request(server, "GET", f"/simulate?{query}")
+    assert status == 200, payload
+    assert payload["meta"]["contracts_purchased"] == 5
+
+
+def test_simulate_strategy_over_post(server):
+    collar = [{"type": "put", "strike": 95, "quantity": 1, "premium": 3},
+              {"type": "call", "strike": 110, "quantity": -1, "premium": 2}]
+    body = json.dumps({"kind": "strategy", "ticker": "TSLA", "strategies": [collar], "shares": 100,
+                       "cost_basis": 100}).encode()
+    status, payload = _request(server, "POST", "/simulate", body=body, headers={"Content-Type": "application/json"})
+    assert status == 200, payload
+    assert payload["meta"]["strategies"][0]["breakevens"] == [101.0]
+    assert payload["meta"]["strategies"][0]["max_gain"] == 900.0
+
+
+def test_oversized_body_is_rejected(server):
+    status, payload = _request(server, "POST", "/simulate", body=b"{}",
+                               headers={"Content-Length": str(MAX_BODY_BYTES + 1)})
+    assert status == 413
+
+
+def _kill_worker():
+    os._exit(1)
+
+
+def test_broken_pool_fails_only_the_offending_request():
+    service = HedgeService(source=ReplayQuoteSource({}, {}), workers=1)
+    try:
+        with pytest.raises(BrokenProcessPool):
+            service._offload(_kill_worker)
+        assert service._offload(pow, 2, 10) == 1024
+    finally:
+        service.close()
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+
+import session_manager
+from hedge_decision_simulator import simulate_decision
+from session_manager import SessionStore, content_hash
+
+
+def _fresh_store(tmp_path):
+    return SessionStore(user="alice", root=str(tmp_path))
+
+
+def test_artifacts_round_trip_without_pickle(tmp_path):
+    store = _fresh_store(tmp_path)
+    df, meta = store.memoize("decision", simulate_decision, 100, 200, 100, 90, 5, 1000)
+
+    (artifact,) = (tmp_path / "artifacts").iterdir()
+    assert artifact.suffix == ".npz"
+    again_df, again_meta = _fresh_store(tmp_path).memoize("decision", simulate_decision, 100, 200, 100, 90, 5, 1000)
+    pd.testing.assert_frame_equal(again_df, df)
+    assert again_meta.keys() == meta.keys()
+    for k, v in meta.items():
+        assert again_meta[k] == v or (np.isnan(again_meta[k]) and np.isnan(v))
+
+
+def test_memo_version_is_part_of_the_key(tmp_path, monkeypatch):
+    calls = []
+
+    def simulate(x):
+        calls.append(x)
+        return {"x": x}
+
+    store = _fresh_store(tmp_path)
+    store.memoize("sim", simulate, 1)
+    store.memoize("sim", simulate, 1)
+    monkeypatch.setattr(session_manager, "MEMO_VERSION", session_manager.MEMO_VERSION + 1)
+    store.memoize("sim", simulate, 1)
+    assert calls == [1, 1]
+    assert store.stats()["hits"] == 1
+
+
+def test_numpy_scalars_hash_like_python_scalars():
+    assert content_hash(np.float64(1.5), np.int64(3), [np.bool_(True)]) == content_hash(1.5, 3, [True])
+    assert content_hash({"strike": np.float64(90.0)}) == content_hash({"strike": 90.0})
+
+
+def test_memory_cache_is_per_store(tmp_path):
+    calls = []
+
+    def simulate(x):
+        calls.append(x)
+        return lambda: x  # not storable as an artifact, so only the memory cache can hit
+
+    first = _fresh_store(tmp_path)
+    first.memoize("sim", simulate, 1)
+    first.memoize("sim", simulate, 1)
+    SessionStore(user="alice", root=str(tmp_path), memory_items=1).memoize("sim", simulate, 1)
+    assert calls == [1, 1]
@@ -0,0 +1,25 @@
+import numpy as np
+import pandas as pd
+
+from snapshot_store import SnapshotStore
+
+
+def test_missing_strings_round_trip_as_null(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    df = pd.DataFrame({"strike": [90.0, 95.0, 100.0], "contractSymbol": ["A", None, "nan"]})
+    store.write(df, "TSLA", "2030-01-18", snapshot_date="2026-01-02")
+
+    symbols = store.read(ticker="TSLA")["contractSymbol"]
+    assert symbols.isna().tolist() == [False, True, False]
+    assert symbols.iloc[2] == "nan"
+
+
+def test_prices_round_trip_exactly(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    df = pd.DataFrame({"strike": [212.5, 1000.01, 3.07], "bid": [13.37, 0.01, 1234.56],
+                       "ask": [13.42, 0.03, 1234.61], "impliedVolatility": [0.512, 0.75, 1.25]})
+    store.write(df, "TSLA", "2030-01-18", snapshot_date="2026-01-02")
+
+    out = store.read(ticker="TSLA")
+    pd.testing.assert_frame_equal(out[["strike", "bid", "ask"]], df[["strike", "bid", "ask"]])
+    assert out["impliedVolatility"].dtype == np.float32
@@ -0,0 +1,61 @@
+import numpy as np
+
+from payoff import PiecewisePayoff
+from pricing import bs_put_greeks
+from strategy import StrategySet, simulate_strategies
+
+
+def test_put_spread_breakeven_and_extremes():
+    # Long 100 PUT at 5, short 90 PUT at 2: 3.00 debit
+    spread = StrategySet.put_spreads(100.0, 5.0, 90.0, 2.0)
+
+    assert np.allclose(spread.breakevens()["breakeven"], [97.0])
+    extremes = spread.max_loss_gain().iloc[0]
+    assert extremes["max_loss"] == 300.0
+    assert extremes["max_gain"] == 700.0
+
+
+def test_collar_breakeven_and_extremes():
+    # 100 shares at 100, long 95 PUT at 3, short 110 CALL at 2: capped both ways
+    collar = StrategySet.collars(95.0, 3.0, 110.0, 2.0, shares=100, cost_basis=100.0)
+
+    assert np.allclose(collar.breakevens()["breakeven"], [101.0])
+    extremes = collar.max_loss_gain().iloc[0]
+    assert np.isclose(extremes["max_loss"], 600.0)
+    assert np.isclose(extremes["max_gain"], 900.0)
+
+    # Without the CALL the upside is open
+    assert np.isinf(StrategySet.collars(95.0, 3.0, 110.0, 2.0, contracts=0, shares=100,
+                                        cost_basis=100.0).max_loss_gain()["max_gain"].iloc[0])
+
+
+def test_long_put_matches_piecewise_payoff():
+    hedge = StrategySet.from_legs([[{"type": "put", "strike": 95.0, "quantity": 2, "premium": 4.0}]],
+                                  shares=100, cost_basis=100.0)
+    exact = PiecewisePayoff(100, 100.0, 95.0, 2, 4.0)
+
+    assert np.allclose(hedge.breakevens()["breakeven"], [b for b in exact.breakevens() if np.isfinite(b)])
+    assert np.isclose(hedge.max_loss_gain()["max_loss"].iloc[0], exact.max_loss())
+
+
+def test_call_greeks_follow_put_call_parity():
+    # Long CALL + short PUT at one strike is a synthetic forward: delta e^{-qt} per share, no gamma or vega
+    synthetic = StrategySet.from_legs([[{"type": "call", "strike": 100.0, "quantity": 1, "premium": 0.0},
+                                        {"type": "put", "strike": 100.0, "quantity": -1, "premium": 0.0}]])
+    g = synthetic.greeks(spot=105.0, t=0.5, vol=0.4, rate=0.04, div=0.01).iloc[0]
+    assert np.isclose(g["delta"], 100 * np.exp(-0.01 * 0.5))
+    assert np.isclose(g["gamma"], 0.0) and np.isclose(g["vega"], 0.0)
+
+    put = bs_put_greeks(105.0, 100.0, 0.5, 0.4, rate=0.04, div=0.01)
+    call = StrategySet.from_legs([[{"type": "call", "strike": 100.0, "quantity": 1, "premium": 0.0}]])
+    assert np.isclose(call.greeks(105.0, 0.5, 0.4, rate=0.04, div=0.01)["gamma"].iloc[0], 100 * put["gamma"])
+
+
+def test_simulate_strategies_reports_exact_metadata():
+    legs = [[{"type": "put", "strike": 100.0, "quantity": 1, "premium": 5.0},
+             {"type": "put", "strike": 90.0, "quantity": -1, "premium": 2.0}]]
+    df, meta = simulate_strategies(100.0, legs, price_range=(50.0, 150.0), num_points=11)
+
+    assert list(df.columns) == ["Future Price ($)", "Strategy 0 P&L ($)"]
+    assert np.allclose(meta["strategies"][0]["breakevens"], [97.0])
+    assert meta["strategies"][0]["max_loss"] == 300.0